@@ -1,11 +1,26 @@
 from django.contrib import admin
 
 from .models import (
+    JurisdictionTaxRate,
+    JurisdictionTaxRateItem,
     LineItemTaxation,
     LineItemTaxationDetail,
     OrderTaxation,
     ShippingTaxation,
     ShippingTaxationDetail,
+    TaxationDetailsOutbox,
+    TaxAuthority,
+    TaxType,
+)
+
+DETAIL_FIELDS = (
+    "authority",
+    "tax_type",
+    "tax_applied",
+    "fee_applied",
+    "tax_rate",
+    "taxable_amount",
+    "data",
 )
 
 
@@ -41,7 +56,7 @@ class LineItemTaxationDetailInline(
     admin.StackedInline[LineItemTaxationDetail, LineItemTaxation]
 ):
     model = LineItemTaxationDetail
-    readonly_fields = ("data",)
+    readonly_fields = DETAIL_FIELDS
 
 
 @admin.register(LineItemTaxation)
@@ -58,7 +73,7 @@ class ShippingTaxationDetailInline(
     admin.StackedInline[ShippingTaxationDetail, ShippingTaxation]
 ):
     model = ShippingTaxationDetail
-    readonly_fields = ("data",)
+    readonly_fields = DETAIL_FIELDS
 
 
 @admin.register(ShippingTaxation)
@@ -69,3 +84,79 @@ class ShippingTaxationAdmin(admin.ModelAdmin[ShippingTaxation]):
     list_display = ("order", "country_code", "state_code", "total_tax_applied")
     readonly_fields = ("order", "country_code", "state_code", "total_tax_applied")
     inlines = (ShippingTaxationDetailInline,)
+
+
+@admin.register(TaxAuthority)
+class TaxAuthorityAdmin(admin.ModelAdmin[TaxAuthority]):
+    list_filter = ("authority_type",)
+    search_fields = ("name",)
+
+    fields = ("name", "authority_type")
+    list_display = ("name", "authority_type")
+    readonly_fields = fields
+
+
+@admin.register(TaxType)
+class TaxTypeAdmin(admin.ModelAdmin[TaxType]):
+    search_fields = ("name",)
+
+    fields = ("name",)
+    list_display = ("name",)
+    readonly_fields = fields
+
+
+@admin.register(TaxationDetailsOutbox)
+class TaxationDetailsOutboxAdmin(admin.ModelAdmin[TaxationDetailsOutbox]):
+    search_fields = ("idempotency_key",)
+
+    fields = (
+        "idempotency_key",
+        "order",
+        "response",
+        "date_created",
+        "date_processed",
+    )
+    list_display = ("idempotency_key", "order", "date_created", "date_processed")
+    readonly_fields = fields
+
+
+class JurisdictionTaxRateItemInline(
+    admin.TabularInline[JurisdictionTaxRateItem, JurisdictionTaxRate]
+):
+    model = JurisdictionTaxRateItem
+    readonly_fields = (
+        "authority_name",
+        "authority_type",
+        "tax_name",
+        "rate",
+        "fee",
+        "percent_taxable",
+    )
+
+
+@admin.register(JurisdictionTaxRate)
+class JurisdictionTaxRateAdmin(admin.ModelAdmin[JurisdictionTaxRate]):
+    list_filter = ("country_code", "sku")
+    search_fields = ("postal_code", "sku", "product_group", "product_item")
+
+    fields = (
+        "country_code",
+        "postal_code",
+        "sku",
+        "product_group",
+        "product_item",
+        "estimated_total_rate",
+        "estimated_total_fee",
+        "date_updated",
+    )
+    list_display = (
+        "postal_code",
+        "country_code",
+        "sku",
+        "product_group",
+        "product_item",
+        "estimated_total_rate",
+        "date_updated",
+    )
+    readonly_fields = fields
+    inlines = (JurisdictionTaxRateItemInline,)
@@ -10,6 +10,6 @@ class CCHConfig(AppConfig):
     default = True
 
     def ready(self) -> None:
-        from . import prices
+        from . import checks, prices  # noqa: F401
 
         prices.monkey_patch_prices()
@@ -0,0 +1,256 @@
+from collections.abc import Callable
+from datetime import UTC, datetime
+from typing import Any, TypeVar
+import logging
+import threading
+
+from django.core.cache import caches
+import pybreaker
+
+from . import settings
+from .metrics import BreakerMetricsListener
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_breakers: dict[tuple[Any, ...], pybreaker.CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(
+    name: str = "oscarcch",
+    fail_max: int | None = None,
+    reset_timeout: float | None = None,
+    cache_alias: str | None = None,
+) -> pybreaker.CircuitBreaker:
+    """
+    Return a circuit breaker shared by every caller in this process, whose state is stored in the Django cache.
+
+    Since the state is shared through the cache, every worker process using the same cache trips, half-opens and
+    closes the breaker together: once ``fail_max`` consecutive calls to CCH have failed in any of them, calls from
+    all of them fail immediately with :class:`pybreaker.CircuitBreakerError` until ``reset_timeout`` has passed.
+    Each process reports the state changes it notices to the metrics recorder.
+
+    :param name: Name of the breaker. Breakers with the same name share their state.
+    :param fail_max: Number of consecutive failures which open the breaker. Defaults to
+        ``CCH_CIRCUIT_BREAKER_FAIL_MAX``.
+    :param reset_timeout: Number of seconds after which an open breaker lets a trial call through. Defaults to
+        ``CCH_CIRCUIT_BREAKER_RESET_TIMEOUT``.
+    :param cache_alias: Alias of the Django cache in which to store the breaker's state. Defaults to
+        ``CCH_CIRCUIT_BREAKER_CACHE_ALIAS``.
+    :return: A shared :class:`pybreaker.CircuitBreaker` instance
+    """
+    if fail_max is None:
+        fail_max = settings.CCH_CIRCUIT_BREAKER_FAIL_MAX
+    if reset_timeout is None:
+        reset_timeout = settings.CCH_CIRCUIT_BREAKER_RESET_TIMEOUT
+    if cache_alias is None:
+        cache_alias = settings.CCH_CIRCUIT_BREAKER_CACHE_ALIAS
+    key = (name, fail_max, reset_timeout, cache_alias)
+    breaker = _breakers.get(key)
+    if breaker is not None:
+        return breaker
+    with _breakers_lock:
+        breaker = _breakers.get(key)
+        if breaker is None:
+            breaker = SharedCircuitBreaker(
+                fail_max=fail_max,
+                reset_timeout=reset_timeout,
+                state_storage=CircuitDjangoCacheStorage(
+                    pybreaker.STATE_CLOSED,
+                    name=name,
+                    cache_alias=cache_alias,
+                ),
+                name=name,
+                listeners=[BreakerMetricsListener()],
+            )
+            _breakers[key] = breaker
+    return breaker
+
+
+class SharedCircuitBreaker(pybreaker.CircuitBreaker):
+    """
+    Circuit breaker which may be shared between threads without serializing their calls.
+
+    :class:`pybreaker.CircuitBreaker` holds a lock for the whole duration of each call, so sharing one between
+    threads would let only one request to CCH be in flight at a time. State changes are still made under the lock.
+
+    Since calls aren't serialized, only one trial call is let through at a time once the breaker isn't closed: other
+    calls fail with :class:`pybreaker.CircuitBreakerError` until the trial call has completed. With a
+    :class:`CircuitDjangoCacheStorage`, the trial call is claimed in the cache, so that only one is made by all the
+    workers sharing the state.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._trial_lock = threading.Lock()
+        self._local = threading.local()
+
+    def call(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        state = self.state
+        # An open breaker calls back into the breaker once it has half-opened, from within the trial call
+        if state.name == pybreaker.STATE_CLOSED or getattr(
+            self._local, "in_trial", False
+        ):
+            return state.call(func, *args, **kwargs)
+        if not self._acquire_trial():
+            raise pybreaker.CircuitBreakerError(
+                "Trial call in progress, circuit breaker still open"
+            )
+        self._local.in_trial = True
+        try:
+            return state.call(func, *args, **kwargs)
+        finally:
+            self._local.in_trial = False
+            self._release_trial()
+
+    def _acquire_trial(self) -> bool:
+        storage = self._state_storage
+        if isinstance(storage, CircuitDjangoCacheStorage):
+            # Expire the claim, in case the worker making the trial call dies before releasing it
+            return storage.acquire_trial(timeout=self.reset_timeout)
+        return self._trial_lock.acquire(blocking=False)
+
+    def _release_trial(self) -> None:
+        storage = self._state_storage
+        if isinstance(storage, CircuitDjangoCacheStorage):
+            storage.release_trial()
+        else:
+            self._trial_lock.release()
+
+
+class CircuitDjangoCacheStorage(pybreaker.CircuitBreakerStorage):
+    """
+    pybreaker state storage backed by a Django cache.
+
+    If the cache can't be reached, the breaker is treated as closed, so that an unavailable cache never stops
+    taxes from being calculated.
+    """
+
+    def __init__(
+        self,
+        state: str,
+        name: str = "oscarcch",
+        cache_alias: str = "default",
+        fallback_circuit_state: str = pybreaker.STATE_CLOSED,
+    ):
+        """
+        :param state: Initial state of the breaker, if none is stored in the cache yet
+        :param name: Name of the breaker, used to namespace its cache keys
+        :param cache_alias: Alias of the Django cache (from ``settings.CACHES``) to use
+        :param fallback_circuit_state: State to report if the cache can't be reached
+        """
+        super().__init__("django-cache")
+        self._namespace_name = name
+        self._cache_alias = cache_alias
+        self._initial_state = str(state)
+        self._fallback_circuit_state = fallback_circuit_state
+        self._initialize_state(self._initial_state)
+
+    @property
+    def _cache(self) -> Any:
+        return caches[self._cache_alias]
+
+    def _initialize_state(self, state: str) -> None:
+        try:
+            self._cache.add(self._namespace("fail_counter"), 0, timeout=None)
+            self._cache.add(self._namespace("success_counter"), 0, timeout=None)
+            self._cache.add(self._namespace("state"), state, timeout=None)
+        except Exception:
+            logger.exception("Failed to initialize circuit breaker state")
+
+    @property
+    def state(self) -> str:
+        try:
+            state: str | None = self._cache.get(self._namespace("state"))
+        except Exception:
+            logger.exception("Failed to read circuit breaker state")
+            return self._fallback_circuit_state
+        if state is None:
+            # The state was evicted from the cache, so start over
+            self._initialize_state(self._fallback_circuit_state)
+            return self._fallback_circuit_state
+        return state
+
+    @state.setter
+    def state(self, state: str) -> None:
+        self._set("state", str(state))
+
+    def increment_counter(self) -> None:
+        self._incr("fail_counter")
+
+    def reset_counter(self) -> None:
+        self._set("fail_counter", 0)
+
+    def increment_success_counter(self) -> None:
+        self._incr("success_counter")
+
+    def reset_success_counter(self) -> None:
+        self._set("success_counter", 0)
+
+    @property
+    def counter(self) -> int:
+        return int(self._get("fail_counter") or 0)
+
+    @property
+    def success_counter(self) -> int:
+        return int(self._get("success_counter") or 0)
+
+    @property
+    def opened_at(self) -> datetime | None:
+        timestamp = self._get("opened_at")
+        if timestamp is None:
+            return None
+        return datetime.fromtimestamp(timestamp, UTC)
+
+    @opened_at.setter
+    def opened_at(self, now: datetime) -> None:
+        self._set("opened_at", now.timestamp())
+
+    def acquire_trial(self, timeout: float) -> bool:
+        """
+        Claim the right to make the trial call of a breaker which isn't closed.
+
+        :param timeout: Number of seconds after which the claim expires, if it hasn't been released
+        :return: Whether the claim was made. It's always made if the cache can't be reached.
+        """
+        try:
+            return bool(self._cache.add(self._namespace("trial"), 1, timeout=timeout))
+        except Exception:
+            logger.exception("Failed to claim circuit breaker trial call")
+            return True
+
+    def release_trial(self) -> None:
+        """
+        Release the claim made by :func:`acquire_trial`.
+        """
+        try:
+            self._cache.delete(self._namespace("trial"))
+        except Exception:
+            logger.exception("Failed to release circuit breaker trial call")
+
+    def _get(self, key: str) -> Any:
+        try:
+            return self._cache.get(self._namespace(key))
+        except Exception:
+            logger.exception("Failed to read circuit breaker %s", key)
+            return None
+
+    def _set(self, key: str, value: Any) -> None:
+        try:
+            self._cache.set(self._namespace(key), value, timeout=None)
+        except Exception:
+            logger.exception("Failed to update circuit breaker %s", key)
+
+    def _incr(self, key: str) -> None:
+        try:
+            self._cache.incr(self._namespace(key))
+        except ValueError:
+            # The counter was evicted from the cache
+            self._cache.add(self._namespace(key), 1, timeout=None)
+        except Exception:
+            logger.exception("Failed to update circuit breaker %s", key)
+
+    def _namespace(self, key: str) -> str:
+        return f"oscarcch:breaker:{self._namespace_name}:{key}"
@@ -1,35 +1,85 @@
 from __future__ import annotations
 
+from collections import defaultdict
+from collections.abc import Awaitable, Callable, Iterable, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import copy_context
 from datetime import datetime
 from decimal import Decimal
-from typing import TYPE_CHECKING
+from typing import IO, TYPE_CHECKING, Any, NamedTuple, TypeVar, cast
+import io
 import logging
 
+from asgiref.sync import sync_to_async
+from django.core.cache import caches
+from django.db.models import Q, prefetch_related_objects
 from django.utils.functional import cached_property
 from oscar.apps.basket.abstract_models import AbstractLine
-from zeep.transports import Transport
+from oscar.core.loading import get_model
 from zeep.xsd import CompoundValue
+import pybreaker
+import requests
 import zeep
-import zeep.cache
 
 from . import exceptions, settings, types
-from .prices import TaxablePrice
+from .client import get_adapter, get_async_client, get_client
+from .hedging import HedgingPolicy
+from .metrics import MetricsRecorder, get_metrics_recorder, measure_soap_call
+from .prices import (
+    UNIT_PRICE_PRECISION,
+    ShippingChargeComponent,
+    TaxablePrice,
+    make_tax_fingerprint,
+)
+from .responses import (
+    AnyLineItemTax,
+    AnyTaxResponse,
+    LineItemTax,
+    TaxResponse,
+    get_line_item_taxes,
+    get_messages,
+    get_tax_details,
+    parse_calculate_response,
+    serialize_object,
+    stream_calculate_response,
+)
+from .retry import RetryPolicy
+from .serializer import CalculateRequestSerializer, get_request_serializer
 
 if TYPE_CHECKING:
     from oscar.apps.basket.models import Basket
     from oscar.apps.order.models import ShippingAddress
     from oscar.apps.partner.models import PartnerAddress
-    import pybreaker
 
+    from .models import JurisdictionTaxRate
     from .prices import ShippingCharge
 
+    RateKey = tuple[str, str, str, str, str]
+    ProductData = dict[int, dict[str, str]]
+    BatchTaxRequest = tuple[
+        ShippingAddress | None, Basket | None, ShippingCharge | None
+    ]
+
 
 logger = logging.getLogger(__name__)
 
+_ResponseT = TypeVar("_ResponseT", bound=AnyTaxResponse)
+
 POSTCODE_LEN = 5
 PLUS4_LEN = 4
 
 
+class BatchTaxResult(NamedTuple):
+    """
+    Outcome of calculating the taxes for one item passed to :func:`CCHTaxCalculator.apply_taxes_many`.
+    """
+
+    #: SOAP Response, or ``None`` if taxes couldn't be calculated.
+    response: AnyTaxResponse | None
+    #: Exception explaining why taxes couldn't be calculated, if any.
+    error: Exception | None = None
+
+
 class CCHTaxCalculator:
     """
     Simple interface between Python and the CCH Sales Tax Office SOAP API.
@@ -37,12 +87,39 @@ class CCHTaxCalculator:
 
     precision = settings.CCH_PRECISION
     wsdl = settings.CCH_WSDL
+    wsdl_cache_dir = settings.CCH_WSDL_CACHE_DIR
+    wsdl_cache_timeout = settings.CCH_WSDL_CACHE_TIMEOUT
     proxy_url = settings.CCH_PROXY_URL
+    pool_connections = settings.CCH_POOL_CONNECTIONS
+    pool_maxsize = settings.CCH_POOL_MAXSIZE
+    pool_block = settings.CCH_POOL_BLOCK
+    tcp_keepalive = settings.CCH_TCP_KEEPALIVE
     open_timeout = settings.CCH_OPEN_TIMEOUT
     send_timeout = settings.CCH_SEND_TIMEOUT
     entity_id = settings.CCH_ENTITY
     divsion_id = settings.CCH_DIVISION
     max_retries = settings.CCH_MAX_RETRIES
+    retry_backoff = settings.CCH_RETRY_BACKOFF
+    retry_max_backoff = settings.CCH_RETRY_MAX_BACKOFF
+    retry_deadline = settings.CCH_RETRY_DEADLINE
+    batch_max_workers = settings.CCH_BATCH_MAX_WORKERS
+    split_order_lines = settings.CCH_SPLIT_ORDER_LINES
+    response_cache_alias = settings.CCH_RESPONSE_CACHE_ALIAS
+    response_cache_timeout = settings.CCH_RESPONSE_CACHE_TIMEOUT
+    incremental_recalculation = settings.CCH_INCREMENTAL_RECALCULATION
+    line_result_cache_timeout = settings.CCH_LINE_RESULT_CACHE_TIMEOUT
+    response_type_name = "{http://schemas.cch.com/TaxResponse/3.5}TaxResponse"
+    parse_raw_responses = settings.CCH_PARSE_RAW_RESPONSES
+    precompile_requests = settings.CCH_PRECOMPILE_REQUESTS
+    stream_responses = settings.CCH_STREAM_RESPONSES
+    hedge_requests = settings.CCH_HEDGE_REQUESTS
+    #: Shared by all calculators in the process, so that hedging delays are based on all recent requests.
+    hedging_policy = HedgingPolicy(
+        delay=settings.CCH_HEDGE_DELAY,
+        percentile=settings.CCH_HEDGE_PERCENTILE,
+        max_rate=settings.CCH_HEDGE_MAX_RATE,
+        max_workers=settings.CCH_HEDGE_MAX_WORKERS,
+    )
 
     def __init__(self, breaker: pybreaker.CircuitBreaker | None = None):
         """
@@ -55,6 +132,27 @@ class CCHTaxCalculator:
         """
         self.breaker = breaker
 
+    @cached_property
+    def metrics(self) -> MetricsRecorder:
+        """
+        Return the recorder which receives the timings, sizes, retries and errors of calculations, configured by
+        ``CCH_METRICS_RECORDER``
+        """
+        return get_metrics_recorder()
+
+    @property
+    def retry_policy(self) -> RetryPolicy:
+        """
+        Return the policy used to retry failed requests to CCH
+        """
+        return RetryPolicy(
+            max_retries=self.max_retries,
+            backoff=self.retry_backoff,
+            max_backoff=self.retry_max_backoff,
+            deadline=self.retry_deadline,
+            on_retry=self.metrics.record_retry,
+        )
+
     @property
     def client_settings(self) -> zeep.Settings:
         settings = zeep.Settings()
@@ -63,33 +161,34 @@ class CCHTaxCalculator:
     @cached_property
     def client(self) -> zeep.Client:
         """
-        Construct and return a zeep SOAP client
+        Return a zeep SOAP client
+
+        Clients are shared process-wide between all calculators with the same connection settings, so the
+        WSDL only gets fetched and parsed once per worker process. All clients also share a single pooled HTTP
+        adapter, so connections to CCH are kept alive and reused between calculations.
         """
-        wsdl_cache = zeep.cache.InMemoryCache()
-        transport = Transport(
-            cache=wsdl_cache,
-            timeout=self.open_timeout,
-            operation_timeout=self.send_timeout,
-        )
-        if self.proxy_url:
-            proxies = {
-                "http": self.proxy_url,
-                "https": self.proxy_url,
-            }
-            transport.session.proxies.update(proxies)
-        client = zeep.Client(
+        return get_client(
             wsdl=self.wsdl,
-            settings=self.client_settings,
-            transport=transport,
+            proxy_url=self.proxy_url,
+            open_timeout=self.open_timeout,
+            send_timeout=self.send_timeout,
+            client_settings=self.client_settings,
+            wsdl_cache_dir=self.wsdl_cache_dir,
+            wsdl_cache_timeout=self.wsdl_cache_timeout,
+            adapter=get_adapter(
+                pool_connections=self.pool_connections,
+                pool_maxsize=self.pool_maxsize,
+                pool_block=self.pool_block,
+                tcp_keepalive=self.tcp_keepalive,
+            ),
         )
-        return client
 
     def apply_taxes(
         self,
         shipping_address: ShippingAddress | None,
         basket: Basket | None = None,
         shipping_charge: ShippingCharge | None = None,
-    ) -> CompoundValue | None:
+    ) -> AnyTaxResponse | None:
         """
         Apply taxes to a Basket instance using the given shipping address.
 
@@ -99,22 +198,127 @@ class CCHTaxCalculator:
         :param shipping_address: :class:`ShippingAddress <oscar.apps.order.models.ShippingAddress>` instance
         :param basket: :class:`Basket <oscar.apps.basket.models.Basket>` instance
         :param shipping_charge: :class:`ShippingCharge <oscarcch.prices.ShippingCharge>` instance
-        :return: SOAP Response.
+        :return: SOAP Response, or ``None`` if taxes couldn't be calculated or there was nothing to tax (see
+            :func:`has_taxable_lines`).
         """
-        response: CompoundValue | None = self._get_response(
-            shipping_address, basket, shipping_charge
-        )
+        response: AnyTaxResponse | None = None
+        # Nothing to tax, so there's nothing to ask CCH, and nothing which could fail
+        if self.has_taxable_lines(basket, shipping_charge):
+            if self.stream_responses:
+                return self._apply_taxes_streaming(
+                    shipping_address, basket, shipping_charge
+                )
+            response = self._get_response(shipping_address, basket, shipping_charge)
+        return self._process_response(response, basket, shipping_charge)
+
+    def has_taxable_lines(
+        self,
+        basket: Basket | None,
+        shipping_charge: ShippingCharge | None = None,
+    ) -> bool:
+        """
+        Return whether the basket or shipping charge has any lines for CCH to tax.
+
+        When there are none, :func:`apply_taxes` applies zero tax without calling CCH, and returns ``None``. Use
+        this method to tell that case apart from a failed calculation.
+
+        :param basket: :class:`Basket <oscar.apps.basket.models.Basket>` instance
+        :param shipping_charge: :class:`ShippingCharge <oscarcch.prices.ShippingCharge>` instance
+        """
+        if basket is not None and self._get_taxable_lines(basket):
+            return True
+        return len(self._get_taxable_shipping_components(shipping_charge)) > 0
+
+    def apply_taxes_many(
+        self,
+        items: Iterable[BatchTaxRequest],
+        max_workers: int | None = None,
+    ) -> list[BatchTaxResult]:
+        """
+        Apply taxes to many baskets at once.
+
+        The CCH orders for every item are built up front, and are then sent to CCH concurrently using a pool of
+        up to ``max_workers`` threads. Each response is applied to its own basket and shipping charge, just as
+        :func:`apply_taxes` would. A failure only affects its own item: it is returned in that item's result
+        rather than raised, and that item's basket and shipping charge receive zero tax.
+
+        :param items: Iterable of ``(shipping_address, basket, shipping_charge)`` tuples
+        :param max_workers: Max number of concurrent requests. Defaults to ``CCH_BATCH_MAX_WORKERS``.
+        :return: List of :class:`BatchTaxResult <oscarcch.calculator.BatchTaxResult>`, in the same order as ``items``.
+        """
+        items = list(items)
+        responses: list[AnyTaxResponse | None] = [None] * len(items)
+        errors: list[Exception | None] = [None] * len(items)
+        cache_keys: list[str | None] = [None] * len(items)
+
+        # Build every order in this thread, since doing so reads from the database.
+        pending: dict[int, types.CCHOrder] = {}
+        for i, (shipping_address, basket, shipping_charge) in enumerate(items):
+            try:
+                if not self.has_taxable_lines(basket, shipping_charge):
+                    continue
+                with self.metrics.time_phase("build"):
+                    order = self._build_order(shipping_address, basket, shipping_charge)
+                if order is None:
+                    continue
+                cache_keys[i] = self._get_response_cache_key(order)
+                responses[i] = self._get_cached_response(cache_keys[i])
+                if responses[i] is None:
+                    pending[i] = order
+            except Exception as e:
+                logger.exception("Failed to build CCH order")
+                errors[i] = e
+
+        # Send the orders which weren't cached to CCH concurrently
+        if pending:
+            futures: dict[int, Future[AnyTaxResponse]] = {}
+            num_workers = min(max_workers or self.batch_max_workers, len(pending))
+            with ThreadPoolExecutor(max_workers=num_workers) as executor:
+                for i, order in pending.items():
+                    futures[i] = executor.submit(self._send_order_with_retries, order)
+            for i, future in futures.items():
+                try:
+                    responses[i] = future.result()
+                    self._set_cached_response(cache_keys[i], responses[i])
+                except Exception as e:
+                    logger.exception("Failed to fetch CCH tax data")
+                    errors[i] = e
 
+        # Apply each response to its own basket
+        results: list[BatchTaxResult] = []
+        for i, (_, basket, shipping_charge) in enumerate(items):
+            response = responses[i]
+            error = errors[i]
+            if response is not None:
+                error = self._get_response_error(response)
+            try:
+                response = self._process_response(response, basket, shipping_charge)
+            except Exception as e:
+                logger.exception("Failed to apply CCH tax data")
+                response = None
+                error = e
+            results.append(BatchTaxResult(response=response, error=error))
+        return results
+
+    def _process_response(
+        self,
+        response: AnyTaxResponse | None,
+        basket: Basket | None,
+        shipping_charge: ShippingCharge | None,
+    ) -> AnyTaxResponse | None:
+        """Validate a CalculateRequest response and apply its taxes to the basket and shipping charge"""
         # Check the response for errors
         respOK = self._check_response_messages(response)
         if not respOK:
             response = None
 
         # Build map of line IDs to line tax details
-        cch_line_map: dict[str, CompoundValue] = {}
-        if response and response.LineItemTaxes:
+        cch_line_map: dict[str, AnyLineItemTax] = {}
+        if response:
             cch_line_map = {
-                item.ID: item for item in response.LineItemTaxes.LineItemTax
+                item.ID: item
+                for item in get_line_item_taxes(response)
+                if item.ID is not None
             }
 
         # Apply taxes to line items
@@ -130,10 +334,101 @@ class CCHTaxCalculator:
         # Return CCH response
         return response
 
+    def _apply_taxes_streaming(
+        self,
+        shipping_address: ShippingAddress | None,
+        basket: Basket | None,
+        shipping_charge: ShippingCharge | None,
+    ) -> TaxResponse | None:
+        """Fetch CCH tax data for the given basket, applying each line's taxes as soon as they've been read"""
+        response = None
+        miscalculations: list[RuntimeError] = []
+        try:
+            with self.metrics.time_phase("build"):
+                order = self._build_order(shipping_address, basket, shipping_charge)
+            if order is not None:
+                response = self._call_with_retries(
+                    self._send_order_streaming,
+                    order,
+                    self._get_taxable_prices(basket, shipping_charge),
+                    miscalculations,
+                )
+        except pybreaker.CircuitBreakerError as e:
+            logger.warning("Not fetching CCH tax data: %s", e)
+        except Exception:
+            logger.exception("Failed to fetch CCH tax data")
+        # Messages come after the line items, so undo the taxes applied from a response which turns out to be an error
+        if response is None or not self._check_response_messages(response):
+            self._process_response(None, basket, shipping_charge)
+            return None
+        # Raised outside of the breaker and retries, just like when the response isn't streamed
+        if miscalculations:
+            raise miscalculations[0]
+        return response
+
+    def _get_taxable_prices(
+        self,
+        basket: Basket | None,
+        shipping_charge: ShippingCharge | None,
+    ) -> dict[str, tuple[TaxablePrice, int]]:
+        """Return the price and quantity of each basket line and shipping charge component, keyed by CCH line ID"""
+        prices: dict[str, tuple[TaxablePrice, int]] = {}
+        if basket is not None:
+            for line in basket.all_lines():
+                price = line.purchase_info.price
+                if isinstance(price, TaxablePrice):
+                    prices[str(line.id)] = (price, line.quantity)
+        if shipping_charge is not None:
+            for shipping_charge_component in shipping_charge.components:
+                prices[shipping_charge_component.cch_line_id] = (
+                    shipping_charge_component,
+                    1,
+                )
+        return prices
+
+    def get_tax_rates(
+        self,
+        address: types.CCHAddress,
+        sku: str,
+        product_group: str = "",
+        product_item: str = "",
+    ) -> CompoundValue:
+        """
+        Fetch the tax rates CCH would apply to the given product tax code at the given address.
+
+        Pass return value of this method to :func:`JurisdictionTaxRate.save_rates <oscarcch.models.JurisdictionTaxRate.save_rates>`
+        to store the rates for use by :class:`EstimatingTaxCalculator <oscarcch.calculator.EstimatingTaxCalculator>`.
+
+        :param address: Address of the jurisdiction, as built by :func:`_build_address`
+        :param sku: CCH SKU
+        :param product_group: CCH product group code
+        :param product_item: CCH product item code
+        :return: SOAP Response.
+        :raises CCHError: if CCH reports an error
+        """
+        response: CompoundValue = self.client.service.GetTaxRates(
+            request={
+                "Address": address,
+                "CustomerType": settings.CCH_CUSTOMER_TYPE,
+                "DivisionId": self.divsion_id,
+                "EffectiveDate": datetime.now(settings.CCH_TIME_ZONE),
+                "EntityId": self.entity_id,
+                "Group": product_group,
+                "Item": product_item,
+                "ProviderType": settings.CCH_PROVIDER_TYPE,
+                "SKU": sku,
+                "TransactionType": settings.CCH_TRANSACTION_TYPE,
+            }
+        )
+        exc = self._get_response_error(response)
+        if exc is not None:
+            raise exc
+        return response
+
     def _apply_taxes_to_basket(
         self,
         basket: Basket,
-        cch_line_map: dict[str, CompoundValue],
+        cch_line_map: dict[str, AnyLineItemTax],
     ) -> None:
         """Apply tax data from CCH response to each basket line's price.
 
@@ -148,7 +443,7 @@ class CCHTaxCalculator:
 
     def _apply_taxes_to_price(
         self,
-        taxes: CompoundValue | None,
+        taxes: AnyLineItemTax | None,
         price: TaxablePrice,
         quantity: int,
     ) -> None:
@@ -159,18 +454,20 @@ class CCHTaxCalculator:
         # derive the per-unit taxes before applying them.
         price.clear_taxes()
         if taxes:
-            for tax in taxes.TaxDetails.TaxDetail:
-                unit_fee = Decimal(str(tax.FeeApplied)) / quantity
-                unit_tax = Decimal(str(tax.TaxApplied)) / quantity
-                price.add_tax(
-                    authority_name=tax.AuthorityName,
-                    tax_name=tax.TaxName,
-                    tax_applied=unit_tax,
-                    fee_applied=unit_fee,
+            price.add_taxes(
+                (
+                    tax.AuthorityName or "",
+                    tax.TaxName or "",
+                    Decimal(str(tax.TaxApplied)) / quantity,
+                    Decimal(str(tax.FeeApplied)) / quantity,
                 )
+                for tax in get_tax_details(taxes)
+            )
             # Check our work and make sure the total we arrived at matches the total CCH gave us
             total_line_tax = (price.tax * quantity).quantize(self.precision)
-            total_applied_tax = Decimal(taxes.TotalTaxApplied).quantize(self.precision)
+            total_applied_tax = Decimal(taxes.TotalTaxApplied or 0).quantize(
+                self.precision
+            )
             if total_applied_tax != total_line_tax:
                 raise RuntimeError(
                     "Taxation miscalculation occurred! "
@@ -185,58 +482,493 @@ class CCHTaxCalculator:
         shipping_address: ShippingAddress | None,
         basket: Basket | None,
         shipping_charge: ShippingCharge | None,
-    ) -> CompoundValue | None:
+    ) -> AnyTaxResponse | None:
         """Fetch CCH tax data for the given basket and shipping address"""
         response = None
-        retry_count = 0
-        while response is None and retry_count <= self.max_retries:
-            response = self._get_response_inner(
-                shipping_address, basket, shipping_charge, retry_count=retry_count
-            )
-            retry_count += 1
+        try:
+            with self.metrics.time_phase("build"):
+                order = self._build_order(shipping_address, basket, shipping_charge)
+            if order is None:
+                return None
+            # Serve repeated calculations of the same order from the cache, even when the breaker is open.
+            cache_key = self._get_response_cache_key(order)
+            response = self._get_cached_response(cache_key)
+            if response is None:
+                if self.incremental_recalculation and not order["finalize"]:
+                    response = self._send_order_incremental(order)
+                else:
+                    response = self._send_order_with_retries(order)
+                self._set_cached_response(cache_key, response)
+        except pybreaker.CircuitBreakerError as e:
+            # Failing fast is expected while the breaker is open, so don't log a traceback for every request.
+            logger.warning("Not fetching CCH tax data: %s", e)
+        except Exception:
+            logger.exception("Failed to fetch CCH tax data")
         return response
 
-    def _get_response_inner(
+    def _send_order(self, order: types.CCHOrder) -> AnyTaxResponse:
+        """Send an order to CCH, through the circuit breaker if there is one"""
+        # The breaker wraps the hedged call as a whole, so that a hedge counts as a single call, and isn't held up
+        # by the lock a plain ``pybreaker.CircuitBreaker`` holds for the duration of the first request.
+        return self._call_breaker(self._send_order_without_breaker, order)
+
+    def _call_breaker(self, func: Callable[..., _ResponseT], *args: Any) -> _ResponseT:
+        """Call ``func(*args)`` through the circuit breaker if there is one"""
+        if self.breaker is not None:
+            return self.breaker.call(func, *args)
+        return func(*args)
+
+    def _send_order_without_breaker(self, order: types.CCHOrder) -> AnyTaxResponse:
+        """Send an order to CCH, hedging the request if it's slow and hedging is enabled"""
+
+        def _call_service(order: types.CCHOrder) -> AnyTaxResponse:
+            self.metrics.observe_line_count(len(order["LineItems"]["LineItem"]))
+            serializer = (
+                get_request_serializer(self.client)
+                if self.precompile_requests
+                else None
+            )
+            if serializer is None and not self.parse_raw_responses:
+                # zeep serializes the request while sending it, so the network phase includes serializing it.
+                with measure_soap_call(self.metrics):
+                    response: CompoundValue = self.client.service.CalculateRequest(
+                        self.entity_id,
+                        self.divsion_id,
+                        order,
+                    )
+                return response
+            http_response = self._post_order(order, serializer)
+            self._observe_payload_sizes(http_response, len(http_response.content))
+            with self.metrics.time_phase("parse"):
+                if self.parse_raw_responses:
+                    return parse_calculate_response(
+                        http_response.content, http_response.status_code
+                    )
+                assert serializer is not None
+                return serializer.process_reply(http_response)
+
+        # Never hedge finalized transactions, since CCH would record each copy of the request.
+        if self.hedge_requests and not order["finalize"]:
+            return self.hedging_policy.call(
+                _call_service,
+                order,
+                is_valid=lambda response: self._get_response_error(response) is None,
+            )
+        return _call_service(order)
+
+    def _send_order_streaming(
         self,
-        shipping_address: ShippingAddress | None,
-        basket: Basket | None,
-        shipping_charge: ShippingCharge | None,
-        retry_count: int,
-    ) -> CompoundValue | None:
-        response = None
+        order: types.CCHOrder,
+        prices: dict[str, tuple[TaxablePrice, int]],
+        miscalculations: list[RuntimeError],
+    ) -> TaxResponse:
+        """
+        Send an order to CCH, through the circuit breaker if there is one, applying the taxes of each line of the
+        response to its price as soon as they've been read.
 
-        def _call_service() -> CompoundValue | None:
-            order = self._build_order(shipping_address, basket, shipping_charge)
-            if order is None:
-                return None
-            response = self.client.service.CalculateRequest(
+        A line whose taxes don't add up isn't a failure of CCH, so rather than failing the call, its error is added
+        to ``miscalculations``, and no more taxes are applied.
+        """
+
+        def _call_service(order: types.CCHOrder) -> TaxResponse:
+            applied: set[str] = set()
+            # Only report the miscalculations of the last attempt
+            miscalculations.clear()
+
+            def _apply(taxes: LineItemTax) -> None:
+                if taxes.ID in prices and not miscalculations:
+                    try:
+                        self._apply_taxes_to_price(taxes, *prices[taxes.ID])
+                    except RuntimeError as e:
+                        miscalculations.append(e)
+                    applied.add(taxes.ID)
+
+            self.metrics.observe_line_count(len(order["LineItems"]["LineItem"]))
+            # Only the precompiled serializer can stream the response, so it's always used if it's supported
+            serializer = get_request_serializer(self.client)
+            http_response = self._post_order(
+                order, serializer, stream=serializer is not None
+            )
+            body: IO[bytes]
+            if serializer is not None:
+                http_response.raw.decode_content = True
+                body = http_response.raw
+            else:
+                body = io.BytesIO(http_response.content)
+            with http_response, self.metrics.time_phase("parse"):
+                response = stream_calculate_response(
+                    body, _apply, http_response.status_code
+                )
+                self._observe_payload_sizes(http_response, body.tell())
+            # Lines for which CCH returned no taxes are tax free
+            for line_id, (price, quantity) in prices.items():
+                if line_id not in applied and not miscalculations:
+                    self._apply_taxes_to_price(None, price, quantity)
+            return response
+
+        if self.breaker is not None:
+            return self.breaker.call(_call_service, order)
+        return _call_service(order)
+
+    def _post_order(
+        self,
+        order: types.CCHOrder,
+        serializer: CalculateRequestSerializer | None,
+        stream: bool = False,
+    ) -> requests.Response:
+        """
+        Send an order to CCH, and return the raw HTTP response.
+
+        The request is written by the given precompiled serializer, or by zeep if there's none. When streaming, the
+        response's body is left to be read from ``response.raw``.
+        """
+        if serializer is not None:
+            with self.metrics.time_phase("serialize"):
+                message = serializer.serialize(self.entity_id, self.divsion_id, order)
+            with self.metrics.time_phase("network"):
+                return serializer.post(message, stream=stream)
+        # zeep serializes the request while sending it, so it can't be timed separately. Client settings are
+        # thread-local, so this doesn't affect other threads sharing the client.
+        with (
+            self.metrics.time_phase("network"),
+            self.client.settings(raw_response=True),
+        ):
+            http_response: requests.Response = self.client.service.CalculateRequest(
                 self.entity_id,
                 self.divsion_id,
                 order,
             )
+        return http_response
+
+    def _observe_payload_sizes(
+        self, http_response: requests.Response, response_size: int
+    ) -> None:
+        """Record the sizes of a request sent to CCH and of its response"""
+        body = http_response.request.body if http_response.request else None
+        if isinstance(body, bytes | str):
+            self.metrics.observe_payload_size("request", len(body))
+        self.metrics.observe_payload_size("response", response_size)
+
+    def _send_order_with_retries(self, order: types.CCHOrder) -> AnyTaxResponse:
+        """Send an order to CCH, retrying transient failures according to the retry policy"""
+        chunks = self._split_order(order)
+        if len(chunks) > 1:
+            # Send every part within a single call through the breaker, so that a plain
+            # ``pybreaker.CircuitBreaker``, which holds its lock for the duration of each call, doesn't serialize them.
+            return self._call_breaker(self._send_order_chunks, chunks)
+        return self._call_with_retries(self._send_order, order)
+
+    def _call_with_retries(
+        self, func: Callable[..., _ResponseT], *args: Any
+    ) -> _ResponseT:
+        """
+        Call ``func(*args)`` to send an order to CCH, retrying transient failures according to the retry policy.
+
+        CCH reports its errors in the messages of a response, so a response reporting a system error is raised,
+        to be retried like any other transient failure. If the last attempt still reports one, its response is
+        returned, to be handled like any other response reporting an error.
+        """
+
+        def _call(*args: Any) -> _ResponseT:
+            response = func(*args)
+            self._raise_system_error(response)
             return response
 
         try:
-            if self.breaker is not None:
-                response = self.breaker.call(_call_service)
+            return self.retry_policy.call(_call, *args)
+        except exceptions.CCHSystemError as e:
+            if e.response is None:
+                raise
+            return cast(_ResponseT, e.response)
+
+    def _raise_system_error(self, response: AnyTaxResponse) -> None:
+        """Raise the error reported by the response's messages, if it's a system error"""
+        error = self._get_response_error(response)
+        if isinstance(error, exceptions.CCHSystemError):
+            error.response = response
+            raise error
+
+    def _split_order(self, order: types.CCHOrder) -> list[types.CCHOrder]:
+        """
+        Split an order into orders of at most ``split_order_lines`` line items each.
+
+        Shipping charge components all go in the first order. Finalized transactions are never split, since CCH
+        would record each part as a separate transaction.
+        """
+        items = order["LineItems"]["LineItem"]
+        max_lines = self.split_order_lines
+        if max_lines <= 0 or len(items) <= max_lines or order["finalize"]:
+            return [order]
+        shipping_items = []
+        basket_items = []
+        for item in items:
+            if ShippingChargeComponent.is_cch_shipping_line(str(item["ID"])):
+                shipping_items.append(item)
             else:
-                response = _call_service()
-        except Exception:
-            logger.exception("Failed to fetch CCH tax data")
+                basket_items.append(item)
+        first_len = max(0, max_lines - len(shipping_items))
+        item_chunks = [shipping_items + basket_items[:first_len]]
+        for start in range(first_len, len(basket_items), max_lines):
+            item_chunks.append(basket_items[start : start + max_lines])
+        chunks = []
+        for chunk_items in item_chunks:
+            chunk = types.CCHOrder(**order)
+            chunk["LineItems"] = types.CCHLineItems(LineItem=chunk_items)
+            chunks.append(chunk)
+        return chunks
+
+    def _send_order_chunks(self, chunks: list[types.CCHOrder]) -> AnyTaxResponse:
+        """
+        Send the parts of a split order to CCH concurrently, and merge their responses into one.
+
+        The merged response reports the transaction ID and status of the first part, which holds the shipping
+        charge components, and the sum of the taxes of all parts. If any part fails, or its response reports an
+        error, the whole order does. Each part is retried on its own, but isn't sent through the circuit breaker.
+        """
+        num_workers = min(self.batch_max_workers, len(chunks))
+        with ThreadPoolExecutor(
+            max_workers=num_workers, thread_name_prefix="oscarcch-split"
+        ) as executor:
+            # Run each part in a copy of the caller's context, so that e.g. the deadline of an enclosing retry applies
+            futures = [
+                executor.submit(
+                    copy_context().run,
+                    self._call_with_retries,
+                    self._send_order_without_breaker,
+                    chunk,
+                )
+                for chunk in chunks
+            ]
+            responses = [future.result() for future in futures]
+        for response in responses:
+            if self._get_response_error(response) is not None:
+                return response
+
+        parts = [self.serialize_response(response) for response in responses]
+        line_taxes: list[dict[str, Any]] = []
+        messages: list[dict[str, Any]] = []
+        for part in parts:
+            line_taxes.extend((part["LineItemTaxes"] or {}).get("LineItemTax") or [])
+            for message in (part["Messages"] or {}).get("Message") or []:
+                # Every part reports the same informational messages
+                if message not in messages:
+                    messages.append(message)
+        data = {
+            **parts[0],
+            "LineItemTaxes": {"LineItemTax": line_taxes},
+            "Messages": {"Message": messages},
+            "TotalTaxApplied": sum(
+                (Decimal(str(part["TotalTaxApplied"])) for part in parts),
+                Decimal(0),
+            ),
+        }
+        return self.deserialize_response(data)
+
+    def _send_order_incremental(self, order: types.CCHOrder) -> AnyTaxResponse:
+        """
+        Send only the line items of an order whose taxes aren't already known to CCH.
+
+        The taxes CCH returns for each line item are remembered, keyed by a fingerprint of the line item and the
+        rest of the order (addresses, customer type, etc), but not of the line's ID. CCH decides whether shipping is
+        taxable from the goods it's shipped with, so shipping charge components are also keyed by the goods, and
+        whenever one of them is sent, every line item is sent along with it. When the same order is recalculated
+        with, say, a different quantity of one of its lines, only the changed line items are sent, and the taxes of
+        the other lines are filled back in from the cache, so that the line taxes and totals are just like those of
+        a response to the full order.
+
+        The rest of the response (transaction ID and status, and messages) is only reused from the cache for the
+        exact same order. Otherwise, it's the response to the request which was sent, which may only have held the
+        changed line items, so responses calculated incrementally mustn't be saved as the order's taxation.
+        """
+        cache = caches[self.response_cache_alias]
+        items = order["LineItems"]["LineItem"]
+        line_keys = {
+            str(item["ID"]): self._get_line_result_cache_key(order, item)
+            for item in items
+        }
+        envelope_key = self._get_line_result_cache_key(order, None)
+        cached = cache.get_many([*line_keys.values(), envelope_key])
+        pending = [item for item in items if line_keys[str(item["ID"])] not in cached]
+
+        envelope = cached.get(envelope_key)
+        if pending or envelope is None:
+            pending_ids = {str(item["ID"]) for item in pending}
+            if not pending:
+                # Only the transaction isn't known, so send the whole order
+                sent = items
+            elif any(
+                ShippingChargeComponent.is_cch_shipping_line(line_id)
+                for line_id in pending_ids
+            ):
+                # CCH decides whether shipping is taxable from the goods it's shipped with
+                sent = [
+                    item
+                    for item in items
+                    if str(item["ID"]) in pending_ids
+                    or not ShippingChargeComponent.is_cch_shipping_line(str(item["ID"]))
+                ]
+            else:
+                sent = pending
+            partial_order = types.CCHOrder(**order)
+            partial_order["LineItems"] = types.CCHLineItems(LineItem=sent)
+            response = self._send_order_with_retries(partial_order)
+            if self._get_response_error(response) is not None:
+                return response
+            data = self.serialize_response(response)
+            fresh = {
+                str(tax["ID"]): tax
+                for tax in (data["LineItemTaxes"] or {}).get("LineItemTax") or []
+            }
+            # CCH omits lines which aren't taxed at all, so remember those as having no taxes.
+            results = {
+                line_keys[str(item["ID"])]: fresh.get(str(item["ID"]), {})
+                for item in partial_order["LineItems"]["LineItem"]
+            }
+            envelope = {
+                key: value
+                for key, value in data.items()
+                if key not in ("LineItemTaxes", "TotalTaxApplied")
+            }
+            # Only remember the transaction of a request which held the whole order
+            if len(partial_order["LineItems"]["LineItem"]) == len(items):
+                results[envelope_key] = envelope
+            cache.set_many(results, self.line_result_cache_timeout)
+            cached.update(results)
+
+        # Rebuild the full response, in the same order as the line items
+        line_taxes = []
+        for line_id, key in line_keys.items():
+            tax = cached[key]
+            if tax:
+                line_taxes.append({**tax, "ID": line_id})
+        data = {
+            **envelope,
+            "LineItemTaxes": {"LineItemTax": line_taxes},
+            "TotalTaxApplied": sum(
+                (Decimal(str(tax["TotalTaxApplied"])) for tax in line_taxes),
+                Decimal(0),
+            ),
+        }
+        return self.deserialize_response(data)
+
+    def _get_line_result_cache_key(
+        self,
+        order: types.CCHOrder,
+        item: types.CCHLineItem | None,
+    ) -> str:
+        """
+        Return the key under which the taxes of the given line item of the order are cached, or, if ``item`` is
+        ``None``, the key under which the rest of the response to the order is cached.
+        """
+        payload: dict[str, Any] = {
+            key: value
+            for key, value in order.items()
+            if key not in ("InvoiceDate", "LineItems")
+        }
+        payload["EntityID"] = self.entity_id
+        payload["DivisionID"] = self.divsion_id
+        if item is None:
+            # The transaction belongs to the exact line items sent
+            payload["LineItems"] = order["LineItems"]
+        else:
+            payload["LineItem"] = {
+                key: value for key, value in item.items() if key != "ID"
+            }
+            if ShippingChargeComponent.is_cch_shipping_line(str(item["ID"])):
+                payload["Goods"] = [
+                    {key: value for key, value in other.items() if key != "ID"}
+                    for other in order["LineItems"]["LineItem"]
+                    if not ShippingChargeComponent.is_cch_shipping_line(
+                        str(other["ID"])
+                    )
+                ]
+        return f"oscarcch:LineItemTax:{make_tax_fingerprint(payload)}"
+
+    def _get_response_cache_key(self, order: types.CCHOrder) -> str | None:
+        """
+        Return the key under which the response for the given order is cached, or ``None`` if the response for
+        this order must not be cached.
+
+        The key is a hash of every field sent to CCH except ``InvoiceDate``, so that recalculating taxes for an
+        unchanged basket and address produces the same key.
+        """
+        if self.response_cache_timeout <= 0 or order["finalize"]:
+            return None
+        payload = {key: value for key, value in order.items() if key != "InvoiceDate"}
+        payload["EntityID"] = self.entity_id
+        payload["DivisionID"] = self.divsion_id
+        return f"oscarcch:CalculateRequest:{make_tax_fingerprint(payload)}"
+
+    def _get_cached_response(self, cache_key: str | None) -> AnyTaxResponse | None:
+        if cache_key is None:
+            return None
+        data = caches[self.response_cache_alias].get(cache_key)
+        if data is None:
+            return None
+        # Rebuild the response object, so that callers can't tell a cache hit from a live response.
+        return self.deserialize_response(data)
+
+    def _set_cached_response(
+        self,
+        cache_key: str | None,
+        response: AnyTaxResponse | None,
+    ) -> None:
+        if cache_key is None or response is None:
+            return
+        # Never cache a response that reported errors
+        if self._get_response_error(response) is not None:
+            return
+        data = self.serialize_response(response)
+        caches[self.response_cache_alias].set(
+            cache_key, data, self.response_cache_timeout
+        )
+
+    def serialize_response(self, response: AnyTaxResponse) -> dict[str, Any]:
+        """
+        Convert a CalculateRequest response into plain Python data, suitable for caching or storing.
+
+        :param response: SOAP Response, as returned by :func:`apply_taxes`
+        :return: Nested dictionaries and lists
+        """
+        data: dict[str, Any] = serialize_object(response)
+        return data
+
+    def deserialize_response(self, data: dict[str, Any]) -> AnyTaxResponse:
+        """
+        Rebuild a CalculateRequest response from the output of :func:`serialize_response`.
+
+        :param data: Serialized response
+        :return: SOAP Response, or a :class:`TaxResponse <oscarcch.responses.TaxResponse>` when
+            ``parse_raw_responses`` is enabled.
+        """
+        if self.parse_raw_responses:
+            return TaxResponse.from_dict(data)
+        response_type = self.client.get_type(self.response_type_name)
+        response: CompoundValue = response_type(**data)
         return response
 
-    def _check_response_messages(self, response: CompoundValue | None) -> bool:
+    def _check_response_messages(self, response: AnyTaxResponse | None) -> bool:
         """Raise an exception if response messages contains any reported errors."""
         if response is None:
             return False
-        if response.Messages:
-            for message in response.Messages.Message:
-                if message.Code > 0:
-                    exc = exceptions.build(message.Severity, message.Code, message.Info)
-                    logger.exception(exc)
-                    return False
+        exc = self._get_response_error(response)
+        if exc is not None:
+            self.metrics.record_response_error(exc)
+            logger.exception(exc)
+            return False
         return True
 
+    def _get_response_error(
+        self, response: AnyTaxResponse
+    ) -> exceptions.CCHError | None:
+        """Return an exception describing the first error reported in the response messages, if any."""
+        for message in get_messages(response):
+            if message.Code is not None and message.Code > 0:
+                return exceptions.build(
+                    message.Severity or 0, message.Code, message.Info or ""
+                )
+        return None
+
     def _build_order(
         self,
         shipping_address: ShippingAddress | None,
@@ -244,6 +976,14 @@ class CCHTaxCalculator:
         shipping_charge: ShippingCharge | None,
     ) -> types.CCHOrder | None:
         """Convert an Oscar Basket and ShippingAddresss into a CCH Order object"""
+        lines = self._get_taxable_lines(basket) if basket is not None else []
+        shipping_charge_components = self._get_taxable_shipping_components(
+            shipping_charge
+        )
+        # Must include at least 1 line item
+        if not lines and not shipping_charge_components:
+            return None
+
         order = types.CCHOrder(
             InvoiceDate=datetime.now(settings.CCH_TIME_ZONE),
             SourceSystem=settings.CCH_SOURCE_SYSTEM,
@@ -258,68 +998,148 @@ class CCHTaxCalculator:
             ),
         )
 
+        # Build each distinct address only once, and share it between all the line items which ship to or from it.
+        ship_to_address = None
+        if shipping_address is not None:
+            ship_to_address = self._build_address(shipping_address)
+        warehouse_addresses: dict[int, types.CCHAddress] = {}
+
         # Add CCH lines for each basket line
-        if basket is not None:
-            for line in basket.all_lines():
-                qty = getattr(line, "cch_quantity", line.quantity)
-                if qty <= 0:
-                    continue
+        if lines:
+            product_data = self._prefetch_line_data(lines)
+            for line in lines:
+                qty = self._get_line_quantity(line)
                 # Line Info
-                line_price = line.line_price_excl_tax_incl_discounts
-                assert line_price is not None
                 item = types.CCHLineItem(
                     ID=line.id,
-                    AvgUnitPrice=Decimal(line_price / qty).quantize(Decimal("0.00001")),
+                    AvgUnitPrice=self._get_line_unit_price(line, qty),
                     Quantity=qty,
                     ExemptionCode=None,
-                    SKU=self._get_product_data("sku", line),
+                    SKU=self._get_product_data("sku", line, product_data),
                     # Product Info
                     ProductInfo=types.CCHProductInfo(
-                        ProductGroup=self._get_product_data("group", line),
-                        ProductItem=self._get_product_data("item", line),
+                        ProductGroup=self._get_product_data(
+                            "group", line, product_data
+                        ),
+                        ProductItem=self._get_product_data("item", line, product_data),
                     ),
                     # Ship From/To Addresses
                     NexusInfo=types.CCHNexusInfo(),
                 )
-                if shipping_address is not None:
-                    item["NexusInfo"]["ShipToAddress"] = self._build_address(
-                        shipping_address
-                    )
+                if ship_to_address is not None:
+                    item["NexusInfo"]["ShipToAddress"] = ship_to_address
                 warehouse = line.stockrecord.partner.primary_address
                 if warehouse:
-                    item["NexusInfo"]["ShipFromAddress"] = self._build_address(
-                        warehouse
-                    )
+                    warehouse_key = warehouse.pk or id(warehouse)
+                    if warehouse_key not in warehouse_addresses:
+                        warehouse_addresses[warehouse_key] = self._build_address(
+                            warehouse
+                        )
+                    item["NexusInfo"]["ShipFromAddress"] = warehouse_addresses[
+                        warehouse_key
+                    ]
                 # Add line to order
                 order["LineItems"]["LineItem"].append(item)
 
         # Add CCH lines for shipping charges
-        if shipping_charge is not None and settings.CCH_SHIPPING_TAXES_ENABLED:
-            for shipping_charge_component in shipping_charge.components:
-                shipping_line = types.CCHLineItem(
-                    ID=shipping_charge_component.cch_line_id,
-                    AvgUnitPrice=shipping_charge_component.excl_tax.quantize(
-                        Decimal("0.00001")
-                    ),
-                    Quantity=1,
-                    ExemptionCode=None,
-                    SKU=shipping_charge_component.cch_sku,
-                    NexusInfo=types.CCHNexusInfo(),
-                )
-                if shipping_address is not None:
-                    shipping_line["NexusInfo"]["ShipToAddress"] = self._build_address(
-                        shipping_address
-                    )
-                # Add shipping line to order
-                order["LineItems"]["LineItem"].append(shipping_line)
-
-        # Must include at least 1 line item
-        if len(order["LineItems"]["LineItem"]) <= 0:
-            return None
+        for shipping_charge_component in shipping_charge_components:
+            shipping_line = types.CCHLineItem(
+                ID=shipping_charge_component.cch_line_id,
+                AvgUnitPrice=shipping_charge_component.excl_tax.quantize(
+                    UNIT_PRICE_PRECISION
+                ),
+                Quantity=1,
+                ExemptionCode=None,
+                SKU=shipping_charge_component.cch_sku,
+                NexusInfo=types.CCHNexusInfo(),
+            )
+            if ship_to_address is not None:
+                shipping_line["NexusInfo"]["ShipToAddress"] = ship_to_address
+            # Add shipping line to order
+            order["LineItems"]["LineItem"].append(shipping_line)
 
         # Return order
         return order
 
+    def _get_taxable_lines(self, basket: Basket) -> list[AbstractLine]:
+        """Return the basket lines to send to CCH"""
+        return [
+            line for line in basket.all_lines() if self._get_line_quantity(line) > 0
+        ]
+
+    def _get_line_quantity(self, line: AbstractLine) -> int:
+        qty: int = getattr(line, "cch_quantity", line.quantity)
+        return qty
+
+    def _get_line_unit_price(self, line: AbstractLine, qty: int) -> Decimal:
+        line_price = line.line_price_excl_tax_incl_discounts
+        assert line_price is not None
+        return Decimal(line_price / qty).quantize(UNIT_PRICE_PRECISION)
+
+    def get_line_tax_fingerprint(
+        self,
+        line: AbstractLine,
+        shipping_address: ShippingAddress | None,
+        product_data: ProductData | None = None,
+    ) -> str:
+        """
+        Return a digest of the fields sent to CCH for the given basket line when shipped to the given address:
+        its ID, quantity, unit price, product tax codes, and ship-to and ship-from addresses.
+
+        Lines with equal fingerprints are taxed identically, so the fingerprints of a basket's lines (plus
+        :func:`ShippingCharge.tax_fingerprint <oscarcch.prices.ShippingCharge.tax_fingerprint>`) can be used to
+        memoize tax calculations without building the CCH order.
+
+        Unless the line's data has been prefetched, reading its product tax codes and its partner's address may
+        query the database. Use :func:`get_line_tax_fingerprints` to fingerprint the lines of a basket in a constant
+        number of queries.
+
+        :param line: Basket line
+        :param shipping_address: :class:`ShippingAddress <oscar.apps.order.models.ShippingAddress>` instance
+        :param product_data: CCH product attribute values prefetched for the line's product
+        """
+        qty = self._get_line_quantity(line)
+        ship_to = self._build_address(shipping_address) if shipping_address else None
+        warehouse = line.stockrecord.partner.primary_address
+        ship_from = self._build_address(warehouse) if warehouse else None
+        return make_tax_fingerprint(
+            line.id,
+            qty,
+            self._get_line_unit_price(line, qty) if qty > 0 else None,
+            self._get_product_data("sku", line, product_data),
+            self._get_product_data("group", line, product_data),
+            self._get_product_data("item", line, product_data),
+            ship_to,
+            ship_from,
+        )
+
+    def get_line_tax_fingerprints(
+        self,
+        lines: Sequence[AbstractLine],
+        shipping_address: ShippingAddress | None,
+    ) -> dict[int, str]:
+        """
+        Return the :func:`get_line_tax_fingerprint` of each of the given basket lines, by line ID, prefetching the
+        data they need in a constant number of queries, just like when building the CCH order.
+
+        :param lines: Basket lines
+        :param shipping_address: :class:`ShippingAddress <oscar.apps.order.models.ShippingAddress>` instance
+        """
+        product_data = self._prefetch_line_data(lines)
+        return {
+            line.id: self.get_line_tax_fingerprint(line, shipping_address, product_data)
+            for line in lines
+        }
+
+    def _get_taxable_shipping_components(
+        self,
+        shipping_charge: ShippingCharge | None,
+    ) -> list[ShippingChargeComponent]:
+        """Return the shipping charge components to send to CCH"""
+        if shipping_charge is None or not settings.CCH_SHIPPING_TAXES_ENABLED:
+            return []
+        return list(shipping_charge.components)
+
     def _build_address(
         self,
         oscar_address: ShippingAddress | PartnerAddress,
@@ -336,13 +1156,76 @@ class CCHTaxCalculator:
         )
         return addr
 
+    def _prefetch_line_data(self, lines: Sequence[AbstractLine]) -> ProductData:
+        """
+        Load everything needed to build the CCH line items for the given basket lines in a constant number of
+        queries, rather than several queries per line.
+
+        Partners and their addresses are prefetched onto the lines' stockrecords, so that ``primary_address``
+        doesn't need to query, and stockrecords and product classes are prefetched onto products whose prices
+        haven't been looked up yet. The ``cch_product_*`` attribute values of the lines' products (and of their
+        parents) are loaded in a single query.
+
+        :return: Map of product IDs to the CCH product attribute values which apply to them
+        """
+        ProductAttributeValue = get_model("catalogue", "ProductAttributeValue")
+
+        stockrecords = [line.stockrecord for line in lines if line.stockrecord]
+        prefetch_related_objects(stockrecords, "partner__addresses__country")
+
+        # Lines whose prices haven't been looked up yet will ask the strategy to select a stockrecord for them.
+        unpriced_products = [
+            line.product
+            for line in lines
+            if line.product and not hasattr(line, "_info")
+        ]
+        prefetch_related_objects(
+            unpriced_products,
+            "stockrecords",
+            "product_class",
+            "parent__product_class",
+        )
+
+        # Products whose attributes have already been loaded can be read directly, without querying again.
+        products = [
+            line.product
+            for line in lines
+            if line.product and not line.product.attr.initialized
+        ]
+        if not products:
+            return {}
+        product_ids = {product.pk for product in products}
+        product_ids |= {product.parent_id for product in products if product.parent_id}
+        values: dict[int, dict[str, str]] = defaultdict(dict)
+        attribute_values = ProductAttributeValue.objects.filter(
+            product_id__in=product_ids,
+            attribute__code__in=[
+                "cch_product_sku",
+                "cch_product_group",
+                "cch_product_item",
+            ],
+        ).select_related("attribute", "value_option")
+        for attribute_value in attribute_values:
+            values[attribute_value.product_id][attribute_value.attribute.code] = (
+                attribute_value.value
+            )
+        # Child products inherit their parent's values, unless they override them.
+        return {
+            product.pk: (values.get(product.parent_id, {}) if product.parent_id else {})
+            | values.get(product.pk, {})
+            for product in products
+        }
+
     def _get_product_data(
         self,
         key: str,
         line: AbstractLine,
+        product_data: ProductData | None = None,
     ) -> str:
         key = f"cch_product_{key}"
         sku = getattr(settings, key.upper())
+        if product_data is not None and line.product_id in product_data:
+            return product_data[line.product_id].get(key, sku)
         sku = getattr(line.product.attr, key.lower(), sku)
         return sku
 
@@ -354,3 +1237,247 @@ class CCHTaxCalculator:
         if len(raw_postcode) == POSTCODE_LEN + PLUS4_LEN + 1:
             plus4 = raw_postcode[POSTCODE_LEN + 1 :]
         return postcode, plus4
+
+
+class AsyncCCHTaxCalculator(CCHTaxCalculator):
+    """
+    asyncio version of :class:`CCHTaxCalculator`, for ASGI deployments.
+
+    SOAP calls are sent using zeep's :class:`AsyncClient <zeep.AsyncClient>` over httpx, so waiting on CCH neither
+    blocks the event loop nor ties up a thread. Retries, the optional circuit breaker, the response cache, and
+    response validation all behave just like they do in :class:`CCHTaxCalculator`. Requires the ``async`` extra.
+    """
+
+    async def get_async_client(self) -> zeep.AsyncClient:
+        """
+        Return a zeep asyncio SOAP client
+
+        Clients are shared between all calculators with the same connection settings on the running event loop,
+        and reuse the WSDL parsed by :attr:`client`.
+        """
+        # Building the shared sync client may need to fetch and parse the WSDL, so keep it off the event loop.
+        client = await sync_to_async(lambda: self.client, thread_sensitive=False)()
+        return get_async_client(
+            client=client,
+            proxy_url=self.proxy_url,
+            send_timeout=self.send_timeout,
+        )
+
+    async def apply_taxes(  # type: ignore[override]
+        self,
+        shipping_address: ShippingAddress | None,
+        basket: Basket | None = None,
+        shipping_charge: ShippingCharge | None = None,
+    ) -> AnyTaxResponse | None:
+        """
+        Apply taxes to a Basket instance using the given shipping address.
+
+        See :func:`CCHTaxCalculator.apply_taxes`.
+
+        :param shipping_address: :class:`ShippingAddress <oscar.apps.order.models.ShippingAddress>` instance
+        :param basket: :class:`Basket <oscar.apps.basket.models.Basket>` instance
+        :param shipping_charge: :class:`ShippingCharge <oscarcch.prices.ShippingCharge>` instance
+        :return: SOAP Response.
+        """
+        response = None
+        # Listing the basket's lines may hit the database, so check for taxable lines in the sync thread.
+        if await sync_to_async(self.has_taxable_lines)(basket, shipping_charge):
+            response = await self._get_response_async(
+                shipping_address, basket, shipping_charge
+            )
+        return await sync_to_async(self._process_response)(
+            response, basket, shipping_charge
+        )
+
+    async def _get_response_async(
+        self,
+        shipping_address: ShippingAddress | None,
+        basket: Basket | None,
+        shipping_charge: ShippingCharge | None,
+    ) -> AnyTaxResponse | None:
+        """Fetch CCH tax data for the given basket and shipping address"""
+        response = None
+        try:
+            # Building the order and reading the cache may hit the database, so run them in the sync thread.
+            with self.metrics.time_phase("build"):
+                order = await sync_to_async(self._build_order)(
+                    shipping_address, basket, shipping_charge
+                )
+            if order is None:
+                return None
+            cache_key = self._get_response_cache_key(order)
+            response = await sync_to_async(self._get_cached_response)(cache_key)
+            if response is None:
+                response = await self._call_with_retries_async(
+                    self._send_order_async, order
+                )
+                await sync_to_async(self._set_cached_response)(cache_key, response)
+        except pybreaker.CircuitBreakerError as e:
+            logger.warning("Not fetching CCH tax data: %s", e)
+        except Exception:
+            logger.exception("Failed to fetch CCH tax data")
+        return response
+
+    async def _call_with_retries_async(
+        self, func: Callable[..., Awaitable[AnyTaxResponse]], *args: Any
+    ) -> AnyTaxResponse:
+        """Await ``func(*args)`` to send an order to CCH, retrying it like :func:`_call_with_retries`"""
+
+        async def _call(*args: Any) -> AnyTaxResponse:
+            response = await func(*args)
+            self._raise_system_error(response)
+            return response
+
+        try:
+            return await self.retry_policy.call_async(_call, *args)
+        except exceptions.CCHSystemError as e:
+            if e.response is None:
+                raise
+            return cast(AnyTaxResponse, e.response)
+
+    async def _send_order_async(self, order: types.CCHOrder) -> AnyTaxResponse:
+        """Send an order to CCH, through the circuit breaker if there is one"""
+
+        async def _call_service(order: types.CCHOrder) -> AnyTaxResponse:
+            self.metrics.observe_line_count(len(order["LineItems"]["LineItem"]))
+            client = await self.get_async_client()
+            response = await client.service.CalculateRequest(
+                self.entity_id,
+                self.divsion_id,
+                order,
+            )
+            return response
+
+        if self.breaker is not None:
+            # pybreaker's context manager records any failure raised while awaiting inside the block.
+            with self.breaker.calling():
+                return await _call_service(order)
+        return await _call_service(order)
+
+
+class EstimatingTaxCalculator(CCHTaxCalculator):
+    """
+    Estimate taxes from the local rate table populated by the ``cch_sync_tax_rates`` management command, without
+    calling CCH.
+
+    Intended for basket previews and estimated tax displays. Since no CCH transaction is created,
+    :func:`apply_taxes` always returns ``None``; use :class:`CCHTaxCalculator` to calculate the taxes recorded
+    against an order. Prices for which no local rates are known receive zero tax, just as they would if a live
+    calculation failed.
+    """
+
+    def apply_taxes(
+        self,
+        shipping_address: ShippingAddress | None,
+        basket: Basket | None = None,
+        shipping_charge: ShippingCharge | None = None,
+    ) -> None:
+        """
+        Apply estimated taxes to a Basket instance using the given shipping address.
+
+        :param shipping_address: :class:`ShippingAddress <oscar.apps.order.models.ShippingAddress>` instance
+        :param basket: :class:`Basket <oscar.apps.basket.models.Basket>` instance
+        :param shipping_charge: :class:`ShippingCharge <oscarcch.prices.ShippingCharge>` instance
+        """
+        order = self._build_order(shipping_address, basket, shipping_charge)
+        line_items: dict[str, types.CCHLineItem] = {}
+        if order is not None:
+            line_items = {
+                str(item["ID"]): item for item in order["LineItems"]["LineItem"]
+            }
+        rates = self._get_rates(line_items.values())
+
+        # Apply taxes to line items
+        if basket is not None:
+            for line in basket.all_lines():
+                price = line.purchase_info.price
+                if isinstance(price, TaxablePrice):
+                    self._apply_estimate_to_price(
+                        line_items.get(str(line.id)), rates, price, line.quantity
+                    )
+
+        # Apply taxes to shipping charge
+        if shipping_charge is not None:
+            for shipping_charge_component in shipping_charge.components:
+                self._apply_estimate_to_price(
+                    line_items.get(shipping_charge_component.cch_line_id),
+                    rates,
+                    shipping_charge_component,
+                    1,
+                )
+
+    def _get_rates(
+        self,
+        line_items: Iterable[types.CCHLineItem],
+    ) -> dict[RateKey, JurisdictionTaxRate]:
+        """Load the local rates for every line item in a single query"""
+        from .models import JurisdictionTaxRate
+
+        keys = {
+            key for item in line_items if (key := self._get_rate_key(item)) is not None
+        }
+        if not keys:
+            return {}
+        query = Q()
+        for country_code, postal_code, sku, group, item in keys:
+            query |= Q(
+                country_code=country_code,
+                postal_code=postal_code,
+                sku=sku,
+                product_group=group,
+                product_item=item,
+            )
+        jurisdiction_rates = JurisdictionTaxRate.objects.filter(query).prefetch_related(
+            "items"
+        )
+        return {
+            (
+                r.country_code,
+                r.postal_code,
+                r.sku,
+                r.product_group,
+                r.product_item,
+            ): r
+            for r in jurisdiction_rates
+        }
+
+    def _get_rate_key(self, line_item: types.CCHLineItem) -> RateKey | None:
+        ship_to = line_item["NexusInfo"].get("ShipToAddress")
+        if ship_to is None:
+            return None
+        product_info = line_item.get("ProductInfo")
+        return (
+            ship_to["CountryCode"],
+            ship_to["PostalCode"],
+            line_item["SKU"] or "",
+            (product_info["ProductGroup"] or "") if product_info else "",
+            (product_info["ProductItem"] or "") if product_info else "",
+        )
+
+    def _apply_estimate_to_price(
+        self,
+        line_item: types.CCHLineItem | None,
+        rates: dict[RateKey, JurisdictionTaxRate],
+        price: TaxablePrice,
+        quantity: int,
+    ) -> None:
+        # Like CCH, estimate the taxes for the entire line, and then derive the per-unit taxes from that.
+        price.clear_taxes()
+        key = self._get_rate_key(line_item) if line_item is not None else None
+        jurisdiction_rate = rates.get(key) if key is not None else None
+        if line_item is None or jurisdiction_rate is None:
+            price.tax = Decimal("0.00")
+            return
+        line_total = line_item["AvgUnitPrice"] * line_item["Quantity"]
+        tax_items = jurisdiction_rate.items.all()
+        for tax_item in tax_items:
+            line_tax = line_total * tax_item.percent_taxable * tax_item.rate
+            line_fee = tax_item.fee * line_item["Quantity"]
+            price.add_tax(
+                authority_name=tax_item.authority_name,
+                tax_name=tax_item.tax_name,
+                tax_applied=line_tax / quantity,
+                fee_applied=line_fee / quantity,
+            )
+        if len(tax_items) <= 0:
+            price.tax = Decimal("0.00")
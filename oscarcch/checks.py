@@ -0,0 +1,30 @@
+from typing import Any
+
+from django.conf import settings as django_settings
+from django.core import checks
+
+from . import settings
+
+
+@checks.register(checks.Tags.caches)
+def check_circuit_breaker_cache(
+    app_configs: Any, **kwargs: Any
+) -> list[checks.CheckMessage]:
+    """
+    Warn when the circuit breaker's state is stored in a local-memory cache, which isn't shared between processes.
+    """
+    if not settings.CCH_CIRCUIT_BREAKER_ENABLED:
+        return []
+    alias = settings.CCH_CIRCUIT_BREAKER_CACHE_ALIAS
+    backend = django_settings.CACHES.get(alias, {}).get("BACKEND", "")
+    if backend != "django.core.cache.backends.locmem.LocMemCache":
+        return []
+    return [
+        checks.Warning(
+            f"The circuit breaker's state is stored in the local-memory cache {alias!r}, so it isn't shared "
+            "between worker processes.",
+            hint="Point CCH_CIRCUIT_BREAKER_CACHE_ALIAS at a cache shared by every worker, such as Redis or "
+            "Memcached.",
+            id="oscarcch.W001",
+        )
+    ]
@@ -0,0 +1,431 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import socket
+import tempfile
+import threading
+import time
+import weakref
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from zeep.transports import Transport
+import attr
+import requests
+import zeep
+import zeep.cache
+import zeep.exceptions
+
+from .metrics import observe_transfer
+from .retry import DeadlineExceeded, get_remaining_time
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+_clients: dict[tuple[Any, ...], zeep.Client] = {}
+_clients_lock = threading.Lock()
+
+_adapters: dict[tuple[Any, ...], HTTPAdapter] = {}
+
+# httpx connection pools are bound to the event loop they were opened on, so async clients are shared per loop.
+_async_clients: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, dict[tuple[Any, ...], zeep.AsyncClient]
+] = weakref.WeakKeyDictionary()
+
+
+def get_client(
+    wsdl: str,
+    proxy_url: str | None,
+    open_timeout: Any,
+    send_timeout: Any,
+    client_settings: zeep.Settings,
+    wsdl_cache_dir: str | None = None,
+    wsdl_cache_timeout: int | None = None,
+    adapter: HTTPAdapter | None = None,
+) -> zeep.Client:
+    """
+    Return a zeep SOAP client shared by every caller in this process.
+
+    Clients are keyed by their connection settings, so the WSDL is downloaded and parsed (and the underlying
+    ``requests.Session`` is built) only once per distinct configuration, rather than once per calculator.
+
+    If ``wsdl_cache_dir`` is given, the WSDL and XSD documents are additionally persisted on disk using
+    :class:`FileSystemCache`, so that newly started processes can load them without a network round trip.
+
+    :param wsdl: URL of the CCH WSDL
+    :param proxy_url: Optional http(s) proxy URL
+    :param open_timeout: Timeout used when loading the WSDL and its schemas
+    :param send_timeout: Timeout used when calling SOAP operations
+    :param client_settings: :class:`zeep.Settings` to build the client with
+    :param wsdl_cache_dir: Optional directory in which to persist WSDL and XSD documents
+    :param wsdl_cache_timeout: Number of seconds for which documents in ``wsdl_cache_dir`` are considered fresh
+    :param adapter: Optional ``requests`` transport adapter, as returned by :func:`get_adapter`, to mount for
+        http(s) URLs
+    :return: A shared :class:`zeep.Client` instance
+    """
+    key = (
+        wsdl,
+        proxy_url,
+        open_timeout,
+        send_timeout,
+        _settings_key(client_settings),
+        wsdl_cache_dir,
+        wsdl_cache_timeout,
+        adapter,
+    )
+    client = _clients.get(key)
+    if client is not None:
+        return client
+    with _clients_lock:
+        # Check again now that we hold the lock, since another thread may have built the client in the meantime.
+        client = _clients.get(key)
+        if client is None:
+            client = _build_client(
+                wsdl=wsdl,
+                proxy_url=proxy_url,
+                open_timeout=open_timeout,
+                send_timeout=send_timeout,
+                client_settings=client_settings,
+                wsdl_cache_dir=wsdl_cache_dir,
+                wsdl_cache_timeout=wsdl_cache_timeout,
+                adapter=adapter,
+            )
+            _clients[key] = client
+    return client
+
+
+def get_adapter(
+    pool_connections: int,
+    pool_maxsize: int,
+    pool_block: bool = False,
+    tcp_keepalive: bool = True,
+) -> HTTPAdapter:
+    """
+    Return a ``requests`` transport adapter shared by every caller in this process.
+
+    Mounting the same adapter in every client's session means that all clients share one set of connection
+    pools, so warm (already connected and TLS-negotiated) connections to CCH are reused across calculators and
+    threads instead of new sockets being opened.
+
+    :param pool_connections: Number of connection pools (one per host) to cache
+    :param pool_maxsize: Max number of connections to keep open to each host
+    :param pool_block: Whether to wait for a free connection when a pool is exhausted, rather than opening a
+        new one which is discarded after use
+    :param tcp_keepalive: Whether to enable TCP keep-alive probes on pooled sockets, so that idle connections
+        aren't silently dropped by firewalls and load balancers
+    :return: A shared :class:`requests.adapters.HTTPAdapter` instance
+    """
+    key = (pool_connections, pool_maxsize, pool_block, tcp_keepalive)
+    adapter = _adapters.get(key)
+    if adapter is not None:
+        return adapter
+    with _clients_lock:
+        adapter = _adapters.get(key)
+        if adapter is None:
+            adapter = PoolingHTTPAdapter(
+                pool_connections=pool_connections,
+                pool_maxsize=pool_maxsize,
+                pool_block=pool_block,
+                tcp_keepalive=tcp_keepalive,
+            )
+            _adapters[key] = adapter
+    return adapter
+
+
+def clear_clients() -> None:
+    """
+    Discard all shared clients, forcing the next call to :func:`get_client` to rebuild them.
+    """
+    with _clients_lock:
+        _clients.clear()
+        _async_clients.clear()
+        for adapter in _adapters.values():
+            adapter.close()
+        _adapters.clear()
+
+
+def get_async_client(
+    client: zeep.Client,
+    proxy_url: str | None,
+    send_timeout: Any,
+) -> zeep.AsyncClient:
+    """
+    Return a zeep asyncio SOAP client shared by every caller on the running event loop.
+
+    The async client reuses the WSDL already parsed by the given (shared) synchronous client, so the WSDL is
+    still only loaded once per process. SOAP operations are sent through a pooled ``httpx.AsyncClient``.
+    Requires the ``async`` extra (``pip install django-oscar-cch[async]``).
+
+    :param client: Shared synchronous client, as returned by :func:`get_client`
+    :param proxy_url: Optional http(s) proxy URL
+    :param send_timeout: Timeout used when calling SOAP operations
+    :return: A shared :class:`zeep.AsyncClient` instance
+    """
+    loop = asyncio.get_running_loop()
+    loop_clients = _async_clients.setdefault(loop, {})
+    key = (client, proxy_url, send_timeout)
+    async_client = loop_clients.get(key)
+    if async_client is None:
+        async_client = _build_async_client(
+            client=client,
+            proxy_url=proxy_url,
+            send_timeout=send_timeout,
+        )
+        loop_clients[key] = async_client
+    return async_client
+
+
+def _settings_key(client_settings: zeep.Settings) -> tuple[tuple[str, Any], ...]:
+    # Skip private attributes, such as the thread-local used for ``with settings(...)`` overrides.
+    return tuple(
+        (field.name, getattr(client_settings, field.name))
+        for field in attr.fields(type(client_settings))
+        if not field.name.startswith("_")
+    )
+
+
+def _build_client(
+    wsdl: str,
+    proxy_url: str | None,
+    open_timeout: Any,
+    send_timeout: Any,
+    client_settings: zeep.Settings,
+    wsdl_cache_dir: str | None = None,
+    wsdl_cache_timeout: int | None = None,
+    adapter: HTTPAdapter | None = None,
+) -> zeep.Client:
+    wsdl_cache: zeep.cache.Base
+    if wsdl_cache_dir:
+        wsdl_cache = FileSystemCache(wsdl_cache_dir, timeout=wsdl_cache_timeout)
+    else:
+        wsdl_cache = zeep.cache.InMemoryCache()
+    transport = DeadlineTransport(
+        cache=wsdl_cache,
+        timeout=open_timeout,
+        operation_timeout=send_timeout,
+    )
+    if adapter is not None:
+        transport.session.mount("http://", adapter)
+        transport.session.mount("https://", adapter)
+    if proxy_url:
+        proxies = {
+            "http": proxy_url,
+            "https": proxy_url,
+        }
+        transport.session.proxies.update(proxies)
+    client = zeep.Client(
+        wsdl=wsdl,
+        settings=client_settings,
+        transport=transport,
+    )
+    return client
+
+
+def _build_async_client(
+    client: zeep.Client,
+    proxy_url: str | None,
+    send_timeout: Any,
+) -> zeep.AsyncClient:
+    from zeep.transports import AsyncTransport
+    import httpx
+
+    timeout = _get_httpx_timeout(send_timeout)
+    transport = AsyncTransport(
+        client=httpx.AsyncClient(timeout=timeout, proxy=proxy_url),
+        cache=client.transport.cache,
+        operation_timeout=timeout,
+        proxy=proxy_url,
+    )
+    async_client = zeep.AsyncClient(
+        wsdl=client.wsdl,
+        settings=client.settings,
+        transport=transport,
+    )
+    return async_client
+
+
+def _get_httpx_timeout(timeout: Any) -> httpx.Timeout:
+    import httpx
+
+    # Timeouts are configured in requests' format, which is either a number or a (connect, read) tuple.
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+        return httpx.Timeout(read, connect=connect)
+    return httpx.Timeout(timeout)
+
+
+class DeadlineTransport(Transport):
+    """
+    zeep transport which shortens the timeout of SOAP operations to the time left before the deadline of the
+    current :class:`RetryPolicy <oscarcch.retry.RetryPolicy>` call, if any.
+
+    If a WSDL or XSD document can't be fetched, an expired copy from a :class:`FileSystemCache` is used instead, so
+    that a network outage doesn't stop new processes from starting.
+
+    The sizes of the messages of SOAP operations are reported to :func:`observe_transfer
+    <oscarcch.metrics.observe_transfer>`, for calls measured by :func:`measure_soap_call
+    <oscarcch.metrics.measure_soap_call>`.
+    """
+
+    def load(self, url: str) -> bytes:
+        try:
+            content: bytes = super().load(url)
+        except (requests.exceptions.RequestException, zeep.exceptions.TransportError):
+            if isinstance(self.cache, FileSystemCache):
+                stale = self.cache.get_stale(url)
+                if stale is not None:
+                    logger.warning(
+                        "Failed to fetch %s, so using an expired copy from the WSDL cache",
+                        url,
+                    )
+                    return stale
+            raise
+        return content
+
+    def post(
+        self, address: str, message: bytes | str, headers: dict[str, str]
+    ) -> requests.Response:
+        response: requests.Response = super().post(address, message, headers)
+        observe_transfer(len(message), len(response.content))
+        return response
+
+    @property
+    def operation_timeout(self) -> Any:
+        timeout = self._operation_timeout
+        remaining = get_remaining_time()
+        if remaining is None:
+            return timeout
+        if remaining <= 0:
+            raise DeadlineExceeded("CCH request deadline exceeded")
+        # Timeouts are either a number or a (connect, read) tuple, and ``None`` means no timeout.
+        if isinstance(timeout, tuple):
+            return tuple(remaining if t is None else min(t, remaining) for t in timeout)
+        return remaining if timeout is None else min(timeout, remaining)
+
+    @operation_timeout.setter
+    def operation_timeout(self, timeout: Any) -> None:
+        self._operation_timeout = timeout
+
+
+class PoolingHTTPAdapter(HTTPAdapter):
+    """
+    ``requests`` transport adapter which can enable TCP keep-alive on the sockets in its connection pools.
+    """
+
+    __attrs__ = HTTPAdapter.__attrs__ + ["tcp_keepalive"]
+
+    def __init__(self, *args: Any, tcp_keepalive: bool = True, **kwargs: Any):
+        self.tcp_keepalive = tcp_keepalive
+        super().__init__(*args, **kwargs)
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        if self.tcp_keepalive:
+            kwargs["socket_options"] = [
+                *HTTPConnection.default_socket_options,
+                (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+            ]
+        super().init_poolmanager(*args, **kwargs)
+
+
+class FileSystemCache(zeep.cache.Base):
+    """
+    zeep cache backend which persists WSDL and XSD documents as files in a local directory.
+
+    Each document is stored in its own file, named after a hash of its URL. The file starts with a single JSON
+    header line recording the URL, the time the document was fetched, and a SHA-256 checksum of its content.
+    Documents which are older than ``timeout`` seconds, or whose content doesn't match the checksum, are treated
+    as cache misses and re-fetched.
+    """
+
+    def __init__(self, path: str, timeout: int | None = 86400):
+        """
+        :param path: Directory in which to store cached documents. Created if it doesn't already exist.
+        :param timeout: Number of seconds for which a cached document is considered fresh. ``None`` means forever.
+        """
+        self.path = path
+        self.timeout = timeout
+
+    def add(self, url: str, content: bytes | str) -> None:
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        header = {
+            "url": url,
+            "created": time.time(),
+            "sha256": hashlib.sha256(content).hexdigest(),
+        }
+        os.makedirs(self.path, exist_ok=True)
+        # Write to a temporary file and then atomically move it into place, so that concurrent readers never see
+        # a partially written document.
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(json.dumps(header).encode("utf-8"))
+                fh.write(b"\n")
+                fh.write(content)
+            os.replace(tmp_path, self._get_filename(url))
+        except OSError:
+            logger.exception("Failed to write %s to WSDL cache", url)
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+    def get(self, url: str) -> bytes | None:
+        return self._read(url, check_expiry=True)
+
+    def get_stale(self, url: str) -> bytes | None:
+        """
+        Return the cached document for the given URL, even if it has expired.
+        """
+        return self._read(url, check_expiry=False)
+
+    def _read(self, url: str, check_expiry: bool) -> bytes | None:
+        try:
+            with open(self._get_filename(url), "rb") as fh:
+                raw_header = fh.readline()
+                content = fh.read()
+        except OSError:
+            return None
+        try:
+            header = json.loads(raw_header)
+        except ValueError:
+            logger.warning(
+                "Ignoring WSDL cache entry for %s with a corrupt header", url
+            )
+            return None
+        if header.get("url") != url:
+            return None
+        if (
+            check_expiry
+            and self.timeout is not None
+            and time.time() - header["created"] > self.timeout
+        ):
+            logger.debug("WSDL cache entry for %s has expired", url)
+            return None
+        if hashlib.sha256(content).hexdigest() != header.get("sha256"):
+            logger.warning("Ignoring WSDL cache entry for %s with a bad checksum", url)
+            return None
+        return content
+
+    def clear(self) -> None:
+        """
+        Remove all documents from the cache.
+        """
+        try:
+            filenames = os.listdir(self.path)
+        except FileNotFoundError:
+            return
+        for filename in filenames:
+            if filename.endswith(".wsdlcache"):
+                os.unlink(os.path.join(self.path, filename))
+
+    def _get_filename(self, url: str) -> str:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.path, f"{key}.wsdlcache")
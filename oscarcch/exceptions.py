@@ -5,6 +5,8 @@ class CCHError(Exception):
     severity: int
     code: int
     info: str
+    #: The CalculateRequest response which reported the error, if any
+    response: Any = None
 
     def __init__(self, code: int, info: str, *args: Any, **kwargs: Any):
         self.code = code
@@ -0,0 +1,169 @@
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextvars import copy_context
+from typing import Any, TypeVar
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class HedgingPolicy:
+    """
+    Send a second, identical request when the first one is slow, and use whichever valid response arrives first.
+
+    The hedge is sent once the first request has been outstanding for longer than the given percentile of recently
+    observed latencies (or for ``delay`` seconds, until enough latencies have been observed). To avoid multiplying
+    the load on CCH, at most ``max_rate`` hedges are sent per request, on average.
+
+    Requests are sent from a pool of at most ``max_workers`` threads, so that the caller can stop waiting for the
+    first request once the hedge has answered. Requests never queue for a worker: when every worker is busy, the
+    request is sent from the caller's thread instead, without hedging, and no hedge is sent. The pool should
+    therefore be sized from the number of threads calculating taxes concurrently in the process (e.g. the server's
+    thread count), plus room for hedges and for slow requests which lost the race, which keep their worker until
+    they complete.
+
+    A policy keeps its latency statistics and hedge budget in memory, so it should be shared by every caller in the
+    process.
+    """
+
+    def __init__(
+        self,
+        delay: float,
+        percentile: float = 0.95,
+        max_rate: float = 0.1,
+        window: int = 500,
+        min_samples: int = 20,
+        max_workers: int = 32,
+    ):
+        """
+        :param delay: Number of seconds to wait before hedging, until ``min_samples`` latencies have been observed
+        :param percentile: Percentile of observed latencies after which to hedge
+        :param max_rate: Max number of hedges to send per request, on average
+        :param window: Number of recent latencies to keep
+        :param min_samples: Number of latencies which must be observed before they're used to derive the delay
+        :param max_workers: Max number of requests which may be sent from the pool at once
+        """
+        self.delay = delay
+        self.percentile = percentile
+        self.max_rate = max_rate
+        self.min_samples = min_samples
+        self.max_workers = max_workers
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._hedge_budget = 1.0
+        self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+        self._free_workers = threading.BoundedSemaphore(max_workers)
+
+    def call(
+        self,
+        func: Callable[..., T],
+        *args: Any,
+        is_valid: Callable[[T], bool] | None = None,
+    ) -> T:
+        """
+        Call ``func(*args)``, hedging the call if it's slow.
+
+        :param func: Function to call. It may be called twice, concurrently, so it must be safe to do so.
+        :param is_valid: Optional function telling whether a result is valid. An invalid result is only returned if
+            no valid result arrives.
+        :return: The first valid result. If no call returns a valid result, the result (or exception) of the last
+            call to complete.
+        """
+        self._earn_hedge_budget()
+        first = self._submit(func, *args)
+        if first is None:
+            logger.info(
+                "No free worker to hedge request to %s",
+                getattr(func, "__name__", func),
+            )
+            return self._call_timed(func, *args)
+        pending = {first}
+        done, _ = wait(pending, timeout=self.get_delay())
+        if not done and self._spend_hedge_budget():
+            hedge = self._submit(func, *args)
+            if hedge is None:
+                self._refund_hedge_budget()
+            else:
+                logger.info(
+                    "Hedging slow request to %s", getattr(func, "__name__", func)
+                )
+                pending.add(hedge)
+        last: Future[T] | None = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                last = future
+                if future.exception() is None and (
+                    is_valid is None or is_valid(future.result())
+                ):
+                    return future.result()
+        assert last is not None
+        return last.result()
+
+    def get_delay(self) -> float:
+        """
+        Return the number of seconds after which to hedge a request.
+        """
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if len(latencies) < self.min_samples:
+            return self.delay
+        return latencies[int(self.percentile * (len(latencies) - 1))]
+
+    def record_latency(self, seconds: float) -> None:
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def _call_timed(self, func: Callable[..., T], *args: Any) -> T:
+        start = time.monotonic()
+        result = func(*args)
+        self.record_latency(time.monotonic() - start)
+        return result
+
+    def _submit(self, func: Callable[..., T], *args: Any) -> Future[T] | None:
+        """Send a request from the pool, or return ``None`` if every worker is busy"""
+        if not self._free_workers.acquire(blocking=False):
+            return None
+
+        def _run() -> T:
+            try:
+                return self._call_timed(func, *args)
+            finally:
+                self._free_workers.release()
+
+        # Run in a copy of the caller's context, so that e.g. the deadline of an enclosing retry still applies.
+        try:
+            return self._get_executor().submit(copy_context().run, _run)
+        except BaseException:
+            self._free_workers.release()
+            raise
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="oscarcch-hedge",
+                )
+            return self._executor
+
+    def _earn_hedge_budget(self) -> None:
+        # Token bucket: every request earns ``max_rate`` of a hedge, and up to one unspent hedge may be saved up.
+        with self._lock:
+            self._hedge_budget = min(1.0, self._hedge_budget + self.max_rate)
+
+    def _refund_hedge_budget(self) -> None:
+        with self._lock:
+            self._hedge_budget += 1.0
+
+    def _spend_hedge_budget(self) -> bool:
+        with self._lock:
+            if self._hedge_budget < 1.0:
+                return False
+            self._hedge_budget -= 1.0
+            return True
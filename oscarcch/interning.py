@@ -0,0 +1,73 @@
+from typing import overload
+import threading
+
+from . import settings
+
+
+class StringInterner:
+    """
+    Bounded table of canonical copies of strings, so that equal strings parsed from many responses share memory.
+
+    Unlike :func:`sys.intern`, the table holds at most ``max_size`` strings: once it's full, the oldest entry is
+    evicted to make room for a new one. Lookups don't take a lock, so an interner may be shared by every thread in
+    the process.
+    """
+
+    def __init__(self, max_size: int):
+        """
+        :param max_size: Max number of strings to keep. ``0`` disables interning.
+        """
+        self.max_size = max_size
+        self._table: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    @overload
+    def intern(self, value: str) -> str: ...
+
+    @overload
+    def intern(self, value: None) -> None: ...
+
+    def intern(self, value: str | None) -> str | None:
+        """
+        Return the canonical copy of the given string, adding it to the table if it isn't there yet.
+
+        Anything other than a plain ``str`` (such as ``None``) is returned unchanged.
+        """
+        if type(value) is not str:
+            return value
+        canonical = self._table.get(value)
+        if canonical is not None:
+            return canonical
+        if self.max_size <= 0:
+            return value
+        with self._lock:
+            canonical = self._table.setdefault(value, value)
+            if len(self._table) > self.max_size:
+                del self._table[next(iter(self._table))]
+        return canonical
+
+    def clear(self) -> None:
+        with self._lock:
+            self._table.clear()
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+
+#: Interner shared by everything which handles the authority and tax names returned by CCH.
+interner = StringInterner(settings.CCH_INTERN_TABLE_SIZE)
+
+
+@overload
+def intern_name(value: str) -> str: ...
+
+
+@overload
+def intern_name(value: None) -> None: ...
+
+
+def intern_name(value: str | None) -> str | None:
+    """
+    Return the canonical copy of an authority or tax name, using the process-wide :data:`interner`.
+    """
+    return interner.intern(value)
@@ -0,0 +1,43 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import models
+
+from ...models import (
+    LineItemTaxationDetail,
+    ShippingTaxationDetail,
+    migrate_taxation_details,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill in the normalized tax authority, tax type and amount columns of line and shipping taxation details "
+        "saved before those columns existed. Safe to interrupt and to re-run: each batch is committed on its own."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of details to migrate per transaction. Defaults to 1000.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        batch_size = options["batch_size"]
+        self.report(
+            LineItemTaxationDetail,
+            sum(migrate_taxation_details(LineItemTaxationDetail, batch_size)),
+        )
+        self.report(
+            ShippingTaxationDetail,
+            sum(migrate_taxation_details(ShippingTaxationDetail, batch_size)),
+        )
+
+    def report(self, model: type[models.Model], num_migrated: int) -> None:
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Migrated {num_migrated} {model._meta.verbose_name_plural}"
+            )
+        )
@@ -0,0 +1,61 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.utils import timezone
+
+from ...models import TaxationDetailsOutbox
+
+
+class Command(BaseCommand):
+    help = (
+        "Save the line and shipping taxation details queued in the taxation details outbox. "
+        "Safe to run concurrently and to re-run: each queued response is only ever saved once. Responses which "
+        "can't be saved are skipped, and retried by later runs."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Number of queued responses to save per transaction. Defaults to 100.",
+        )
+        parser.add_argument(
+            "--max-attempts",
+            type=int,
+            default=5,
+            help="Number of failures after which a queued response is no longer retried. Defaults to 5.",
+        )
+        parser.add_argument(
+            "--retry-delay",
+            type=float,
+            default=300,
+            help="Number of seconds to wait before retrying a queued response which failed. Defaults to 300.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        start = timezone.now()
+        num_processed = 0
+        while True:
+            num_batch = TaxationDetailsOutbox.process_pending(
+                batch_size=options["batch_size"],
+                max_attempts=options["max_attempts"],
+                retry_delay=options["retry_delay"],
+            )
+            if num_batch <= 0:
+                break
+            num_processed += num_batch
+        num_failed = TaxationDetailsOutbox.objects.filter(
+            date_processed__isnull=True, date_attempted__gte=start
+        ).count()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Saved taxation details for {num_processed - num_failed} orders"
+            )
+        )
+        if num_failed:
+            self.stderr.write(
+                self.style.WARNING(
+                    f"Failed to save taxation details for {num_failed} orders"
+                )
+            )
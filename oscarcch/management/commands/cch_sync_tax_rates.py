@@ -0,0 +1,122 @@
+from collections import defaultdict
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from oscar.core.loading import get_model
+import requests
+import zeep.exceptions
+
+from ... import exceptions, settings, types
+from ...calculator import CCHTaxCalculator
+from ...models import JurisdictionTaxRate
+
+ProductAttributeValue = get_model("catalogue", "ProductAttributeValue")
+
+ProductTaxCode = tuple[str, str, str]
+
+
+class Command(BaseCommand):
+    help = (
+        "Fetch tax rates from CCH for the given postal codes and store them for use by EstimatingTaxCalculator. "
+        "Unless --sku is given, rates are fetched for every product tax code used in the catalogue."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("postal_codes", nargs="+", metavar="postal_code")
+        parser.add_argument(
+            "--country",
+            default="US",
+            help="Country code of the given postal codes. Defaults to US.",
+        )
+        parser.add_argument(
+            "--sku",
+            action="append",
+            dest="skus",
+            metavar="SKU[:GROUP[:ITEM]]",
+            help="Product tax code to fetch rates for. May be given more than once.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        calculator = CCHTaxCalculator()
+        if options["skus"]:
+            tax_codes = {self._parse_tax_code(code) for code in options["skus"]}
+        else:
+            tax_codes = self._get_catalogue_tax_codes()
+
+        num_saved = 0
+        num_failed = 0
+        for raw_postal_code in options["postal_codes"]:
+            postal_code, plus4 = calculator.format_postcode(raw_postal_code)
+            address = types.CCHAddress(
+                Line1="",
+                Line2="",
+                City="",
+                StateOrProvince="",
+                PostalCode=postal_code,
+                Plus4=plus4,
+                CountryCode=options["country"],
+            )
+            for sku, group, item in sorted(tax_codes):
+                try:
+                    rates = calculator.get_tax_rates(address, sku, group, item)
+                except (
+                    exceptions.CCHError,
+                    zeep.exceptions.Error,
+                    requests.exceptions.RequestException,
+                ) as e:
+                    num_failed += 1
+                    self.stderr.write(
+                        f"Failed to fetch rates for {postal_code} / {sku}:{group}:{item}: {e}"
+                    )
+                    continue
+                JurisdictionTaxRate.save_rates(
+                    country_code=options["country"],
+                    postal_code=postal_code,
+                    sku=sku,
+                    product_group=group,
+                    product_item=item,
+                    rates=rates,
+                )
+                num_saved += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Saved {num_saved} tax rates"))
+        if num_failed > 0:
+            raise CommandError(f"Failed to fetch {num_failed} tax rates")
+
+    def _parse_tax_code(self, raw: str) -> ProductTaxCode:
+        parts = raw.split(":") + ["", ""]
+        return (parts[0], parts[1], parts[2])
+
+    def _get_catalogue_tax_codes(self) -> set[ProductTaxCode]:
+        defaults = {
+            "cch_product_sku": settings.CCH_PRODUCT_SKU,
+            "cch_product_group": settings.CCH_PRODUCT_GROUP,
+            "cch_product_item": settings.CCH_PRODUCT_ITEM,
+        }
+        tax_codes = {
+            (
+                defaults["cch_product_sku"],
+                defaults["cch_product_group"],
+                defaults["cch_product_item"],
+            )
+        }
+        # Collect the codes overridden by each product's attributes
+        product_attrs: dict[int, dict[str, str]] = defaultdict(dict)
+        attribute_values = ProductAttributeValue.objects.filter(
+            attribute__code__in=defaults.keys()
+        ).values_list("product_id", "attribute__code", "value_text")
+        for product_id, code, value in attribute_values:
+            product_attrs[product_id][code] = value or ""
+        for attrs in product_attrs.values():
+            merged = defaults | attrs
+            tax_codes.add(
+                (
+                    merged["cch_product_sku"],
+                    merged["cch_product_group"],
+                    merged["cch_product_item"],
+                )
+            )
+        # Shipping lines are sent with a SKU but without product info
+        if settings.CCH_SHIPPING_TAXES_ENABLED:
+            tax_codes.add((settings.CCH_SHIPPING_SKU, "", ""))
+        return tax_codes
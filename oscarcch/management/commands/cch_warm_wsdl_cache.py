@@ -0,0 +1,36 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from ...calculator import CCHTaxCalculator
+from ...client import FileSystemCache, clear_clients
+
+
+class Command(BaseCommand):
+    help = "Fetch the CCH WSDL and its schemas into the on-disk cache configured by CCH_WSDL_CACHE_DIR."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Discard any existing cached documents before fetching them again.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        calculator = CCHTaxCalculator()
+        if not calculator.wsdl_cache_dir:
+            raise CommandError("CCH_WSDL_CACHE_DIR is not configured.")
+        cache = FileSystemCache(
+            calculator.wsdl_cache_dir,
+            timeout=calculator.wsdl_cache_timeout,
+        )
+        if options["force"]:
+            cache.clear()
+        # Make sure the client is built from scratch, so that every document passes through the cache.
+        clear_clients()
+        client = calculator.client
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Cached WSDL for {client.wsdl.location} in {calculator.wsdl_cache_dir}"
+            )
+        )
@@ -0,0 +1,292 @@
+"""
+Optional metrics about tax calculations.
+
+Calculators report the duration of each phase of a calculation, the sizes of the messages exchanged with CCH, the
+number of lines sent, retries, errors reported by CCH, and circuit breaker transitions to the
+:class:`MetricsRecorder` named by ``CCH_METRICS_RECORDER``. By default, they're discarded.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+import threading
+import time
+
+from django.utils.module_loading import import_string
+import pybreaker
+
+from . import exceptions, settings
+
+#: Phases of a calculation timed by :func:`MetricsRecorder.time_phase`
+PHASES = ("build", "serialize", "network", "parse")
+
+_recorder: MetricsRecorder | None = None
+_recorder_lock = threading.Lock()
+
+#: SOAP call being measured by the current call to :func:`measure_soap_call`, if any.
+_soap_call: ContextVar[_SOAPCall | None] = ContextVar(
+    "oscarcch_soap_call", default=None
+)
+
+
+class MetricsRecorder:
+    """
+    Receives measurements of tax calculations, and discards them.
+
+    Subclass it to send measurements to a metrics system, and point ``CCH_METRICS_RECORDER`` at the subclass. Its
+    methods are called from whichever thread is calculating taxes, so they must be thread safe, and shouldn't block.
+    """
+
+    @contextmanager
+    def time_phase(self, phase: str) -> Iterator[None]:
+        """
+        Time the enclosed block as the given phase of a calculation, whether it succeeds or fails.
+
+        :param phase: One of :data:`PHASES`
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_phase_duration(phase, time.perf_counter() - start)
+
+    def observe_phase_duration(self, phase: str, seconds: float) -> None:
+        """
+        Record how long a phase of a calculation took.
+
+        ``build`` is building the CCH order from the basket, ``serialize`` is writing the SOAP request, ``network``
+        lasts until the response's headers have been received, and ``parse`` is reading and parsing the response.
+        When requests are sent through zeep, it serializes them while sending them, so ``network`` includes
+        ``serialize``.
+        """
+
+    def observe_payload_size(self, direction: str, size: int) -> None:
+        """
+        Record the size of a message exchanged with CCH.
+
+        :param direction: ``request`` or ``response``
+        :param size: Size of the message body, in bytes
+        """
+
+    def observe_line_count(self, count: int) -> None:
+        """
+        Record the number of line items (including shipping charge components) in a request sent to CCH.
+        """
+
+    def record_retry(self, exc: BaseException) -> None:
+        """
+        Record that a request to CCH is about to be retried after failing with the given exception.
+        """
+
+    def record_response_error(self, error: exceptions.CCHError) -> None:
+        """
+        Record an error reported in the messages of a CalculateRequest response.
+        """
+
+    def record_breaker_transition(
+        self, name: str, old_state: str | None, new_state: str
+    ) -> None:
+        """
+        Record that a circuit breaker changed state.
+
+        :param name: Name of the breaker
+        :param old_state: Previous state (``closed``, ``open`` or ``half-open``), or ``None`` if it had none
+        :param new_state: New state
+        """
+
+
+class PrometheusMetricsRecorder(MetricsRecorder):
+    """
+    Export measurements as Prometheus metrics. Requires ``prometheus_client`` to be installed.
+
+    The metrics are registered in the given registry, or in ``prometheus_client``'s default one, which is exposed
+    in the OpenMetrics format by its exporters:
+
+    - ``oscarcch_request_phase_seconds``: histogram of phase durations, by ``phase``
+    - ``oscarcch_payload_bytes``: histogram of message sizes, by ``direction``
+    - ``oscarcch_request_line_items``: histogram of the number of lines per request
+    - ``oscarcch_retries_total``: counter of retried requests, by ``exception`` class
+    - ``oscarcch_response_errors_total``: counter of errors reported by CCH, by ``kind`` (``system`` or ``request``)
+      and ``code``
+    - ``oscarcch_circuit_breaker_transitions_total``: counter of breaker state changes, by ``breaker``,
+      ``from_state`` and ``to_state``
+    """
+
+    #: Upper bounds of the ``oscarcch_payload_bytes`` buckets, from 1 KiB to 16 MiB
+    payload_buckets = tuple(1024 * 4**i for i in range(8))
+    #: Upper bounds of the ``oscarcch_request_line_items`` buckets
+    line_count_buckets = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+    def __init__(self, registry: Any = None, namespace: str = "oscarcch"):
+        """
+        :param registry: ``prometheus_client.CollectorRegistry`` in which to register the metrics. Defaults to
+            ``prometheus_client.REGISTRY``.
+        :param namespace: Prefix of the metrics' names
+        """
+        from prometheus_client import REGISTRY, Counter, Histogram
+
+        if registry is None:
+            registry = REGISTRY
+        self.phase_seconds = Histogram(
+            "request_phase_seconds",
+            "Duration of each phase of CCH tax calculations",
+            ["phase"],
+            namespace=namespace,
+            registry=registry,
+        )
+        self.payload_bytes = Histogram(
+            "payload_bytes",
+            "Size of the messages exchanged with CCH",
+            ["direction"],
+            namespace=namespace,
+            registry=registry,
+            buckets=self.payload_buckets,
+        )
+        self.line_items = Histogram(
+            "request_line_items",
+            "Number of line items sent in each CalculateRequest",
+            namespace=namespace,
+            registry=registry,
+            buckets=self.line_count_buckets,
+        )
+        self.retries = Counter(
+            "retries",
+            "Requests to CCH retried after a transient failure",
+            ["exception"],
+            namespace=namespace,
+            registry=registry,
+        )
+        self.response_errors = Counter(
+            "response_errors",
+            "Errors reported in the messages of CalculateRequest responses",
+            ["kind", "code"],
+            namespace=namespace,
+            registry=registry,
+        )
+        self.breaker_transitions = Counter(
+            "circuit_breaker_transitions",
+            "State changes of the circuit breakers around calls to CCH",
+            ["breaker", "from_state", "to_state"],
+            namespace=namespace,
+            registry=registry,
+        )
+
+    def observe_phase_duration(self, phase: str, seconds: float) -> None:
+        self.phase_seconds.labels(phase=phase).observe(seconds)
+
+    def observe_payload_size(self, direction: str, size: int) -> None:
+        self.payload_bytes.labels(direction=direction).observe(size)
+
+    def observe_line_count(self, count: int) -> None:
+        self.line_items.observe(count)
+
+    def record_retry(self, exc: BaseException) -> None:
+        self.retries.labels(exception=type(exc).__name__).inc()
+
+    def record_response_error(self, error: exceptions.CCHError) -> None:
+        self.response_errors.labels(
+            kind=get_error_kind(error), code=str(error.code)
+        ).inc()
+
+    def record_breaker_transition(
+        self, name: str, old_state: str | None, new_state: str
+    ) -> None:
+        self.breaker_transitions.labels(
+            breaker=name, from_state=old_state or "", to_state=new_state
+        ).inc()
+
+
+class BreakerMetricsListener(pybreaker.CircuitBreakerListener):
+    """
+    pybreaker listener which reports the state changes of a circuit breaker to the metrics recorder.
+
+    Added to the breakers returned by :func:`get_circuit_breaker <oscarcch.breaker.get_circuit_breaker>`. Add it
+    to any other breaker passed to a calculator to record its transitions too.
+    """
+
+    def state_change(
+        self,
+        cb: pybreaker.CircuitBreaker,
+        old_state: pybreaker.CircuitBreakerState | None,
+        new_state: pybreaker.CircuitBreakerState,
+    ) -> None:
+        get_metrics_recorder().record_breaker_transition(
+            cb.name or "",
+            old_state.name if old_state is not None else None,
+            new_state.name,
+        )
+
+
+class _SOAPCall:
+    def __init__(self, recorder: MetricsRecorder):
+        self.recorder = recorder
+        self.start = time.perf_counter()
+        self.received_at: float | None = None
+
+
+@contextmanager
+def measure_soap_call(recorder: MetricsRecorder) -> Iterator[None]:
+    """
+    Measure a SOAP operation called through zeep within the enclosed block.
+
+    The transport of the shared SOAP clients reports when the response has arrived, and the sizes of the messages,
+    through :func:`observe_transfer`. The block's duration is then split into the ``network`` phase, which includes
+    zeep serializing the request, and the ``parse`` phase.
+    """
+    call = _SOAPCall(recorder)
+    token = _soap_call.set(call)
+    try:
+        yield
+    finally:
+        _soap_call.reset(token)
+        end = time.perf_counter()
+        if call.received_at is None:
+            recorder.observe_phase_duration("network", end - call.start)
+        else:
+            recorder.observe_phase_duration("parse", end - call.received_at)
+
+
+def observe_transfer(request_size: int, response_size: int) -> None:
+    """
+    Record that the response to a SOAP request has arrived, if the request is being measured by
+    :func:`measure_soap_call`.
+
+    :param request_size: Size of the request body, in bytes
+    :param response_size: Size of the response body, in bytes
+    """
+    call = _soap_call.get()
+    if call is None:
+        return
+    call.received_at = time.perf_counter()
+    call.recorder.observe_phase_duration("network", call.received_at - call.start)
+    call.recorder.observe_payload_size("request", request_size)
+    call.recorder.observe_payload_size("response", response_size)
+
+
+def get_error_kind(error: exceptions.CCHError) -> str:
+    """
+    Return ``system`` for a :class:`CCHSystemError <oscarcch.exceptions.CCHSystemError>`, ``request`` for a
+    :class:`CCHRequestError <oscarcch.exceptions.CCHRequestError>`, and ``unknown`` for any other severity.
+    """
+    if isinstance(error, exceptions.CCHSystemError):
+        return "system"
+    if isinstance(error, exceptions.CCHRequestError):
+        return "request"
+    return "unknown"
+
+
+def get_metrics_recorder() -> MetricsRecorder:
+    """
+    Return the metrics recorder shared by every caller in this process, built from ``CCH_METRICS_RECORDER`` on
+    first use.
+    """
+    global _recorder
+    if _recorder is None:
+        with _recorder_lock:
+            if _recorder is None:
+                path = settings.CCH_METRICS_RECORDER
+                _recorder = import_string(path)() if path else MetricsRecorder()
+    return _recorder
@@ -0,0 +1,83 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:02
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("cch", "0002_shippingtaxation_shippingtaxationdetail"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="JurisdictionTaxRate",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("country_code", models.CharField(max_length=5)),
+                ("postal_code", models.CharField(max_length=10)),
+                ("sku", models.CharField(blank=True, max_length=64)),
+                ("product_group", models.CharField(blank=True, max_length=64)),
+                ("product_item", models.CharField(blank=True, max_length=64)),
+                (
+                    "estimated_total_rate",
+                    models.DecimalField(decimal_places=12, max_digits=20),
+                ),
+                (
+                    "estimated_total_fee",
+                    models.DecimalField(decimal_places=6, max_digits=16),
+                ),
+                ("date_updated", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "unique_together": {
+                    (
+                        "country_code",
+                        "postal_code",
+                        "sku",
+                        "product_group",
+                        "product_item",
+                    )
+                },
+            },
+        ),
+        migrations.CreateModel(
+            name="JurisdictionTaxRateItem",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("authority_name", models.CharField(max_length=255)),
+                ("authority_type", models.CharField(blank=True, max_length=10)),
+                ("tax_name", models.CharField(max_length=255)),
+                ("rate", models.DecimalField(decimal_places=12, max_digits=20)),
+                ("fee", models.DecimalField(decimal_places=6, max_digits=16)),
+                (
+                    "percent_taxable",
+                    models.DecimalField(decimal_places=6, max_digits=12),
+                ),
+                (
+                    "jurisdiction_rate",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="items",
+                        to="cch.jurisdictiontaxrate",
+                    ),
+                ),
+            ],
+        ),
+    ]
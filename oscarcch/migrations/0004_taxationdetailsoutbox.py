@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:18
+
+from django.db import migrations, models
+import django.core.serializers.json
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("cch", "0003_jurisdictiontaxrate"),
+        ("order", "0016_billingaddress_code_shippingaddress_code"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaxationDetailsOutbox",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("idempotency_key", models.CharField(max_length=128, unique=True)),
+                (
+                    "response",
+                    models.JSONField(
+                        encoder=django.core.serializers.json.DjangoJSONEncoder
+                    ),
+                ),
+                ("date_created", models.DateTimeField(auto_now_add=True)),
+                (
+                    "date_processed",
+                    models.DateTimeField(blank=True, db_index=True, null=True),
+                ),
+                (
+                    "order",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="cch_taxation_outbox",
+                        to="order.order",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "Taxation details outbox",
+            },
+        ),
+    ]
@@ -0,0 +1,175 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:48
+
+from django.db import migrations, models
+import django.contrib.postgres.fields.hstore
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("cch", "0004_taxationdetailsoutbox"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaxType",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=255, unique=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="lineitemtaxationdetail",
+            name="fee_applied",
+            field=models.DecimalField(
+                blank=True, decimal_places=6, max_digits=19, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="lineitemtaxationdetail",
+            name="tax_applied",
+            field=models.DecimalField(
+                blank=True, decimal_places=6, max_digits=19, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="lineitemtaxationdetail",
+            name="tax_rate",
+            field=models.DecimalField(
+                blank=True, decimal_places=12, max_digits=19, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="lineitemtaxationdetail",
+            name="taxable_amount",
+            field=models.DecimalField(
+                blank=True, decimal_places=6, max_digits=19, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="shippingtaxationdetail",
+            name="fee_applied",
+            field=models.DecimalField(
+                blank=True, decimal_places=6, max_digits=19, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="shippingtaxationdetail",
+            name="tax_applied",
+            field=models.DecimalField(
+                blank=True, decimal_places=6, max_digits=19, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="shippingtaxationdetail",
+            name="tax_rate",
+            field=models.DecimalField(
+                blank=True, decimal_places=12, max_digits=19, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="shippingtaxationdetail",
+            name="taxable_amount",
+            field=models.DecimalField(
+                blank=True, decimal_places=6, max_digits=19, null=True
+            ),
+        ),
+        migrations.AlterField(
+            model_name="lineitemtaxationdetail",
+            name="data",
+            field=django.contrib.postgres.fields.hstore.HStoreField(
+                blank=True, null=True
+            ),
+        ),
+        migrations.AlterField(
+            model_name="shippingtaxationdetail",
+            name="data",
+            field=django.contrib.postgres.fields.hstore.HStoreField(
+                blank=True, null=True
+            ),
+        ),
+        migrations.CreateModel(
+            name="TaxAuthority",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=255)),
+                ("authority_type", models.CharField(blank=True, max_length=10)),
+            ],
+            options={
+                "verbose_name_plural": "Tax authorities",
+                "unique_together": {("name", "authority_type")},
+            },
+        ),
+        migrations.AddField(
+            model_name="lineitemtaxationdetail",
+            name="authority",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="%(class)ss",
+                to="cch.taxauthority",
+            ),
+        ),
+        migrations.AddField(
+            model_name="shippingtaxationdetail",
+            name="authority",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="%(class)ss",
+                to="cch.taxauthority",
+            ),
+        ),
+        migrations.AddField(
+            model_name="lineitemtaxationdetail",
+            name="tax_type",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="%(class)ss",
+                to="cch.taxtype",
+            ),
+        ),
+        migrations.AddField(
+            model_name="shippingtaxationdetail",
+            name="tax_type",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="%(class)ss",
+                to="cch.taxtype",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="lineitemtaxationdetail",
+            index=models.Index(
+                fields=["authority", "tax_type"], name="cch_lineite_authori_ba21cc_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="shippingtaxationdetail",
+            index=models.Index(
+                fields=["authority", "tax_type"], name="cch_shippin_authori_1ea5c4_idx"
+            ),
+        ),
+    ]
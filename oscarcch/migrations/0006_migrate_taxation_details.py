@@ -0,0 +1,110 @@
+from decimal import Decimal, InvalidOperation
+
+from django.db import migrations
+
+# Only migrate the first batch of details here, so that migrating a large table doesn't hold up the deploy. The
+# ``cch_migrate_taxation_details`` management command migrates the rest.
+BATCH_SIZE = 1000
+
+
+def _get_name(data, key):
+    value = data.get(key)
+    # HStore data stores missing values as the string "None"
+    if value is None or value == "None":
+        return ""
+    return str(value)
+
+
+def _get_decimal(data, key):
+    value = data.get(key)
+    if value is None:
+        return None
+    try:
+        return Decimal(str(value))
+    except InvalidOperation:
+        return None
+
+
+def _get_authority_key(data):
+    return (_get_name(data, "AuthorityName"), _get_name(data, "AuthorityType"))
+
+
+def _get_authorities(TaxAuthority, keys):
+    names = {name for name, _ in keys}
+    return {
+        (name, authority_type): pk
+        for name, authority_type, pk in TaxAuthority.objects.filter(
+            name__in=names
+        ).values_list("name", "authority_type", "pk")
+        if (name, authority_type) in keys
+    }
+
+
+def _get_tax_types(TaxType, names):
+    return dict(TaxType.objects.filter(name__in=names).values_list("name", "pk"))
+
+
+def migrate_batch(apps, model_name):
+    TaxAuthority = apps.get_model("cch", "TaxAuthority")
+    TaxType = apps.get_model("cch", "TaxType")
+    Detail = apps.get_model("cch", model_name)
+    batch = list(
+        Detail.objects.filter(authority__isnull=True, data__isnull=False)
+        .select_for_update()
+        .order_by("pk")[:BATCH_SIZE]
+    )
+    if not batch:
+        return
+
+    authority_keys = {_get_authority_key(detail.data) for detail in batch}
+    authorities = _get_authorities(TaxAuthority, authority_keys)
+    TaxAuthority.objects.bulk_create(
+        [
+            TaxAuthority(name=name, authority_type=authority_type)
+            for name, authority_type in authority_keys - authorities.keys()
+        ],
+        ignore_conflicts=True,
+    )
+    authorities = _get_authorities(TaxAuthority, authority_keys)
+
+    tax_type_names = {_get_name(detail.data, "TaxName") for detail in batch}
+    tax_types = _get_tax_types(TaxType, tax_type_names)
+    TaxType.objects.bulk_create(
+        [TaxType(name=name) for name in tax_type_names - tax_types.keys()],
+        ignore_conflicts=True,
+    )
+    tax_types = _get_tax_types(TaxType, tax_type_names)
+
+    for detail in batch:
+        detail.authority_id = authorities[_get_authority_key(detail.data)]
+        detail.tax_type_id = tax_types[_get_name(detail.data, "TaxName")]
+        detail.tax_applied = _get_decimal(detail.data, "TaxApplied")
+        detail.fee_applied = _get_decimal(detail.data, "FeeApplied")
+        detail.tax_rate = _get_decimal(detail.data, "TaxRate")
+        detail.taxable_amount = _get_decimal(detail.data, "TaxableAmount")
+    Detail.objects.bulk_update(
+        batch,
+        [
+            "authority",
+            "tax_type",
+            "tax_applied",
+            "fee_applied",
+            "tax_rate",
+            "taxable_amount",
+        ],
+    )
+
+
+def forwards(apps, schema_editor):
+    for model_name in ("LineItemTaxationDetail", "ShippingTaxationDetail"):
+        migrate_batch(apps, model_name)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("cch", "0005_taxauthority_taxtype_normalized_details"),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, migrations.RunPython.noop, elidable=True),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("cch", "0006_migrate_taxation_details"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="taxationdetailsoutbox",
+            name="attempts",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="taxationdetailsoutbox",
+            name="date_attempted",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="taxationdetailsoutbox",
+            name="last_error",
+            field=models.TextField(blank=True, default=""),
+        ),
+    ]
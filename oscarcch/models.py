@@ -1,19 +1,235 @@
-from decimal import Decimal
-from typing import TYPE_CHECKING
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from datetime import timedelta
+from decimal import Decimal, InvalidOperation
+from typing import TYPE_CHECKING, Any, Self
 import json
+import logging
 
 from django.contrib.postgres.fields import HStoreField
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models, transaction
+from django.utils import timezone
+from oscar.core.loading import get_model
 from zeep.xsd import CompoundValue
-import zeep.helpers
 
+from . import settings
+from .interning import intern_name
 from .prices import ShippingChargeComponent
+from .responses import (
+    AnyLineItemTax,
+    AnyTaxDetail,
+    AnyTaxResponse,
+    get_line_item_taxes,
+    get_messages,
+    get_tax_details,
+    serialize_object,
+)
 from .settings import CCH_PRECISION
 
 if TYPE_CHECKING:
     from sandbox.order.models import Line, Order
 
 
+logger = logging.getLogger(__name__)
+
+AuthorityKey = tuple[str, str]
+
+#: Tax detail fields whose values repeat across many details. Amounts and rates are mostly unique, so interning
+#: them would only churn the table of interned names.
+_INTERNED_DETAIL_FIELDS = frozenset(("AuthorityName", "AuthorityType", "TaxName"))
+
+
+def _serialize_tax_detail(data: Mapping[str, Any]) -> dict[str, str]:
+    serialized: dict[str, str] = {}
+    for k, v in data.items():
+        key = intern_name(str(k))
+        serialized[key] = (
+            intern_name(str(v)) if key in _INTERNED_DETAIL_FIELDS else str(v)
+        )
+    return serialized
+
+
+def _get_name(detail: Mapping[str, Any] | AnyTaxDetail, key: str) -> str:
+    value = (
+        detail.get(key) if isinstance(detail, Mapping) else getattr(detail, key, None)
+    )
+    # HStore data stores missing values as the string "None"
+    if value is None or value == "None":
+        return ""
+    return intern_name(str(value))
+
+
+def _get_decimal(detail: Mapping[str, Any], key: str) -> Decimal | None:
+    value = detail.get(key)
+    if value is None:
+        return None
+    try:
+        return Decimal(str(value))
+    except InvalidOperation:
+        return None
+
+
+def _get_authority_key(detail: Mapping[str, Any] | AnyTaxDetail) -> AuthorityKey:
+    return (_get_name(detail, "AuthorityName"), _get_name(detail, "AuthorityType"))
+
+
+def _get_tax_categories(
+    details: Iterable[Mapping[str, Any] | AnyTaxDetail],
+    authority_model: type["TaxAuthority"] | None = None,
+    tax_type_model: type["TaxType"] | None = None,
+) -> tuple[dict[AuthorityKey, int], dict[str, int]]:
+    """
+    Return the IDs of the tax authorities and tax types of the given details, creating any which don't exist yet.
+
+    Takes one query per model when every authority and tax type already exists, and three otherwise. The models
+    may be given explicitly, so that data migrations can pass their historical models.
+    """
+    authority_model = authority_model or TaxAuthority
+    tax_type_model = tax_type_model or TaxType
+    details = list(details)
+    authority_keys = {_get_authority_key(detail) for detail in details}
+    tax_type_names = {_get_name(detail, "TaxName") for detail in details}
+
+    def _get_authorities(keys: set[AuthorityKey]) -> dict[AuthorityKey, int]:
+        if not keys:
+            return {}
+        names = {name for name, _ in keys}
+        return {
+            (name, authority_type): pk
+            for pk, name, authority_type in authority_model.objects.filter(
+                name__in=names
+            ).values_list("pk", "name", "authority_type")
+            if (name, authority_type) in keys
+        }
+
+    def _get_tax_types(names: set[str]) -> dict[str, int]:
+        if not names:
+            return {}
+        return dict(
+            tax_type_model.objects.filter(name__in=names).values_list("name", "pk")
+        )
+
+    authorities = _get_authorities(authority_keys)
+    missing_authorities = authority_keys - authorities.keys()
+    if missing_authorities:
+        # Ignore conflicts, in case another worker creates the same authority concurrently
+        authority_model.objects.bulk_create(
+            [
+                authority_model(name=name, authority_type=authority_type)
+                for name, authority_type in missing_authorities
+            ],
+            ignore_conflicts=True,
+        )
+        authorities |= _get_authorities(missing_authorities)
+
+    tax_types = _get_tax_types(tax_type_names)
+    missing_tax_types = tax_type_names - tax_types.keys()
+    if missing_tax_types:
+        tax_type_model.objects.bulk_create(
+            [tax_type_model(name=name) for name in missing_tax_types],
+            ignore_conflicts=True,
+        )
+        tax_types |= _get_tax_types(missing_tax_types)
+    return authorities, tax_types
+
+
+def _get_normalized_fields(
+    detail: Mapping[str, Any],
+    authorities: Mapping[AuthorityKey, int],
+    tax_types: Mapping[str, int],
+) -> dict[str, Any]:
+    return {
+        "authority_id": authorities[_get_authority_key(detail)],
+        "tax_type_id": tax_types[_get_name(detail, "TaxName")],
+        "tax_applied": _get_decimal(detail, "TaxApplied"),
+        "fee_applied": _get_decimal(detail, "FeeApplied"),
+        "tax_rate": _get_decimal(detail, "TaxRate"),
+        "taxable_amount": _get_decimal(detail, "TaxableAmount"),
+    }
+
+
+def _build_details[DetailT: ("LineItemTaxationDetail", "ShippingTaxationDetail")](
+    detail_model: type[DetailT],
+    taxations: Sequence[models.Model],
+    taxes: Sequence[AnyLineItemTax],
+    authorities: Mapping[AuthorityKey, int] | None = None,
+    tax_types: Mapping[str, int] | None = None,
+) -> list[DetailT]:
+    details = [
+        (taxation, serialize_object(detail))
+        for taxation, line_taxes in zip(taxations, taxes, strict=True)
+        for detail in get_tax_details(line_taxes)
+    ]
+    if authorities is None or tax_types is None:
+        authorities, tax_types = _get_tax_categories(data for _, data in details)
+    return [
+        detail_model(
+            taxation_id=taxation.pk,
+            data=(
+                _serialize_tax_detail(data)
+                if settings.CCH_SAVE_TAXATION_DETAILS_DATA
+                else None
+            ),
+            **_get_normalized_fields(data, authorities, tax_types),
+        )
+        for taxation, data in details
+    ]
+
+
+def migrate_taxation_details[
+    DetailT: ("LineItemTaxationDetail", "ShippingTaxationDetail")
+](
+    detail_model: type[DetailT],
+    batch_size: int = 1000,
+    authority_model: type["TaxAuthority"] | None = None,
+    tax_type_model: type["TaxType"] | None = None,
+) -> Iterator[int]:
+    """
+    Fill in the normalized columns of details saved before they existed, from their HStore ``data``.
+
+    Details are migrated in batches of ``batch_size``, each in its own transaction, so that the migration can be
+    interrupted and resumed at any time, while new details are still being saved. Details locked by another
+    transaction, such as a concurrent run of this migration, are waited for rather than skipped.
+
+    :param detail_model: :class:`LineItemTaxationDetail` or :class:`ShippingTaxationDetail` (or the equivalent
+        historical model, in a data migration)
+    :return: Iterator of the number of details migrated by each batch
+    """
+    last_pk = 0
+    while True:
+        with transaction.atomic():
+            batch = list(
+                detail_model.objects.filter(
+                    pk__gt=last_pk, authority__isnull=True, data__isnull=False
+                )
+                .select_for_update()
+                .order_by("pk")[:batch_size]
+            )
+            if not batch:
+                return
+            authorities, tax_types = _get_tax_categories(
+                (detail.data for detail in batch), authority_model, tax_type_model
+            )
+            for detail in batch:
+                for field, value in _get_normalized_fields(
+                    detail.data, authorities, tax_types
+                ).items():
+                    setattr(detail, field, value)
+            detail_model.objects.bulk_update(
+                batch,
+                [
+                    "authority",
+                    "tax_type",
+                    "tax_applied",
+                    "fee_applied",
+                    "tax_rate",
+                    "taxable_amount",
+                ],
+            )
+        last_pk = batch[-1].pk
+        yield len(batch)
+
+
 class OrderTaxation(models.Model):
     """
     Persist top-level taxation data related to an Order.
@@ -40,35 +256,92 @@ class OrderTaxation(models.Model):
     messages = models.TextField(null=True)
 
     @classmethod
-    def save_details(cls, order: "Order", taxes: CompoundValue) -> None:
+    def save_details(
+        cls,
+        order: "Order",
+        taxes: AnyTaxResponse,
+        defer_details: bool = False,
+    ) -> None:
         """
         Given an order and a SOAP response, persist the details.
 
         :param order: :class:`Order <oscar.apps.order.models.Order>` instance
         :param taxes: Return value of :func:`CCHTaxCalculator.apply_taxes <oscarcch.calculator.CCHTaxCalculator.apply_taxes>`
+        :param defer_details: Save only the order's taxation inline, and queue the line and shipping taxation
+            details in :class:`TaxationDetailsOutbox <oscarcch.models.TaxationDetailsOutbox>`, to be saved later
+            by the ``cch_process_taxation_outbox`` management command.
         """
+        if taxes.TransactionID is None or taxes.TransactionStatus is None:
+            raise ValueError("CCH response has no transaction to save")
+        messages = get_messages(taxes)
         with transaction.atomic():
             order_taxation = cls(order=order)
             order_taxation.transaction_id = taxes.TransactionID
             order_taxation.transaction_status = taxes.TransactionStatus
-            order_taxation.total_tax_applied = Decimal(taxes.TotalTaxApplied).quantize(
-                CCH_PRECISION
-            )
+            order_taxation.total_tax_applied = Decimal(
+                taxes.TotalTaxApplied or 0
+            ).quantize(CCH_PRECISION)
             order_taxation.messages = (
-                json.dumps(
-                    zeep.helpers.serialize_object(taxes.Messages.Message), indent=4
-                )
-                if len(taxes.Messages.Message) > 0
+                json.dumps(serialize_object(messages), indent=4)
+                if len(messages) > 0
                 else None
             )
             order_taxation.save()
-            if taxes.LineItemTaxes:
-                for cch_line in taxes.LineItemTaxes.LineItemTax:
-                    if ShippingChargeComponent.is_cch_shipping_line(cch_line.ID):
-                        ShippingTaxation.save_details(order, cch_line)
-                    else:
-                        line = order.lines.get(basket_line__id=cch_line.ID)
-                        LineItemTaxation.save_details(line, cch_line)
+            if defer_details:
+                TaxationDetailsOutbox.enqueue(order, taxes)
+            else:
+                cls.save_line_details([(order, taxes)])
+
+    @classmethod
+    def save_line_details(
+        cls, order_taxes: Sequence[tuple["Order", AnyTaxResponse]]
+    ) -> None:
+        """
+        Persist the line and shipping taxation details of many orders using a constant number of queries.
+
+        :param order_taxes: Sequence of (:class:`Order <oscar.apps.order.models.Order>`, SOAP response) tuples
+        """
+        Line = get_model("order", "Line")
+
+        cch_basket_lines = []
+        cch_shipping_lines = []
+        for order, taxes in order_taxes:
+            for cch_line in get_line_item_taxes(taxes):
+                if ShippingChargeComponent.is_cch_shipping_line(cch_line.ID or ""):
+                    cch_shipping_lines.append((order, cch_line))
+                else:
+                    cch_basket_lines.append((order, cch_line))
+        # Fetch all the order lines at once, rather than one query per CCH line
+        lines = {}
+        if cch_basket_lines:
+            lines = {
+                (line.order_id, str(line.basket_line_id)): line
+                for line in Line.objects.filter(
+                    order__in={order.pk for order, _ in cch_basket_lines},
+                    basket_line__id__in={
+                        cch_line.ID for _, cch_line in cch_basket_lines
+                    },
+                )
+            }
+        line_taxes = []
+        for order, cch_line in cch_basket_lines:
+            line = lines.get((order.pk, str(cch_line.ID)))
+            if line is None:
+                raise Line.DoesNotExist(
+                    f"Order {order} has no line for basket line {cch_line.ID}"
+                )
+            line_taxes.append((line, cch_line))
+        # Look up the tax authorities and tax types of every detail at once
+        authorities, tax_types = _get_tax_categories(
+            detail
+            for _, cch_line in line_taxes + cch_shipping_lines
+            for detail in get_tax_details(cch_line)
+        )
+        with transaction.atomic(savepoint=False):
+            LineItemTaxation.bulk_save_details(line_taxes, authorities, tax_types)
+            ShippingTaxation.bulk_save_details(
+                cch_shipping_lines, authorities, tax_types
+            )
 
     def __str__(self) -> str:
         return f"{self.transaction_id}"
@@ -96,23 +369,46 @@ class LineItemTaxation(models.Model):
     total_tax_applied = models.DecimalField(decimal_places=2, max_digits=12)
 
     @classmethod
-    def save_details(cls, line: "Line", taxes: CompoundValue) -> None:
-        with transaction.atomic():
-            line_taxation = cls(line_item=line)
-            line_taxation.country_code = taxes.CountryCode
-            line_taxation.state_code = taxes.StateOrProvince
-            line_taxation.total_tax_applied = Decimal(taxes.TotalTaxApplied).quantize(
-                CCH_PRECISION
+    def save_details(cls, line: "Line", taxes: AnyLineItemTax) -> None:
+        cls.bulk_save_details([(line, taxes)])
+
+    @classmethod
+    def bulk_save_details(
+        cls,
+        line_taxes: Sequence[tuple["Line", AnyLineItemTax]],
+        authorities: Mapping[AuthorityKey, int] | None = None,
+        tax_types: Mapping[str, int] | None = None,
+    ) -> None:
+        """
+        Persist the taxes of many lines using a constant number of queries.
+
+        :param line_taxes: Sequence of (:class:`order.Line <oscar.apps.models.Line>`, CCH ``LineItemTax``) tuples
+        :param authorities: Optional IDs of the lines' tax authorities, keyed by name and type. Looked up if omitted.
+        :param tax_types: Optional IDs of the lines' tax types, keyed by name. Looked up if omitted.
+        """
+        with transaction.atomic(savepoint=False):
+            line_taxations = LineItemTaxation.objects.bulk_create(
+                [
+                    LineItemTaxation(
+                        line_item=line,
+                        country_code=taxes.CountryCode or "",
+                        state_code=taxes.StateOrProvince or "",
+                        total_tax_applied=Decimal(taxes.TotalTaxApplied or 0).quantize(
+                            CCH_PRECISION
+                        ),
+                    )
+                    for line, taxes in line_taxes
+                ]
+            )
+            LineItemTaxationDetail.objects.bulk_create(
+                _build_details(
+                    LineItemTaxationDetail,
+                    line_taxations,
+                    [taxes for _, taxes in line_taxes],
+                    authorities,
+                    tax_types,
+                )
             )
-            line_taxation.save()
-            for detail in taxes.TaxDetails.TaxDetail:
-                line_detail = LineItemTaxationDetail()
-                line_detail.taxation = line_taxation
-                line_detail.data = {
-                    str(k): str(v)
-                    for k, v in zeep.helpers.serialize_object(detail).items()
-                }
-                line_detail.save()
 
     def __str__(self) -> str:
         return f"{self.line_item}: {self.total_tax_applied}"
@@ -128,11 +424,56 @@ class LineItemTaxationDetail(models.Model):
         "LineItemTaxation", related_name="details", on_delete=models.CASCADE
     )
 
-    #: HStore of data about the applied tax
-    data = HStoreField()
+    #: Taxing authority which applied the tax. ``None`` for details saved before it existed, until they're migrated.
+    authority = models.ForeignKey(
+        "TaxAuthority",
+        related_name="%(class)ss",
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+    )
+
+    #: Type of the applied tax. ``None`` for details saved before it existed, until they're migrated.
+    tax_type = models.ForeignKey(
+        "TaxType",
+        related_name="%(class)ss",
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+    )
+
+    #: Tax applied
+    tax_applied = models.DecimalField(
+        decimal_places=6, max_digits=19, null=True, blank=True
+    )
+
+    #: Fee applied
+    fee_applied = models.DecimalField(
+        decimal_places=6, max_digits=19, null=True, blank=True
+    )
+
+    #: Rate of the tax
+    tax_rate = models.DecimalField(
+        decimal_places=12, max_digits=19, null=True, blank=True
+    )
+
+    #: Amount on which the tax was applied
+    taxable_amount = models.DecimalField(
+        decimal_places=6, max_digits=19, null=True, blank=True
+    )
+
+    #: HStore of all the data about the applied tax returned by CCH. Only saved while
+    #: ``CCH_SAVE_TAXATION_DETAILS_DATA`` is enabled.
+    data = HStoreField(null=True, blank=True)
+
+    class Meta:
+        indexes = (models.Index(fields=["authority", "tax_type"]),)
 
     def __str__(self) -> str:
-        return "{}—{}".format(self.data.get("AuthorityName"), self.data.get("TaxName"))
+        if self.authority is not None and self.tax_type is not None:
+            return f"{self.authority.name}—{self.tax_type.name}"
+        data = self.data or {}
+        return "{}—{}".format(data.get("AuthorityName"), data.get("TaxName"))
 
 
 class ShippingTaxation(models.Model):
@@ -163,25 +504,48 @@ class ShippingTaxation(models.Model):
         unique_together = (("order", "cch_line_id"),)
 
     @classmethod
-    def save_details(cls, order: "Order", taxes: CompoundValue) -> None:
-        with transaction.atomic():
-            shipping_taxation = cls()
-            shipping_taxation.order = order
-            shipping_taxation.cch_line_id = taxes.ID
-            shipping_taxation.country_code = taxes.CountryCode
-            shipping_taxation.state_code = taxes.StateOrProvince
-            shipping_taxation.total_tax_applied = Decimal(
-                taxes.TotalTaxApplied
-            ).quantize(CCH_PRECISION)
-            shipping_taxation.save()
-            for detail in taxes.TaxDetails.TaxDetail:
-                shipping_detail = ShippingTaxationDetail()
-                shipping_detail.taxation = shipping_taxation
-                shipping_detail.data = {
-                    str(k): str(v)
-                    for k, v in zeep.helpers.serialize_object(detail).items()
-                }
-                shipping_detail.save()
+    def save_details(cls, order: "Order", taxes: AnyLineItemTax) -> None:
+        cls.bulk_save_details([(order, taxes)])
+
+    @classmethod
+    def bulk_save_details(
+        cls,
+        shipping_taxes: Sequence[tuple["Order", AnyLineItemTax]],
+        authorities: Mapping[AuthorityKey, int] | None = None,
+        tax_types: Mapping[str, int] | None = None,
+    ) -> None:
+        """
+        Persist the taxes of many shipping charge components using a constant number of queries.
+
+        :param shipping_taxes: Sequence of (:class:`Order <oscar.apps.order.models.Order>`, CCH ``LineItemTax``) tuples
+        :param authorities: Optional IDs of the components' tax authorities, keyed by name and type. Looked up if
+            omitted.
+        :param tax_types: Optional IDs of the components' tax types, keyed by name. Looked up if omitted.
+        """
+        with transaction.atomic(savepoint=False):
+            shipping_taxations = ShippingTaxation.objects.bulk_create(
+                [
+                    ShippingTaxation(
+                        order=order,
+                        cch_line_id=taxes.ID or "",
+                        country_code=taxes.CountryCode or "",
+                        state_code=taxes.StateOrProvince or "",
+                        total_tax_applied=Decimal(taxes.TotalTaxApplied or 0).quantize(
+                            CCH_PRECISION
+                        ),
+                    )
+                    for order, taxes in shipping_taxes
+                ]
+            )
+            ShippingTaxationDetail.objects.bulk_create(
+                _build_details(
+                    ShippingTaxationDetail,
+                    shipping_taxations,
+                    [taxes for _, taxes in shipping_taxes],
+                    authorities,
+                    tax_types,
+                )
+            )
 
     def __str__(self) -> str:
         return f"{self.order}: {self.total_tax_applied}"
@@ -197,8 +561,351 @@ class ShippingTaxationDetail(models.Model):
         "ShippingTaxation", related_name="details", on_delete=models.CASCADE
     )
 
-    #: HStore of data about the applied tax
-    data = HStoreField()
+    #: Taxing authority which applied the tax. ``None`` for details saved before it existed, until they're migrated.
+    authority = models.ForeignKey(
+        "TaxAuthority",
+        related_name="%(class)ss",
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+    )
+
+    #: Type of the applied tax. ``None`` for details saved before it existed, until they're migrated.
+    tax_type = models.ForeignKey(
+        "TaxType",
+        related_name="%(class)ss",
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+    )
+
+    #: Tax applied
+    tax_applied = models.DecimalField(
+        decimal_places=6, max_digits=19, null=True, blank=True
+    )
+
+    #: Fee applied
+    fee_applied = models.DecimalField(
+        decimal_places=6, max_digits=19, null=True, blank=True
+    )
+
+    #: Rate of the tax
+    tax_rate = models.DecimalField(
+        decimal_places=12, max_digits=19, null=True, blank=True
+    )
+
+    #: Amount on which the tax was applied
+    taxable_amount = models.DecimalField(
+        decimal_places=6, max_digits=19, null=True, blank=True
+    )
+
+    #: HStore of all the data about the applied tax returned by CCH. Only saved while
+    #: ``CCH_SAVE_TAXATION_DETAILS_DATA`` is enabled.
+    data = HStoreField(null=True, blank=True)
+
+    class Meta:
+        indexes = (models.Index(fields=["authority", "tax_type"]),)
+
+    def __str__(self) -> str:
+        if self.authority is not None and self.tax_type is not None:
+            return f"{self.authority.name}—{self.tax_type.name}"
+        data = self.data or {}
+        return "{}—{}".format(data.get("AuthorityName"), data.get("TaxName"))
+
+
+class TaxAuthority(models.Model):
+    """
+    Taxing authority (state, county, city, district, etc.) named in the taxation details returned by CCH.
+    """
+
+    #: Name of the taxing authority
+    name = models.CharField(max_length=255)
+
+    #: CCH code for the type of taxing authority
+    authority_type = models.CharField(max_length=10, blank=True)
+
+    class Meta:
+        verbose_name_plural = "Tax authorities"
+        unique_together = (("name", "authority_type"),)
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class TaxType(models.Model):
+    """
+    Type of tax named in the taxation details returned by CCH.
+    """
+
+    #: Name of the tax
+    name = models.CharField(max_length=255, unique=True)
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class TaxationDetailsOutbox(models.Model):
+    """
+    Queue of CCH responses whose line and shipping taxation details have yet to be saved.
+
+    Entries are created by :func:`OrderTaxation.save_details <oscarcch.models.OrderTaxation.save_details>` when
+    called with ``defer_details=True``, and are processed by the ``cch_process_taxation_outbox`` management
+    command.
+    """
+
+    #: Key uniquely identifying the response, so that saving the same response more than once only queues it once
+    idempotency_key = models.CharField(max_length=128, unique=True)
+
+    #: Foreign key to :class:`order.Order <oscar.apps.models.Order>`.
+    order = models.ForeignKey(
+        "order.Order",
+        related_name="cch_taxation_outbox",
+        on_delete=models.CASCADE,
+    )
+
+    #: CCH response, as serialized by :func:`CCHTaxCalculator.serialize_response <oscarcch.calculator.CCHTaxCalculator.serialize_response>`
+    response = models.JSONField(encoder=DjangoJSONEncoder)
+
+    #: When the entry was queued
+    date_created = models.DateTimeField(auto_now_add=True)
+
+    #: When the entry's details were saved. ``None`` while the entry is pending.
+    date_processed = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    #: Number of times saving the entry's details has failed
+    attempts = models.PositiveIntegerField(default=0)
+
+    #: When saving the entry's details last failed
+    date_attempted = models.DateTimeField(null=True, blank=True)
+
+    #: Error raised the last time saving the entry's details failed
+    last_error = models.TextField(blank=True, default="")
+
+    class Meta:
+        verbose_name_plural = "Taxation details outbox"
+
+    @classmethod
+    def enqueue(cls, order: "Order", taxes: AnyTaxResponse) -> "TaxationDetailsOutbox":
+        """
+        Queue the line and shipping taxation details of the given order and SOAP response to be saved later.
+
+        :param order: :class:`Order <oscar.apps.order.models.Order>` instance
+        :param taxes: Return value of :func:`CCHTaxCalculator.apply_taxes <oscarcch.calculator.CCHTaxCalculator.apply_taxes>`
+        """
+        from .calculator import CCHTaxCalculator
+
+        entry, _ = cls.objects.get_or_create(
+            idempotency_key=f"{order.number}:{taxes.TransactionID}",
+            defaults={
+                "order": order,
+                "response": CCHTaxCalculator().serialize_response(taxes),
+            },
+        )
+        return entry
+
+    @classmethod
+    def process_pending(
+        cls,
+        batch_size: int = 100,
+        max_attempts: int = 5,
+        retry_delay: float = 300,
+    ) -> int:
+        """
+        Save the details of up to ``batch_size`` pending entries, and mark them as processed.
+
+        Details are saved and entries are marked as processed in the same transaction, so an entry is never
+        processed twice. Entries locked by another worker are skipped, so several workers may run concurrently.
+
+        The details of the whole batch are saved at once. If that fails, each entry is saved in its own savepoint
+        instead, so an entry which can't be saved (e.g. because one of its order lines has since been deleted)
+        doesn't stop the others from being saved. Its failure is recorded on it instead, and it isn't tried again for ``retry_delay`` seconds, nor at all once it has failed
+        ``max_attempts`` times.
+
+        :param batch_size: Max number of entries to process
+        :param max_attempts: Number of failures after which an entry is no longer tried
+        :param retry_delay: Number of seconds to wait before trying a failed entry again
+        :return: Number of entries processed, whether their details were saved or not
+        """
+        from .calculator import CCHTaxCalculator
+
+        calculator = CCHTaxCalculator()
+        now = timezone.now()
+        with transaction.atomic():
+            entries = list(
+                cls.objects.filter(
+                    models.Q(date_attempted__isnull=True)
+                    | models.Q(
+                        date_attempted__lte=now - timedelta(seconds=retry_delay)
+                    ),
+                    date_processed__isnull=True,
+                    attempts__lt=max_attempts,
+                )
+                .select_related("order")
+                .select_for_update(skip_locked=True, of=("self",))
+                .order_by("pk")[:batch_size]
+            )
+            if not entries:
+                return 0
+            details = [
+                (entry.order, calculator.deserialize_response(entry.response))
+                for entry in entries
+            ]
+            try:
+                with transaction.atomic():
+                    OrderTaxation.save_line_details(details)
+            except Exception:
+                logger.warning(
+                    "Failed to save a batch of %d queued taxation details, saving them one at a time",
+                    len(entries),
+                    exc_info=True,
+                )
+            else:
+                cls.objects.filter(pk__in=[entry.pk for entry in entries]).update(
+                    date_processed=now
+                )
+                return len(entries)
+
+            saved: list[int] = []
+            failed: list[Self] = []
+            for entry, entry_details in zip(entries, details, strict=True):
+                try:
+                    with transaction.atomic():
+                        OrderTaxation.save_line_details([entry_details])
+                except Exception as e:
+                    logger.exception(
+                        "Failed to save taxation details queued as %s", entry
+                    )
+                    entry.attempts += 1
+                    entry.date_attempted = now
+                    entry.last_error = repr(e)
+                    failed.append(entry)
+                else:
+                    saved.append(entry.pk)
+            if saved:
+                cls.objects.filter(pk__in=saved).update(date_processed=now)
+            if failed:
+                cls.objects.bulk_update(
+                    failed, ["attempts", "date_attempted", "last_error"]
+                )
+        return len(entries)
+
+    def __str__(self) -> str:
+        return self.idempotency_key
+
+
+class JurisdictionTaxRate(models.Model):
+    """
+    Local copy of the tax rates CCH reports (through its ``GetTaxRates`` operation) for a single postal code and
+    product tax code. Used by :class:`EstimatingTaxCalculator <oscarcch.calculator.EstimatingTaxCalculator>` to
+    estimate taxes without calling CCH.
+    """
+
+    #: Country code of the jurisdiction
+    country_code = models.CharField(max_length=5)
+
+    #: 5-digit postal code of the jurisdiction
+    postal_code = models.CharField(max_length=10)
+
+    #: CCH SKU the rates apply to
+    sku = models.CharField(max_length=64, blank=True)
+
+    #: CCH product group the rates apply to
+    product_group = models.CharField(max_length=64, blank=True)
+
+    #: CCH product item the rates apply to
+    product_item = models.CharField(max_length=64, blank=True)
+
+    #: Sum of the rates of all taxing authorities, as reported by CCH
+    estimated_total_rate = models.DecimalField(decimal_places=12, max_digits=20)
+
+    #: Sum of the per-unit fees of all taxing authorities, as reported by CCH
+    estimated_total_fee = models.DecimalField(decimal_places=6, max_digits=16)
+
+    #: When the rates were last fetched from CCH
+    date_updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = (
+            ("country_code", "postal_code", "sku", "product_group", "product_item"),
+        )
+
+    @classmethod
+    def save_rates(
+        cls,
+        country_code: str,
+        postal_code: str,
+        sku: str,
+        product_group: str,
+        product_item: str,
+        rates: CompoundValue,
+    ) -> "JurisdictionTaxRate":
+        """
+        Given a jurisdiction, product tax code, and ``GetTaxRates`` SOAP response, persist the rates, replacing any
+        previously stored rates for the same jurisdiction and product tax code.
+
+        :param rates: Return value of :func:`CCHTaxCalculator.get_tax_rates <oscarcch.calculator.CCHTaxCalculator.get_tax_rates>`
+        """
+        with transaction.atomic():
+            jurisdiction_rate, _ = cls.objects.update_or_create(
+                country_code=country_code,
+                postal_code=postal_code,
+                sku=sku,
+                product_group=product_group,
+                product_item=product_item,
+                defaults={
+                    "estimated_total_rate": rates.EstimatedTotalTaxRate,
+                    "estimated_total_fee": rates.EstimatedTotalFee,
+                },
+            )
+            jurisdiction_rate.items.all().delete()
+            tax_items = rates.TaxItems.TaxItem if rates.TaxItems else []
+            JurisdictionTaxRateItem.objects.bulk_create(
+                [
+                    JurisdictionTaxRateItem(
+                        jurisdiction_rate=jurisdiction_rate,
+                        authority_name=intern_name(item.AuthorityName or ""),
+                        authority_type=intern_name(item.AuthorityType or ""),
+                        tax_name=intern_name(item.TaxName or ""),
+                        rate=item.Rate,
+                        fee=item.Fee,
+                        percent_taxable=item.PercentTaxable,
+                    )
+                    for item in tax_items
+                ]
+            )
+        return jurisdiction_rate
+
+    def __str__(self) -> str:
+        return f"{self.country_code} {self.postal_code} {self.sku}: {self.estimated_total_rate}"
+
+
+class JurisdictionTaxRateItem(models.Model):
+    """
+    Represents the rate charged by a single taxing authority within a :class:`JurisdictionTaxRate`.
+    """
+
+    #: Many-to-one foreign key to :class:`JurisdictionTaxRate <oscarcch.models.JurisdictionTaxRate>`
+    jurisdiction_rate = models.ForeignKey(
+        "JurisdictionTaxRate", related_name="items", on_delete=models.CASCADE
+    )
+
+    #: Name of the taxing authority
+    authority_name = models.CharField(max_length=255)
+
+    #: CCH code for the type of taxing authority
+    authority_type = models.CharField(max_length=10, blank=True)
+
+    #: Name of the tax
+    tax_name = models.CharField(max_length=255)
+
+    #: Rate applied to the taxable portion of the price
+    rate = models.DecimalField(decimal_places=12, max_digits=20)
+
+    #: Flat fee charged per unit
+    fee = models.DecimalField(decimal_places=6, max_digits=16)
+
+    #: Fraction of the price which is taxable
+    percent_taxable = models.DecimalField(decimal_places=6, max_digits=12)
 
     def __str__(self) -> str:
-        return "{}—{}".format(self.data.get("AuthorityName"), self.data.get("TaxName"))
+        return f"{self.authority_name}—{self.tax_name}"
@@ -4,10 +4,13 @@ from django.db import transaction
 from oscar.core.loading import get_class, get_model
 from oscar.core.prices import Price
 
+from . import settings
+from .breaker import get_circuit_breaker
 from .prices import ShippingCharge
 
 if TYPE_CHECKING:
     from django.contrib.auth.models import AbstractBaseUser
+    import pybreaker
 
 Basket = get_model("basket", "Basket")
 Order = get_model("order", "Order")
@@ -21,6 +24,11 @@ BaseShippingMethod = get_class("shipping.methods", "Base")
 
 
 class CCHOrderCreatorMixin(OrderCreator):
+    #: Whether to defer saving line and shipping taxation details. See ``CCH_DEFER_TAXATION_DETAILS``.
+    defer_cch_taxation_details = settings.CCH_DEFER_TAXATION_DETAILS
+    #: Whether to call CCH through the shared circuit breaker. See ``CCH_CIRCUIT_BREAKER_ENABLED``.
+    cch_circuit_breaker_enabled = settings.CCH_CIRCUIT_BREAKER_ENABLED
+
     def place_order(  # type:ignore[override]
         self,
         basket: Basket,
@@ -41,12 +49,20 @@ class CCHOrderCreatorMixin(OrderCreator):
             shipping_charge = ShippingCharge(
                 currency=shipping_charge.currency, excl_tax=shipping_charge.excl_tax
             )
-        cch_response = CCHTaxCalculator().apply_taxes(
+        calculator = CCHTaxCalculator(breaker=self.get_cch_circuit_breaker())
+        # Streamed responses have no LineItemTaxes, which are needed to save the line and shipping taxation details
+        calculator.stream_responses = False
+        # Incrementally calculated responses may report the transaction of a request which only held some of the lines
+        calculator.incremental_recalculation = False
+        cch_response = calculator.apply_taxes(
             shipping_address=shipping_address,
             basket=basket,
             shipping_charge=shipping_charge,
         )
-        is_tax_known = cch_response is not None
+        # An order with nothing to tax has a known tax of zero, even though CCH wasn't called.
+        is_tax_known = cch_response is not None or not calculator.has_taxable_lines(
+            basket, shipping_charge
+        )
 
         # Update order total now that we know taxes
         total = OrderTotalCalculator().calculate(basket, shipping_charge)
@@ -71,10 +87,22 @@ class CCHOrderCreatorMixin(OrderCreator):
             if is_tax_known and cch_response is not None:
                 from .models import OrderTaxation
 
-                OrderTaxation.save_details(order, cch_response)
+                OrderTaxation.save_details(
+                    order,
+                    cch_response,
+                    defer_details=self.defer_cch_taxation_details,
+                )
 
         return order
 
+    def get_cch_circuit_breaker(self) -> "pybreaker.CircuitBreaker | None":
+        """
+        Return the circuit breaker to call CCH through while placing orders, or ``None`` to call CCH directly.
+        """
+        if not self.cch_circuit_breaker_enabled:
+            return None
+        return get_circuit_breaker()
+
     def create_line_models(
         self,
         order: Order,
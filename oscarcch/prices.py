@@ -1,10 +1,28 @@
+from collections.abc import Iterable, Iterator, Sequence
 from decimal import Decimal
-from typing import NamedTuple, Protocol, runtime_checkable
+from typing import Any, NamedTuple, Protocol, overload, runtime_checkable
+import hashlib
+import json
 
 from oscar.apps.partner import prices as app_prices
 from oscar.core import prices as core_prices
 
 from . import settings
+from .interning import intern_name
+
+#: Precision of the ``AvgUnitPrice`` of line items sent to CCH.
+UNIT_PRICE_PRECISION = Decimal("0.00001")
+
+
+def make_tax_fingerprint(*values: Any) -> str:
+    """
+    Return a compact digest of the given values, which must be JSON-serializable (or Decimals).
+
+    Used to build the ``tax_fingerprint`` of the inputs to a tax calculation, and the keys under which CCH responses
+    and line taxes are cached.
+    """
+    payload = json.dumps(values, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
 
 
 class TaxationDetail(NamedTuple):
@@ -14,11 +32,91 @@ class TaxationDetail(NamedTuple):
     fee_applied: Decimal
 
 
+class TaxationDetails(Sequence[TaxationDetail]):
+    """
+    Sequence of the :class:`TaxationDetail` applied to a price.
+
+    Details are stored column by column, in lists which are reused when the details are cleared, and authority and
+    tax names are interned (see :func:`oscarcch.interning.intern_name`), since the same few names repeat across
+    every price. The total of the taxes and fees is
+    only summed when it's asked for.
+    """
+
+    __slots__ = ("_authority_names", "_fees", "_tax_names", "_taxes", "_total")
+
+    def __init__(self) -> None:
+        self._authority_names: list[str] = []
+        self._tax_names: list[str] = []
+        self._taxes: list[Decimal] = []
+        self._fees: list[Decimal] = []
+        self._total: Decimal | None = Decimal(0)
+
+    def add(
+        self,
+        authority_name: str,
+        tax_name: str,
+        tax_applied: Decimal,
+        fee_applied: Decimal,
+    ) -> None:
+        self._authority_names.append(intern_name(authority_name))
+        self._tax_names.append(intern_name(tax_name))
+        self._taxes.append(tax_applied)
+        self._fees.append(fee_applied)
+        self._total = None
+
+    def clear(self) -> None:
+        self._authority_names.clear()
+        self._tax_names.clear()
+        self._taxes.clear()
+        self._fees.clear()
+        self._total = Decimal(0)
+
+    @property
+    def total(self) -> Decimal:
+        """Sum of every detail's applied tax and fee"""
+        if self._total is None:
+            self._total = sum(self._taxes, Decimal(0)) + sum(self._fees, Decimal(0))
+        return self._total
+
+    def __len__(self) -> int:
+        return len(self._taxes)
+
+    @overload
+    def __getitem__(self, index: int) -> TaxationDetail: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[TaxationDetail]: ...
+
+    def __getitem__(self, index: int | slice) -> TaxationDetail | list[TaxationDetail]:
+        if isinstance(index, slice):
+            return list(self)[index]
+        return TaxationDetail(
+            authority_name=self._authority_names[index],
+            tax_name=self._tax_names[index],
+            tax_applied=self._taxes[index],
+            fee_applied=self._fees[index],
+        )
+
+    def __iter__(self) -> Iterator[TaxationDetail]:
+        for row in zip(
+            self._authority_names, self._tax_names, self._taxes, self._fees, strict=True
+        ):
+            yield TaxationDetail(*row)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, TaxationDetails | list | tuple):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({list(self)!r})"
+
+
 @runtime_checkable
 class TaxablePrice(Protocol):
     """Protocol for prices that have been monkey-patched with CCH tax methods."""
 
-    taxation_details: list[TaxationDetail]
+    taxation_details: Sequence[TaxationDetail]
     is_tax_known: bool
     tax: Decimal
 
@@ -30,6 +128,10 @@ class TaxablePrice(Protocol):
         tax_applied: Decimal | str = ...,
         fee_applied: Decimal | str = ...,
     ) -> None: ...
+    def add_taxes(
+        self,
+        taxes: Iterable[tuple[str, str, Decimal, Decimal]],
+    ) -> None: ...
 
 
 def _monkey_add_tax(
@@ -39,34 +141,52 @@ def _monkey_add_tax(
     tax_applied: Decimal | str = "0.00",
     fee_applied: Decimal | str = "0.00",
 ) -> None:
-    taxation_detail = TaxationDetail(
-        authority_name=authority_name,
-        tax_name=tax_name,
-        tax_applied=Decimal(tax_applied),
-        fee_applied=Decimal(fee_applied),
-    )
-    self.taxation_details.append(taxation_detail)
+    details = _get_taxation_details(self)
+    tax_applied = Decimal(tax_applied)
+    fee_applied = Decimal(fee_applied)
+    details.add(authority_name, tax_name, tax_applied, fee_applied)
 
     if not self.is_tax_known:
         self.tax = Decimal("0.00")
-    self.tax += taxation_detail.tax_applied
-    self.tax += taxation_detail.fee_applied
+    self.tax += tax_applied + fee_applied
+
+
+def _monkey_add_taxes(
+    self: "_MonkeyPatchedPrice",
+    taxes: Iterable[tuple[str, str, Decimal, Decimal]],
+) -> None:
+    details = _get_taxation_details(self)
+    added = Decimal("0.00")
+    for authority_name, tax_name, tax_applied, fee_applied in taxes:
+        details.add(authority_name, tax_name, tax_applied, fee_applied)
+        added += tax_applied + fee_applied
+    # Set the price's tax once, rather than adding to it for every detail
+    self.tax = (self.tax if self.is_tax_known else Decimal("0.00")) + added
 
 
 def _monkey_core_clear_taxes(self: "_MonkeyPatchedPrice") -> None:
-    self.taxation_details = []
+    _get_taxation_details(self).clear()
     self.is_tax_known = False
     self.incl_tax = None
 
 
 def _monkey_app_clear_taxes(self: "_MonkeyPatchedPrice") -> None:
-    self.taxation_details = []
+    _get_taxation_details(self).clear()
     self.tax = None  # type: ignore[assignment]  # FixedPrice.tax is Decimal | None; Price.tax is Decimal
 
 
+def _get_taxation_details(price: "_MonkeyPatchedPrice") -> TaxationDetails:
+    # The class-level default is shared and immutable, so give each price its own container the first time it's taxed.
+    details = price.__dict__.get("taxation_details")
+    if details is None:
+        details = price.taxation_details = TaxationDetails()
+    return details
+
+
 class _MonkeyPatchedPrice(core_prices.Price):
-    taxation_details: list[TaxationDetail] = []  # noqa: RUF012
+    taxation_details: Sequence[TaxationDetail] = ()
     add_tax = _monkey_add_tax
+    add_taxes = _monkey_add_taxes
     clear_taxes = _monkey_core_clear_taxes
 
 
@@ -74,14 +194,16 @@ def monkey_patch_prices() -> None:
     """
     MonkeyPatch a few new properties onto oscar.apps.partner.prices.FixedPrice.
     """
-    core_prices.Price.taxation_details = []  # type:ignore[attr-defined]
+    core_prices.Price.taxation_details = ()  # type:ignore[attr-defined]
     core_prices.Price.add_tax = _monkey_add_tax  # type:ignore[attr-defined]
+    core_prices.Price.add_taxes = _monkey_add_taxes  # type:ignore[attr-defined]
     core_prices.Price.clear_taxes = (  # type:ignore[attr-defined]
         _monkey_core_clear_taxes
     )
 
-    app_prices.FixedPrice.taxation_details = []  # type:ignore[attr-defined]
+    app_prices.FixedPrice.taxation_details = ()  # type:ignore[attr-defined]
     app_prices.FixedPrice.add_tax = _monkey_add_tax  # type:ignore[attr-defined]
+    app_prices.FixedPrice.add_taxes = _monkey_add_taxes  # type:ignore[attr-defined]
     app_prices.FixedPrice.clear_taxes = (  # type:ignore[attr-defined]
         _monkey_app_clear_taxes
     )
@@ -120,6 +242,17 @@ class ShippingChargeComponent(_MonkeyPatchedPrice):
     def cch_sku(self) -> str:
         return self._cch_sku
 
+    def tax_fingerprint(self) -> str:
+        """
+        Return a digest of the fields sent to CCH for this component: its line ID, SKU and price. Components
+        with equal fingerprints are taxed identically at the same address.
+        """
+        return make_tax_fingerprint(
+            self.cch_line_id,
+            self.cch_sku,
+            self.excl_tax.quantize(UNIT_PRICE_PRECISION),
+        )
+
 
 class ShippingCharge(core_prices.Price):
     # Code used to store the vat rate reference
@@ -184,6 +317,13 @@ class ShippingCharge(core_prices.Price):
             return f"{self.__class__.__name__}(currency={self.currency!r}, excl_tax={self.excl_tax!r}, incl_tax={self.incl_tax!r}, tax={self.tax!r})"
         return f"{self.__class__.__name__}(currency={self.currency!r}, excl_tax={self.excl_tax!r})"
 
+    def tax_fingerprint(self) -> str:
+        """
+        Return a digest of the fields sent to CCH for every component of this charge. Charges with equal
+        fingerprints are taxed identically at the same address.
+        """
+        return make_tax_fingerprint(*(c.tax_fingerprint() for c in self.components))
+
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, ShippingCharge):
             return False
@@ -0,0 +1,191 @@
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, TypeVar
+import asyncio
+import logging
+import random
+import time
+
+import requests
+import zeep.exceptions
+
+from . import exceptions
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+#: Monotonic time by which the current call to :func:`RetryPolicy.call` must finish, if any.
+_deadline: ContextVar[float | None] = ContextVar("oscarcch_deadline", default=None)
+
+#: Exceptions which indicate a transient failure, so that the request may succeed if retried.
+RETRYABLE_EXCEPTIONS: tuple[type[BaseException], ...] = (
+    requests.exceptions.Timeout,
+    requests.exceptions.ConnectionError,
+    exceptions.CCHSystemError,
+)
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    pass
+else:
+    RETRYABLE_EXCEPTIONS += (httpx.TimeoutException, httpx.NetworkError)
+
+
+class DeadlineExceeded(TimeoutError):
+    """
+    Raised when a request can't be (re)tried because its deadline has passed.
+    """
+
+
+class RetryPolicy:
+    """
+    Retry failed requests using exponential backoff with full jitter, within an overall deadline.
+
+    Only transient failures (timeouts, connection errors and CCH system errors) are retried. Anything else, such
+    as a :class:`CCHRequestError <oscarcch.exceptions.CCHRequestError>` or an open circuit breaker, would fail
+    the same way again, so it's raised immediately.
+
+    The deadline bounds the whole call, including every retry and the backoff delays between them: no retry is
+    started, and no backoff delay is slept, which would run past it. While a call is in progress, its deadline is
+    also available from :func:`get_remaining_time`, which the shared SOAP client uses to shorten the timeout of
+    the final attempt.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 2,
+        backoff: float = 0.1,
+        max_backoff: float = 2.0,
+        deadline: float | None = None,
+        on_retry: Callable[[BaseException], None] | None = None,
+    ):
+        """
+        :param max_retries: Max number of times to retry a failed request
+        :param backoff: Upper bound of the delay before the first retry, in seconds. Doubled for each retry.
+        :param max_backoff: Cap on the upper bound of the delay before any retry, in seconds
+        :param deadline: Max number of seconds the whole call, including retries, may take. ``None`` means no limit.
+        :param on_retry: Optional callback, called with the exception of each attempt which is about to be retried
+        """
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.deadline = deadline
+        self.on_retry = on_retry
+
+    def call(self, func: Callable[..., T], *args: Any) -> T:
+        """
+        Call ``func(*args)``, retrying it if it fails with a retryable exception.
+
+        :return: The result of the first successful call
+        :raises DeadlineExceeded: if the deadline passes before any attempt could be made
+        :raises Exception: the exception raised by the last attempt
+        """
+        with self._deadline_scope() as deadline:
+            retry_count = 0
+            while True:
+                self._check_deadline(deadline)
+                try:
+                    return func(*args)
+                except Exception as e:
+                    delay = self._get_retry_delay(e, retry_count, deadline)
+                    if delay is None:
+                        raise
+                    logger.warning("Retrying CCH request in %.3fs after %r", delay, e)
+                    if self.on_retry is not None:
+                        self.on_retry(e)
+                time.sleep(delay)
+                retry_count += 1
+
+    async def call_async(self, func: Callable[..., Awaitable[T]], *args: Any) -> T:
+        """
+        Await ``func(*args)``, retrying it if it fails with a retryable exception.
+
+        See :func:`call`. Each attempt is also cancelled if it's still running when the deadline passes.
+        """
+        with self._deadline_scope() as deadline:
+            retry_count = 0
+            while True:
+                self._check_deadline(deadline)
+                try:
+                    timeout = None if deadline is None else deadline - time.monotonic()
+                    return await asyncio.wait_for(func(*args), timeout)
+                except Exception as e:
+                    # ``wait_for`` raises a bare TimeoutError when the deadline passes mid-attempt.
+                    if (
+                        isinstance(e, TimeoutError)
+                        and deadline is not None
+                        and time.monotonic() >= deadline
+                    ):
+                        raise DeadlineExceeded("CCH request deadline exceeded") from e
+                    delay = self._get_retry_delay(e, retry_count, deadline)
+                    if delay is None:
+                        raise
+                    logger.warning("Retrying CCH request in %.3fs after %r", delay, e)
+                    if self.on_retry is not None:
+                        self.on_retry(e)
+                await asyncio.sleep(delay)
+                retry_count += 1
+
+    def get_backoff(self, retry_count: int) -> float:
+        """
+        Return a random number of seconds to wait before the given retry (numbered from 0).
+        """
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2**retry_count))
+
+    def is_retryable(self, exc: BaseException) -> bool:
+        """
+        Return whether the given exception indicates a transient failure, so that the request should be retried.
+        """
+        if isinstance(exc, DeadlineExceeded):
+            return False
+        if isinstance(exc, zeep.exceptions.TransportError):
+            # 5xx responses from an overloaded server or proxy are transient; 4xx responses aren't.
+            return exc.status_code >= 500 or exc.status_code == 429
+        return isinstance(exc, RETRYABLE_EXCEPTIONS)
+
+    def _get_retry_delay(
+        self,
+        exc: BaseException,
+        retry_count: int,
+        deadline: float | None,
+    ) -> float | None:
+        """Return how long to wait before retrying, or ``None`` if the request must not be retried."""
+        if retry_count >= self.max_retries or not self.is_retryable(exc):
+            return None
+        delay = self.get_backoff(retry_count)
+        if deadline is not None and time.monotonic() + delay >= deadline:
+            return None
+        return delay
+
+    def _check_deadline(self, deadline: float | None) -> None:
+        if deadline is not None and time.monotonic() >= deadline:
+            raise DeadlineExceeded("CCH request deadline exceeded")
+
+    @contextmanager
+    def _deadline_scope(self) -> Iterator[float | None]:
+        deadline = None
+        if self.deadline is not None:
+            deadline = time.monotonic() + self.deadline
+        # An enclosing call's deadline still applies, if it's sooner.
+        outer = _deadline.get()
+        if outer is not None and (deadline is None or outer < deadline):
+            deadline = outer
+        token = _deadline.set(deadline)
+        try:
+            yield deadline
+        finally:
+            _deadline.reset(token)
+
+
+def get_remaining_time() -> float | None:
+    """
+    Return the number of seconds left before the deadline of the current call to :func:`RetryPolicy.call`, or
+    ``None`` if there's no deadline.
+    """
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
@@ -0,0 +1,300 @@
+"""
+Precompiled serializer for CalculateRequest messages.
+
+zeep validates and renders every request against the whole schema, building an lxml tree which is then serialized,
+which dominates the CPU time spent sending large orders. When ``CCH_PRECOMPILE_REQUESTS`` is enabled, the shape of
+the CalculateRequest message is instead compiled once per client from its WSDL, and requests are written directly
+as bytes. The output is byte-for-byte identical to zeep's, so CCH can't tell the difference.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any, NamedTuple
+import logging
+import re
+import threading
+import uuid
+import weakref
+
+from zeep.wsdl.bindings.soap import Soap11Binding
+from zeep.xsd import AnySimpleType, ComplexType, Element, Nil, Sequence
+from zeep.xsd.const import NotSet
+import requests
+import zeep
+import zeep.exceptions
+
+logger = logging.getLogger(__name__)
+
+NS_SOAP_ENV = "http://schemas.xmlsoap.org/soap/envelope/"
+NS_WSA = "http://www.w3.org/2005/08/addressing"
+NS_XSI = "http://www.w3.org/2001/XMLSchema-instance"
+
+_NIL = f' xmlns:xsi="{NS_XSI}" xsi:nil="true"/>'
+
+# Characters which lxml refuses to put in a document
+_INVALID_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff￾￿]")
+
+_serializers: weakref.WeakKeyDictionary[
+    zeep.Client, CalculateRequestSerializer | None
+] = weakref.WeakKeyDictionary()
+_serializers_lock = threading.Lock()
+
+
+class UnsupportedSchema(ValueError):
+    """
+    Raised when a message uses a schema construct which :class:`CalculateRequestSerializer` can't write.
+    """
+
+
+class _Field(NamedTuple):
+    name: str
+    namespace: str
+    localname: str
+    is_optional: bool
+    nillable: bool
+    accepts_multiple: bool
+    #: Converts a value to text, for simple types
+    xmlvalue: Callable[[Any], str] | None
+    #: Child elements, for complex types
+    children: tuple[_Field, ...]
+
+
+class CalculateRequestSerializer:
+    """
+    Write SOAP requests for a single operation of a zeep client, without going through zeep's schema objects.
+
+    Only clients using SOAP 1.1, without plugins, WS-Security or custom namespace prefixes, and operations whose
+    input is made of sequences of elements, are supported. Unlike zeep, values aren't validated against their
+    types, except for required elements being present.
+    """
+
+    def __init__(self, client: zeep.Client, operation_name: str = "CalculateRequest"):
+        """
+        :param client: Client whose WSDL describes the operation
+        :param operation_name: Name of the operation to write requests for
+        :raises UnsupportedSchema: if the client or operation can't be handled
+        """
+        binding = client.service._binding
+        if not isinstance(binding, Soap11Binding):
+            raise UnsupportedSchema(f"Unsupported binding {binding!r}")
+        if client.plugins or client.wsse or client.wsdl.types._prefix_map_custom:
+            raise UnsupportedSchema(
+                "Clients with plugins or custom prefixes are unsupported"
+            )
+        self.client = client
+        self.operation = binding.get(operation_name)
+        if self.operation.input._is_body_wrapped:
+            raise UnsupportedSchema("Wrapped message bodies are unsupported")
+        self.address: str = client.service._binding_options["address"]
+        self.wsa_action: str | None = self.operation.abstract.wsa_action
+        self.body = _compile_element(self.operation.input.body)
+        # WS-Addressing header, on either side of its message ID
+        self._header: tuple[str, str] | None = None
+        if self.wsa_action:
+            self._header = (
+                (
+                    f'<soap-env:Header xmlns:wsa="{NS_WSA}">'
+                    f"<wsa:Action>{_escape(self.wsa_action)}</wsa:Action>"
+                    "<wsa:MessageID>urn:uuid:"
+                ),
+                (
+                    f"</wsa:MessageID><wsa:To>{_escape(self.address)}</wsa:To>"
+                    "</soap-env:Header>"
+                ),
+            )
+        soapaction = self.operation.soapaction
+        self.http_headers = {
+            "SOAPAction": f'"{soapaction}"' if soapaction else '""',
+            "Content-Type": "text/xml; charset=utf-8",
+        }
+
+    def serialize(self, *args: Any) -> bytes:
+        """
+        Return the SOAP envelope for a call to the operation with the given arguments.
+
+        :param args: Positional arguments of the operation, as they'd be passed to ``client.service.<operation>``
+        :raises zeep.exceptions.ValidationError: if a required element is missing
+        :raises ValueError: if a value contains characters which aren't allowed in XML
+        """
+        names = [child.name for child in self.body.children]
+        if len(args) > len(names):
+            raise TypeError(
+                f"{self.body.localname}() takes {len(names)} arguments but {len(args)} were given"
+            )
+        writer = _Writer()
+        parts = writer.parts
+        parts.append(
+            f"<?xml version='1.0' encoding='utf-8'?>\n"
+            f'<soap-env:Envelope xmlns:soap-env="{NS_SOAP_ENV}">'
+        )
+        if self._header is not None:
+            parts.extend((self._header[0], str(uuid.uuid4()), self._header[1]))
+        parts.append("<soap-env:Body>")
+        writer.write(self.body, dict(zip(names, args)), {NS_SOAP_ENV: "soap-env"})
+        parts.append("</soap-env:Body></soap-env:Envelope>")
+        return "".join(parts).encode("utf-8")
+
+    def send(self, *args: Any, stream: bool = False) -> requests.Response:
+        """
+        Call the operation with the given arguments, and return the raw HTTP response.
+
+        :param stream: See :meth:`post`
+        """
+        return self.post(self.serialize(*args), stream=stream)
+
+    def post(self, message: bytes, stream: bool = False) -> requests.Response:
+        """
+        Send a message written by :meth:`serialize`, and return the raw HTTP response.
+
+        :param stream: Return as soon as the response's headers have been received, leaving its body to be read
+            from ``response.raw``. The response must then be closed by the caller.
+        """
+        http_headers = dict(self.http_headers)
+        if self.client.settings.extra_http_headers:
+            http_headers.update(self.client.settings.extra_http_headers)
+        transport = self.client.transport
+        if not stream:
+            return transport.post(self.address, message, http_headers)
+        return transport.session.post(
+            self.address,
+            data=message,
+            headers=http_headers,
+            timeout=transport.operation_timeout,
+            stream=True,
+        )
+
+    def process_reply(self, response: requests.Response) -> Any:
+        """
+        Parse a response returned by :meth:`send` with zeep, as ``client.service.<operation>`` would.
+        """
+        return self.client.service._binding.process_reply(
+            self.client, self.operation, response
+        )
+
+
+def get_request_serializer(client: zeep.Client) -> CalculateRequestSerializer | None:
+    """
+    Return the serializer for CalculateRequest messages of the given client, compiling it on first use.
+
+    :return: A :class:`CalculateRequestSerializer`, or ``None`` if the client's WSDL isn't supported, in which case
+        requests should be sent through zeep.
+    """
+    try:
+        return _serializers[client]
+    except KeyError:
+        pass
+    with _serializers_lock:
+        if client not in _serializers:
+            try:
+                _serializers[client] = CalculateRequestSerializer(client)
+            except UnsupportedSchema as e:
+                logger.warning("Can't precompile CalculateRequest messages: %s", e)
+                _serializers[client] = None
+        return _serializers[client]
+
+
+def _compile_element(element: Any) -> _Field:
+    if not isinstance(element, Element):
+        raise UnsupportedSchema(f"Unsupported element {element!r}")
+    xsd_type = element.type
+    xmlvalue = None
+    children: tuple[_Field, ...] = ()
+    if isinstance(xsd_type, AnySimpleType):
+        xmlvalue = xsd_type.xmlvalue
+    elif isinstance(xsd_type, ComplexType):
+        if xsd_type.attributes:
+            raise UnsupportedSchema(f"Unsupported attributes in {xsd_type.name}")
+        nested = xsd_type.elements_nested
+        if nested:
+            ((_, indicator),) = nested
+            if type(indicator) is not Sequence or indicator.accepts_multiple:
+                raise UnsupportedSchema(f"Unsupported content in {xsd_type.name}")
+            children = tuple(_compile_element(child) for _, child in xsd_type.elements)
+    else:
+        raise UnsupportedSchema(f"Unsupported type {xsd_type!r}")
+    return _Field(
+        name=element.attr_name,
+        namespace=element.qname.namespace,
+        localname=element.qname.localname,
+        is_optional=element.is_optional,
+        nillable=element.nillable,
+        accepts_multiple=element.accepts_multiple,
+        xmlvalue=xmlvalue,
+        children=children,
+    )
+
+
+def _escape(text: str) -> str:
+    if _INVALID_CHARS.search(text):
+        raise ValueError(
+            "All strings must be XML compatible: Unicode or ASCII, no NULL bytes or control characters"
+        )
+    return (
+        text.replace("&", "&amp;")
+        .replace("<", "&lt;")
+        .replace(">", "&gt;")
+        .replace("\r", "&#13;")
+    )
+
+
+class _Writer:
+    """
+    Writes elements the way zeep renders them with lxml.
+
+    Like lxml, an element reuses the prefix of its namespace if an ancestor declared one, and otherwise declares
+    a new ``nsN`` prefix, numbered in document order.
+    """
+
+    __slots__ = ("_next_prefix", "parts")
+
+    def __init__(self) -> None:
+        self.parts: list[str] = []
+        self._next_prefix = 0
+
+    def write(self, field: _Field, value: Any, scope: dict[str, str]) -> None:
+        if field.accepts_multiple and isinstance(value, list):
+            for item in value:
+                self._write_item(field, item, scope)
+        else:
+            self._write_item(field, value, scope)
+
+    def _write_item(self, field: _Field, value: Any, scope: dict[str, str]) -> None:
+        parts = self.parts
+        if value is None or value is NotSet:
+            if field.is_optional:
+                return
+            if not field.nillable:
+                raise zeep.exceptions.ValidationError(f"Missing element {field.name}")
+            value = Nil
+        prefix = scope.get(field.namespace)
+        if prefix is None:
+            prefix = f"ns{self._next_prefix}"
+            self._next_prefix += 1
+            scope = {**scope, field.namespace: prefix}
+            parts.append(
+                f'<{prefix}:{field.localname} xmlns:{prefix}="{field.namespace}"'
+            )
+        else:
+            parts.append(f"<{prefix}:{field.localname}")
+        if value is Nil:
+            parts.append(_NIL)
+            return
+        if field.xmlvalue is not None:
+            parts.append(
+                f">{_escape(field.xmlvalue(value))}</{prefix}:{field.localname}>"
+            )
+            return
+        end = len(parts)
+        parts.append(">")
+        for child in field.children:
+            # Values may be CompoundValues as well as dicts, which don't have a ``get`` method
+            try:
+                child_value = value[child.name]
+            except KeyError:
+                child_value = NotSet
+            self.write(child, child_value, scope)
+        if len(parts) == end + 1:
+            parts[end] = "/>"
+        else:
+            parts.append(f"</{prefix}:{field.localname}>")
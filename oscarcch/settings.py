@@ -14,9 +14,33 @@ def overridable(name: str, default: Any = None, required: bool = False) -> Any:
 #: Full URL of the CCH WSDL.
 CCH_WSDL: str = overridable("CCH_WSDL", required=True)
 
+#: Optional: Local directory in which to persist the WSDL and XSD documents, so that new worker processes can build
+#: their SOAP client without fetching them over the network. Disabled by default.
+CCH_WSDL_CACHE_DIR: str | None = overridable("CCH_WSDL_CACHE_DIR")
+
+#: Number of seconds for which documents in ``CCH_WSDL_CACHE_DIR`` are considered fresh. Defaults to one day. Set it
+#: to ``None`` when the cache is warmed while building an image, so that the documents baked into the image never
+#: expire. Expired documents are still used if they can't be fetched again.
+CCH_WSDL_CACHE_TIMEOUT: int | None = overridable("CCH_WSDL_CACHE_TIMEOUT", 86400)
+
 #: Optional: http(s) proxy url
 CCH_PROXY_URL: str | None = overridable("CCH_PROXY_URL")
 
+#: Number of connection pools (one per host) kept by the HTTP adapter shared by all CCH clients in a process.
+CCH_POOL_CONNECTIONS: int = overridable("CCH_POOL_CONNECTIONS", 10)
+
+#: Max number of connections to CCH kept open for reuse by each process. Should be at least the number of
+#: threads which may calculate taxes concurrently.
+CCH_POOL_MAXSIZE: int = overridable("CCH_POOL_MAXSIZE", 10)
+
+#: Whether to wait for a pooled connection to become free when all ``CCH_POOL_MAXSIZE`` connections are in use,
+#: rather than opening an extra connection which is closed after use. Defaults to False.
+CCH_POOL_BLOCK: bool = overridable("CCH_POOL_BLOCK", False)
+
+#: Whether to enable TCP keep-alive on pooled connections to CCH, so that idle connections (and their negotiated
+#: TLS sessions) aren't silently dropped by firewalls or load balancers. Defaults to True.
+CCH_TCP_KEEPALIVE: bool = overridable("CCH_TCP_KEEPALIVE", True)
+
 # SOAP WSDL-open timeout.
 CCH_OPEN_TIMEOUT: tuple[float, float] = overridable("CCH_OPEN_TIMEOUT", (3.05, 10))
 
@@ -26,6 +50,116 @@ CCH_SEND_TIMEOUT: tuple[float, float] = overridable("CCH_SEND_TIMEOUT", (3.05, 1
 #: Max number of times to retry to calculate tax before giving up.
 CCH_MAX_RETRIES: int = overridable("CCH_MAX_RETRIES", 2)
 
+#: Upper bound, in seconds, of the random delay before the first retry. The bound doubles for each further retry
+#: (exponential backoff with full jitter). Defaults to ``0.1``.
+CCH_RETRY_BACKOFF: float = overridable("CCH_RETRY_BACKOFF", 0.1)
+
+#: Cap, in seconds, on the upper bound of the delay before any retry. Defaults to 2 seconds.
+CCH_RETRY_MAX_BACKOFF: float = overridable("CCH_RETRY_MAX_BACKOFF", 2.0)
+
+#: Max number of seconds a tax calculation may spend calling CCH, including every retry and the delays between
+#: them. The timeout of the last attempt is shortened to fit. ``None`` means no limit. Defaults to 15 seconds.
+CCH_RETRY_DEADLINE: float | None = overridable("CCH_RETRY_DEADLINE", 15.0)
+
+#: Whether to hedge slow CalculateRequest calls: when no response has arrived after ``CCH_HEDGE_DELAY``, or the
+#: ``CCH_HEDGE_PERCENTILE`` of recent response times, a second identical request is sent, and the first valid response
+#: is used. Finalized transactions are never hedged. A hedged call counts as a single call of the circuit breaker, which
+#: only records a failure if neither request succeeds. Defaults to False.
+CCH_HEDGE_REQUESTS: bool = overridable("CCH_HEDGE_REQUESTS", False)
+
+#: Number of seconds after which to hedge a request, until enough response times have been observed to use
+#: ``CCH_HEDGE_PERCENTILE`` instead. Defaults to 1 second.
+CCH_HEDGE_DELAY: float = overridable("CCH_HEDGE_DELAY", 1.0)
+
+#: Percentile of recent response times after which to hedge a request. Defaults to ``0.95`` (p95).
+CCH_HEDGE_PERCENTILE: float = overridable("CCH_HEDGE_PERCENTILE", 0.95)
+
+#: Max number of hedged requests per CalculateRequest call, on average, so that hedging can't multiply the load
+#: on CCH. Defaults to ``0.1``, i.e. at most 10% more requests.
+CCH_HEDGE_MAX_RATE: float = overridable("CCH_HEDGE_MAX_RATE", 0.1)
+
+#: Max number of threads from which hedged calls send their requests. Should be at least the number of threads which
+#: calculate taxes concurrently in each process (e.g. the server's thread count), plus room for hedges. When every
+#: thread is busy, requests are sent from the caller's thread, without hedging. Defaults to 32.
+CCH_HEDGE_MAX_WORKERS: int = overridable("CCH_HEDGE_MAX_WORKERS", 32)
+
+#: Max number of concurrent requests sent to CCH by ``CCHTaxCalculator.apply_taxes_many``.
+CCH_BATCH_MAX_WORKERS: int = overridable("CCH_BATCH_MAX_WORKERS", 8)
+
+#: Max number of line items to send to CCH in a single CalculateRequest. Larger orders are split into several
+#: requests, sent concurrently (using up to ``CCH_BATCH_MAX_WORKERS`` threads), whose responses are merged back into
+#: one. Shipping charge components are all sent in the first request, whose transaction ID is the one reported for
+#: the whole order. The requests of a split order count as a single call of the circuit breaker. Finalized
+#: transactions are never split. Defaults to ``0``, which disables splitting.
+CCH_SPLIT_ORDER_LINES: int = overridable("CCH_SPLIT_ORDER_LINES", 0)
+
+#: Whether to parse CalculateRequest responses directly with lxml, into the slim structures of
+#: ``oscarcch.responses``, rather than materializing them as zeep objects. Much faster for large orders. Only applies
+#: to ``CCHTaxCalculator``; ``AsyncCCHTaxCalculator`` always uses zeep. Defaults to False.
+CCH_PARSE_RAW_RESPONSES: bool = overridable("CCH_PARSE_RAW_RESPONSES", False)
+
+#: Write CalculateRequest messages with the serializer in ``oscarcch.serializer``, which is compiled once per client
+#: from the WSDL, rather than having zeep validate and render them. Its output is identical to zeep's. Only applies
+#: to ``CCHTaxCalculator``; ``AsyncCCHTaxCalculator`` always uses zeep. Defaults to False.
+CCH_PRECOMPILE_REQUESTS: bool = overridable("CCH_PRECOMPILE_REQUESTS", False)
+
+#: Parse CalculateRequest responses incrementally, applying each line's taxes as soon as they've been read and then
+#: releasing them, so that memory use doesn't grow with the number of lines. The response returned by
+#: ``apply_taxes`` then has no ``LineItemTaxes``, and responses are neither cached nor hedged. Only applies to
+#: ``CCHTaxCalculator.apply_taxes``, and never to placing orders, which need every line's taxes to save them. The
+#: response is only read as it's parsed when the precompiled serializer supports the WSDL; otherwise, the whole
+#: response body is read into memory first. Defaults to False.
+CCH_STREAM_RESPONSES: bool = overridable("CCH_STREAM_RESPONSES", False)
+
+#: Number of seconds for which to cache CalculateRequest responses, keyed by the contents of the order. Repeated
+#: calculations for an unchanged basket and address are then served without calling CCH. Responses are never
+#: cached when ``CCH_FINALIZE_TRANSACTION`` is enabled. Defaults to ``0``, which disables the cache.
+CCH_RESPONSE_CACHE_TIMEOUT: int = overridable("CCH_RESPONSE_CACHE_TIMEOUT", 0)
+
+#: Alias of the Django cache (from ``settings.CACHES``) used to cache CalculateRequest responses.
+CCH_RESPONSE_CACHE_ALIAS: str = overridable("CCH_RESPONSE_CACHE_ALIAS", "default")
+
+#: Whether to recalculate taxes incrementally: the taxes CCH returns for each line are cached in the
+#: ``CCH_RESPONSE_CACHE_ALIAS`` cache, and when taxes are recalculated for the same address, only the lines (or
+#: shipping charge components) which changed since are sent to CCH. Shipping charge components are always sent along
+#: with every line, since CCH decides whether shipping is taxable from the goods shipped. Finalized transactions, and
+#: the requests sent by ``CCHOrderCreatorMixin`` while placing orders, are always sent in full. Defaults to False.
+CCH_INCREMENTAL_RECALCULATION: bool = overridable(
+    "CCH_INCREMENTAL_RECALCULATION", False
+)
+
+#: Number of seconds for which the taxes of each line are cached when ``CCH_INCREMENTAL_RECALCULATION`` is enabled.
+#: Defaults to 15 minutes.
+CCH_LINE_RESULT_CACHE_TIMEOUT: int = overridable("CCH_LINE_RESULT_CACHE_TIMEOUT", 900)
+
+#: Whether ``CCHOrderCreatorMixin`` should call CCH through a circuit breaker whose state is shared, through the Django
+#: cache, by every worker process. Defaults to True.
+CCH_CIRCUIT_BREAKER_ENABLED: bool = overridable("CCH_CIRCUIT_BREAKER_ENABLED", True)
+
+#: Number of consecutive failed calls to CCH which open the circuit breaker. Defaults to 5.
+CCH_CIRCUIT_BREAKER_FAIL_MAX: int = overridable("CCH_CIRCUIT_BREAKER_FAIL_MAX", 5)
+
+#: Number of seconds after which an open circuit breaker lets a trial call through to CCH. Defaults to 60 seconds.
+CCH_CIRCUIT_BREAKER_RESET_TIMEOUT: float = overridable(
+    "CCH_CIRCUIT_BREAKER_RESET_TIMEOUT", 60
+)
+
+#: Alias of the Django cache (from ``settings.CACHES``) used to share the circuit breaker's state. It must be a cache
+#: shared by every worker process, such as Redis or Memcached: with a local-memory cache, each process has its own
+#: breaker state, and a system check (``oscarcch.W001``) warns about it.
+CCH_CIRCUIT_BREAKER_CACHE_ALIAS: str = overridable(
+    "CCH_CIRCUIT_BREAKER_CACHE_ALIAS", "default"
+)
+
+#: Optional: Dotted path of the :class:`MetricsRecorder <oscarcch.metrics.MetricsRecorder>` subclass which receives
+#: the timings, sizes, retries, errors and circuit breaker transitions of tax calculations, such as
+#: ``"oscarcch.metrics.PrometheusMetricsRecorder"``. Disabled by default.
+CCH_METRICS_RECORDER: str | None = overridable("CCH_METRICS_RECORDER")
+
+#: Max number of distinct authority and tax names kept in the process-wide interning table, so that the copies of
+#: each name parsed from every response share memory. Defaults to 4096. ``0`` disables interning.
+CCH_INTERN_TABLE_SIZE: int = overridable("CCH_INTERN_TABLE_SIZE", 4096)
+
 #: Default entity code to send to CCH.
 CCH_ENTITY: str = overridable("CCH_ENTITY", required=True)
 
@@ -50,6 +184,18 @@ CCH_PROVIDER_TYPE: str = overridable("CCH_PROVIDER_TYPE", "70")
 #: Whether or not to set the CCH finalize transaction flag. Defaults to False.
 CCH_FINALIZE_TRANSACTION: bool = overridable("CCH_FINALIZE_TRANSACTION", False)
 
+#: Whether ``CCHOrderCreatorMixin`` should save only the order's ``OrderTaxation`` while placing an order, and queue
+#: the line and shipping taxation details to be saved later by the ``cch_process_taxation_outbox`` management
+#: command. Defaults to False.
+CCH_DEFER_TAXATION_DETAILS: bool = overridable("CCH_DEFER_TAXATION_DETAILS", False)
+
+#: Whether to keep saving all the data of each line and shipping taxation detail in its HStore ``data`` column, in
+#: addition to its normalized columns. Disable once every reader uses the normalized columns, and existing details
+#: have been migrated by the ``cch_migrate_taxation_details`` management command. Defaults to True.
+CCH_SAVE_TAXATION_DETAILS_DATA: bool = overridable(
+    "CCH_SAVE_TAXATION_DETAILS_DATA", True
+)
+
 #: Default CCH Product SKU. Can be overridden by creating and setting a Product attribute called cch_product_sku.
 CCH_PRODUCT_SKU: str = overridable("CCH_PRODUCT_SKU", "")
 
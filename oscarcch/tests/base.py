@@ -663,3 +663,53 @@ class BaseTest(TestCase):
                 </s:Body>
             </s:Envelope>"""
         return resp
+
+    def _get_cch_tax_rates_response(self):
+        resp = """
+            <s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/">
+                <s:Body>
+                    <GetTaxRatesResponse xmlns="http://schemas.cch.com/STOService/3.5">
+                        <GetTaxRatesResult xmlns:a="http://schemas.cch.com/TaxLiabilityResponse/3.5" xmlns:i="http://www.w3.org/2001/XMLSchema-instance">
+                            <a:EstimatedTotalFee>0.000000</a:EstimatedTotalFee>
+                            <a:EstimatedTotalTaxRate>0.088750000000</a:EstimatedTotalTaxRate>
+                            <a:Messages xmlns:b="http://schemas.cch.com/Message/3.5"/>
+                            <a:TaxItems xmlns:b="http://schemas.cch.com/TaxItem/3.5">
+                                <b:TaxItem>
+                                    <b:AuthorityName>NEW YORK, STATE OF</b:AuthorityName>
+                                    <b:AuthorityType>1</b:AuthorityType>
+                                    <b:Fee>0.000000</b:Fee>
+                                    <b:ImposedFee>0.000000</b:ImposedFee>
+                                    <b:ImposedRate>0.040000000000</b:ImposedRate>
+                                    <b:IsTieredTax>false</b:IsTieredTax>
+                                    <b:PercentTaxable>1.000000</b:PercentTaxable>
+                                    <b:Rate>0.040000000000</b:Rate>
+                                    <b:TaxName>STATE SALES TAX-GENERAL MERCHANDISE</b:TaxName>
+                                </b:TaxItem>
+                                <b:TaxItem>
+                                    <b:AuthorityName>NEW YORK, CITY OF</b:AuthorityName>
+                                    <b:AuthorityType>3</b:AuthorityType>
+                                    <b:Fee>0.000000</b:Fee>
+                                    <b:ImposedFee>0.000000</b:ImposedFee>
+                                    <b:ImposedRate>0.045000000000</b:ImposedRate>
+                                    <b:IsTieredTax>false</b:IsTieredTax>
+                                    <b:PercentTaxable>1.000000</b:PercentTaxable>
+                                    <b:Rate>0.045000000000</b:Rate>
+                                    <b:TaxName>COUNTY SALES TAX-GENERAL MERCHANDISE</b:TaxName>
+                                </b:TaxItem>
+                                <b:TaxItem>
+                                    <b:AuthorityName>METROPOLITAN TRANSPORTATION AUTHORITY</b:AuthorityName>
+                                    <b:AuthorityType>4</b:AuthorityType>
+                                    <b:Fee>0.000000</b:Fee>
+                                    <b:ImposedFee>0.000000</b:ImposedFee>
+                                    <b:ImposedRate>0.003750000000</b:ImposedRate>
+                                    <b:IsTieredTax>false</b:IsTieredTax>
+                                    <b:PercentTaxable>1.000000</b:PercentTaxable>
+                                    <b:Rate>0.003750000000</b:Rate>
+                                    <b:TaxName>COUNTY LOCAL SALES TAX-GENERAL MERCHANDISE</b:TaxName>
+                                </b:TaxItem>
+                            </a:TaxItems>
+                        </GetTaxRatesResult>
+                    </GetTaxRatesResponse>
+                </s:Body>
+            </s:Envelope>"""
+        return resp
@@ -0,0 +1,100 @@
+from decimal import Decimal as D
+
+from asgiref.sync import async_to_sync
+import httpx
+import pybreaker
+import respx
+
+from ..calculator import AsyncCCHTaxCalculator
+from ..client import clear_clients
+from .base import BaseTest
+
+CCH_URL = "http://testserver/TAXCCH/Service3.5.svc"
+
+
+class AsyncCCHTaxCalculatorTest(BaseTest):
+    def setUp(self):
+        super().setUp()
+        clear_clients()
+
+    def apply_taxes(self, calc, *args):
+        return async_to_sync(calc.apply_taxes)(*args)
+
+    def test_apply_taxes_normal(self):
+        basket = self.prepare_basket()
+        to_address = self.get_to_address()
+        shipping_charge = self.get_shipping_charge()
+
+        with respx.mock() as router:
+            route = router.post(CCH_URL).mock(
+                return_value=httpx.Response(
+                    200,
+                    text=self._get_cch_response_normal(basket.all_lines()[0].id),
+                )
+            )
+            resp = self.apply_taxes(
+                AsyncCCHTaxCalculator(), to_address, basket, shipping_charge
+            )
+
+        self.assertEqual(route.call_count, 1)
+        self.assertEqual(resp.TransactionStatus, 4)
+        self.assertTrue(basket.is_tax_known)
+        self.assertEqual(basket.total_incl_tax, D("10.89"))
+        self.assertEqual(basket.total_tax, D("0.89"))
+        self.assertTrue(shipping_charge.is_tax_known)
+        self.assertEqual(shipping_charge.incl_tax, D("16.3203625"))
+
+    def test_apply_taxes_read_timeout_retried(self):
+        basket = self.prepare_basket()
+        to_address = self.get_to_address()
+
+        with respx.mock() as router:
+            route = router.post(CCH_URL).mock(
+                side_effect=[
+                    httpx.ReadTimeout("timed out"),
+                    httpx.Response(
+                        200,
+                        text=self._get_cch_response_normal(basket.all_lines()[0].id),
+                    ),
+                ]
+            )
+            resp = self.apply_taxes(AsyncCCHTaxCalculator(), to_address, basket)
+
+        self.assertIsNotNone(resp)
+        self.assertEqual(route.call_count, 2)
+        self.assertEqual(basket.total_tax, D("0.89"))
+
+    def test_apply_taxes_read_timeout_circuit_breaker(self):
+        basket = self.prepare_basket()
+        to_address = self.get_to_address()
+
+        circuit_breaker = pybreaker.CircuitBreaker(fail_max=2, reset_timeout=60)
+        calc = AsyncCCHTaxCalculator(breaker=circuit_breaker)
+        calc.max_retries = 0
+
+        with respx.mock() as router:
+            route = router.post(CCH_URL).mock(
+                side_effect=httpx.ReadTimeout("timed out")
+            )
+            for expected_calls in (1, 2, 2):
+                self.assertIsNone(self.apply_taxes(calc, to_address, basket))
+                self.assertEqual(route.call_count, expected_calls)
+                self.assertTrue(basket.is_tax_known)
+                self.assertEqual(basket.total_tax, D("0.00"))
+        self.assertEqual(circuit_breaker.current_state, pybreaker.STATE_OPEN)
+
+    def test_apply_taxes_cch_db_error_passes_silently(self):
+        basket = self.prepare_basket()
+        to_address = self.get_to_address()
+
+        with respx.mock() as router:
+            router.post(CCH_URL).mock(
+                return_value=httpx.Response(
+                    200, text=self._get_cch_response_db_connection_error()
+                )
+            )
+            resp = self.apply_taxes(AsyncCCHTaxCalculator(), to_address, basket)
+
+        self.assertIsNone(resp)
+        self.assertTrue(basket.is_tax_known)
+        self.assertEqual(basket.total_tax, D("0.00"))
@@ -0,0 +1,114 @@
+from decimal import Decimal as D
+
+from lxml import etree
+from oscar.core.loading import get_class, get_model
+from oscar.test import factories
+import requests
+import requests_mock
+
+from ..calculator import CCHTaxCalculator
+from ..exceptions import CCHSystemError
+from .base import BaseTest, p
+
+Basket = get_model("basket", "Basket")
+USStrategy = get_class("partner.strategy", "US")
+
+
+class ApplyTaxesManyTest(BaseTest):
+    def setUp(self):
+        super().setUp()
+        # Build the shared client up front, so that loading the WSDL doesn't count towards mocked requests
+        self.assertIsNotNone(CCHTaxCalculator().client)
+
+    def prepare_baskets(self, num):
+        # Only the first basket creates the partner's address, since each partner may only have one.
+        baskets = [self.prepare_basket()]
+        for _ in range(num - 1):
+            basket = Basket()
+            basket.strategy = USStrategy()
+            product = factories.create_product()
+            record = factories.create_stockrecord(
+                currency="USD", product=product, price=D("10.00")
+            )
+            factories.create_purchase_info(record)
+            basket.add(product)
+            baskets.append(basket)
+        return baskets
+
+    def respond_by_line_id(self, request, context):
+        # Answer each order with a response for its own basket line
+        doc = etree.fromstring(request.body)
+        (line_id,) = doc.xpath(
+            p("Body/CalculateRequest/order/LineItems/LineItem[1]/ID")
+        )
+        return self._get_cch_response_normal(line_id.text)
+
+    @requests_mock.mock()
+    def test_apply_taxes_many(self, rmock):
+        self.mock_soap_response(rmock=rmock, text=self.respond_by_line_id)
+        items = [
+            (self.get_to_address(), basket, self.get_shipping_charge())
+            for basket in self.prepare_baskets(5)
+        ]
+
+        results = CCHTaxCalculator().apply_taxes_many(items, max_workers=3)
+
+        self.assertEqual(rmock.call_count, 5)
+        self.assertEqual(len(results), 5)
+        for (_, basket, shipping_charge), result in zip(items, results, strict=True):
+            self.assertIsNone(result.error)
+            self.assertEqual(
+                result.response.LineItemTaxes.LineItemTax[0].ID,
+                str(basket.all_lines()[0].id),
+            )
+            self.assertTrue(basket.is_tax_known)
+            self.assertEqual(basket.total_incl_tax, D("10.89"))
+            self.assertTrue(shipping_charge.is_tax_known)
+            self.assertEqual(shipping_charge.incl_tax, D("16.3203625"))
+
+    @requests_mock.mock()
+    def test_failures_are_returned_per_item(self, rmock):
+        basket_ok, basket_timeout, basket_error = self.prepare_baskets(3)
+        timeout_line_id = str(basket_timeout.all_lines()[0].id)
+        error_line_id = str(basket_error.all_lines()[0].id)
+
+        def respond(request, context):
+            body = request.body.decode()
+            if f">{timeout_line_id}<" in body:
+                raise requests.exceptions.ReadTimeout
+            if f">{error_line_id}<" in body:
+                return self._get_cch_response_db_connection_error()
+            return self.respond_by_line_id(request, context)
+
+        self.mock_soap_response(rmock=rmock, text=respond)
+        to_address = self.get_to_address()
+        calc = CCHTaxCalculator()
+        calc.max_retries = 1
+        results = calc.apply_taxes_many(
+            [
+                (to_address, basket_ok, None),
+                (to_address, basket_timeout, None),
+                (to_address, basket_error, None),
+                (to_address, None, None),
+            ]
+        )
+
+        # The timed out order and the order whose response reports a system error are retried once.
+        self.assertEqual(rmock.call_count, 5)
+
+        self.assertIsNotNone(results[0].response)
+        self.assertIsNone(results[0].error)
+        self.assertEqual(basket_ok.total_tax, D("0.89"))
+
+        self.assertIsNone(results[1].response)
+        self.assertIsInstance(results[1].error, requests.exceptions.ReadTimeout)
+        self.assertTrue(basket_timeout.is_tax_known)
+        self.assertEqual(basket_timeout.total_tax, D("0.00"))
+
+        self.assertIsNone(results[2].response)
+        self.assertIsInstance(results[2].error, CCHSystemError)
+        self.assertEqual(basket_error.total_tax, D("0.00"))
+
+        # Nothing to calculate, so nothing is sent
+        self.assertIsNone(results[3].response)
+        self.assertIsNone(results[3].error)
@@ -0,0 +1,190 @@
+from unittest import mock
+import threading
+import time
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+from oscar.test import factories
+import pybreaker
+import requests
+import requests_mock
+
+from ..breaker import (
+    CircuitDjangoCacheStorage,
+    SharedCircuitBreaker,
+    get_circuit_breaker,
+)
+from ..calculator import CCHTaxCalculator
+from ..checks import check_circuit_breaker_cache
+from ..order_creator import CCHOrderCreatorMixin
+from .base import BaseTest
+
+
+def build_breaker(**kwargs):
+    # Each breaker has its own storage object, just like breakers in separate worker processes.
+    return SharedCircuitBreaker(
+        state_storage=CircuitDjangoCacheStorage(pybreaker.STATE_CLOSED, name="test"),
+        **kwargs,
+    )
+
+
+def fail():
+    raise requests.exceptions.ConnectTimeout
+
+
+class SharedCircuitBreakerTest(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        caches["default"].clear()
+
+    def tearDown(self):
+        caches["default"].clear()
+        super().tearDown()
+
+    def test_workers_open_together(self):
+        worker1 = build_breaker(fail_max=2, reset_timeout=60)
+        worker2 = build_breaker(fail_max=2, reset_timeout=60)
+
+        with self.assertRaises(requests.exceptions.ConnectTimeout):
+            worker1.call(fail)
+        self.assertEqual(worker2.fail_counter, 1)
+        with self.assertRaises(pybreaker.CircuitBreakerError):
+            worker2.call(fail)
+        self.assertEqual(worker1.current_state, pybreaker.STATE_OPEN)
+
+        # Calls from every worker now fail fast, without calling through
+        calls = []
+        start = time.monotonic()
+        for breaker in (worker1, worker2):
+            with self.assertRaises(pybreaker.CircuitBreakerError):
+                breaker.call(calls.append, 1)
+        self.assertLess(time.monotonic() - start, 0.05)
+        self.assertEqual(calls, [])
+
+    def test_workers_half_open_and_close_together(self):
+        worker1 = build_breaker(fail_max=1, reset_timeout=0.1)
+        worker2 = build_breaker(fail_max=1, reset_timeout=0.1)
+        with self.assertRaises(pybreaker.CircuitBreakerError):
+            worker1.call(fail)
+        with self.assertRaises(pybreaker.CircuitBreakerError):
+            worker2.call(lambda: "ok")
+
+        time.sleep(0.15)
+        self.assertEqual(worker2.call(lambda: "ok"), "ok")
+        self.assertEqual(worker1.current_state, pybreaker.STATE_CLOSED)
+        self.assertEqual(worker1.call(lambda: "ok"), "ok")
+
+    def test_one_trial_call_at_a_time(self):
+        worker1 = build_breaker(fail_max=1, reset_timeout=0.1)
+        worker2 = build_breaker(fail_max=1, reset_timeout=0.1)
+        with self.assertRaises(pybreaker.CircuitBreakerError):
+            worker1.call(fail)
+        time.sleep(0.15)
+
+        trial_started = threading.Event()
+        release = threading.Event()
+        results = []
+
+        def trial():
+            trial_started.set()
+            release.wait(5)
+            return "ok"
+
+        thread = threading.Thread(target=lambda: results.append(worker1.call(trial)))
+        thread.start()
+        self.assertTrue(trial_started.wait(5))
+        # The trial call is in flight, so every other call fails fast, in any worker
+        calls = []
+        for breaker in (worker1, worker2):
+            with self.assertRaises(pybreaker.CircuitBreakerError):
+                breaker.call(calls.append, 1)
+        self.assertEqual(calls, [])
+
+        release.set()
+        thread.join()
+        self.assertEqual(results, ["ok"])
+        self.assertEqual(worker2.current_state, pybreaker.STATE_CLOSED)
+        self.assertEqual(worker2.call(lambda: "ok"), "ok")
+
+    def test_state_is_recreated_when_evicted(self):
+        breaker = build_breaker(fail_max=1, reset_timeout=60)
+        with self.assertRaises(pybreaker.CircuitBreakerError):
+            breaker.call(fail)
+        caches["default"].clear()
+        self.assertEqual(breaker.current_state, pybreaker.STATE_CLOSED)
+        self.assertEqual(breaker.call(lambda: "ok"), "ok")
+
+    def test_calls_are_not_serialized(self):
+        breaker = build_breaker()
+        barrier = threading.Barrier(2, timeout=5)
+        results = []
+
+        def call():
+            results.append(breaker.call(barrier.wait))
+
+        threads = [threading.Thread(target=call) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # Both calls must have been in flight at once to get past the barrier
+        self.assertEqual(sorted(results), [0, 1])
+
+
+class CircuitBreakerCacheCheckTest(SimpleTestCase):
+    def test_local_memory_cache_warns(self):
+        self.assertEqual(
+            [msg.id for msg in check_circuit_breaker_cache(None)], ["oscarcch.W001"]
+        )
+
+    @override_settings(
+        CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.dummy.DummyCache",
+            },
+        }
+    )
+    def test_shared_cache_does_not_warn(self):
+        self.assertEqual(check_circuit_breaker_cache(None), [])
+
+    @mock.patch("oscarcch.settings.CCH_CIRCUIT_BREAKER_ENABLED", False)
+    def test_disabled_breaker_does_not_warn(self):
+        self.assertEqual(check_circuit_breaker_cache(None), [])
+
+
+class OrderCreatorCircuitBreakerTest(BaseTest):
+    def setUp(self):
+        super().setUp()
+        caches["default"].clear()
+        # Build the shared client up front, so that loading the WSDL doesn't count towards mocked requests
+        self.assertIsNotNone(CCHTaxCalculator().client)
+
+    def tearDown(self):
+        caches["default"].clear()
+        super().tearDown()
+
+    @requests_mock.mock()
+    def test_place_order_uses_shared_breaker(self, rmock):
+        self.mock_soap_response(rmock=rmock, exc=requests.exceptions.ConnectTimeout)
+        basket = self.prepare_basket()
+        to_address = self.get_to_address()
+
+        calc = CCHTaxCalculator(breaker=get_circuit_breaker())
+        calc.max_retries = 0
+        for _ in range(5):
+            self.assertIsNone(calc.apply_taxes(to_address, basket))
+        self.assertEqual(rmock.call_count, 5)
+
+        # The breaker shared with the order creator is now open, so CCH isn't called at all
+        order = factories.create_order(basket=basket, shipping_address=to_address)
+        self.assertFalse(order.is_tax_known)
+        self.assertEqual(rmock.call_count, 5)
+
+    def test_breaker_can_be_disabled(self):
+        self.assertIs(
+            CCHOrderCreatorMixin().get_cch_circuit_breaker(), get_circuit_breaker()
+        )
+        with mock.patch.object(
+            CCHOrderCreatorMixin, "cch_circuit_breaker_enabled", False
+        ):
+            self.assertIsNone(CCHOrderCreatorMixin().get_cch_circuit_breaker())
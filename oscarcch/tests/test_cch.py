@@ -1,5 +1,8 @@
 from decimal import Decimal as D
+from unittest import mock
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from freezegun import freeze_time
 from oscar.core.loading import get_class, get_model
 from oscar.test import factories
@@ -56,6 +59,122 @@ class ApplyTaxesToBasketHookTest(BaseTest):
         self.assertEqual(basket.total_tax, D("0.89"))
 
 
+class BuildOrderTest(BaseTest):
+    def setUp(self):
+        super().setUp()
+        # Creates the partner and its warehouse address
+        self.prepare_basket()
+
+    def prepare_basket_with_products(self, products):
+        basket = Basket()
+        basket.strategy = USStrategy()
+        for product in products:
+            record = factories.create_stockrecord(
+                currency="USD", product=product, price=D("10.00")
+            )
+            factories.create_purchase_info(record)
+            basket.add(product)
+        # Start from a freshly loaded basket, like a new request would
+        basket = Basket.objects.get(pk=basket.pk)
+        basket.strategy = USStrategy()
+        return basket
+
+    def count_build_order_queries(self, num_lines):
+        basket = self.prepare_basket_with_products(
+            [
+                factories.create_product(attributes={"cch_product_sku": f"SKU{i}"})
+                for i in range(num_lines)
+            ]
+        )
+        to_address = self.get_to_address()
+        with CaptureQueriesContext(connection) as ctx:
+            order = CCHTaxCalculator()._build_order(to_address, basket, None)
+        line_items = order["LineItems"]["LineItem"]
+        self.assertEqual(
+            [item["SKU"] for item in line_items],
+            [f"SKU{i}" for i in range(num_lines)],
+        )
+        self.assertEqual(
+            {item["NexusInfo"]["ShipFromAddress"]["PostalCode"] for item in line_items},
+            {"99501"},
+        )
+        return len(ctx.captured_queries)
+
+    def test_query_count_does_not_depend_on_number_of_lines(self):
+        self.assertEqual(
+            self.count_build_order_queries(2),
+            self.count_build_order_queries(20),
+        )
+
+    def test_addresses_are_built_once(self):
+        basket = self.prepare_basket_with_products(
+            [factories.create_product() for _ in range(3)]
+        )
+        shipping_charge = ShippingCharge("USD")
+        shipping_charge.add_component("SHIPPING", D("5.00"))
+        shipping_charge.add_component("HANDLING", D("2.00"))
+        calc = CCHTaxCalculator()
+        with mock.patch.object(
+            calc, "_build_address", wraps=calc._build_address
+        ) as build_address:
+            order = calc._build_order(self.get_to_address(), basket, shipping_charge)
+        self.assertEqual(build_address.call_count, 2)
+        line_items = order["LineItems"]["LineItem"]
+        self.assertEqual(len(line_items), 5)
+        self.assertEqual(
+            len({id(item["NexusInfo"]["ShipToAddress"]) for item in line_items}), 1
+        )
+        self.assertEqual(
+            len({id(item["NexusInfo"]["ShipFromAddress"]) for item in line_items[:3]}),
+            1,
+        )
+
+    def test_child_products_inherit_product_data_from_parent(self):
+        parent = factories.create_product(
+            structure="parent",
+            attributes={"cch_product_sku": "PARENTSKU", "cch_product_group": "PG"},
+        )
+        child = factories.create_product(
+            parent=parent,
+            attributes={"cch_product_group": "CG"},
+        )
+        basket = self.prepare_basket_with_products([child])
+        order = CCHTaxCalculator()._build_order(self.get_to_address(), basket, None)
+        (line_item,) = order["LineItems"]["LineItem"]
+        self.assertEqual(line_item["SKU"], "PARENTSKU")
+        self.assertEqual(line_item["ProductInfo"]["ProductGroup"], "CG")
+
+
+class NoTaxableLinesTest(BaseTest):
+    @requests_mock.mock()
+    def test_apply_taxes_skips_cch(self, rmock):
+        self.mock_soap_response(rmock=rmock, exc=requests.exceptions.ReadTimeout)
+        basket = self.prepare_basket()
+        to_address = self.get_to_address()
+        for line in basket.all_lines():
+            line.cch_quantity = 0
+
+        calc = CCHTaxCalculator()
+        self.assertFalse(calc.has_taxable_lines(basket))
+        with mock.patch.object(calc, "_build_order") as build_order:
+            resp = calc.apply_taxes(to_address, basket)
+
+        self.assertIsNone(resp)
+        build_order.assert_not_called()
+        self.assertEqual(rmock.call_count, 0)
+        self.assertTrue(basket.is_tax_known)
+        self.assertEqual(basket.total_tax, D("0.00"))
+
+    def test_shipping_charge_is_taxable(self):
+        basket = self.prepare_basket()
+        for line in basket.all_lines():
+            line.cch_quantity = 0
+        calc = CCHTaxCalculator()
+        self.assertTrue(calc.has_taxable_lines(basket, self.get_shipping_charge()))
+        self.assertTrue(calc.has_taxable_lines(None, self.get_shipping_charge()))
+        self.assertFalse(calc.has_taxable_lines(None, None))
+
+
 class CCHTaxCalculatorTest(BaseTest):
     @freeze_time("2016-04-13T16:14:44.018599-00:00")
     @requests_mock.mock()
@@ -0,0 +1,184 @@
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from unittest import mock
+import os
+import shutil
+import socket
+import tempfile
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase
+from freezegun import freeze_time
+import requests
+
+from ..calculator import CCHTaxCalculator
+from ..client import FileSystemCache, clear_clients
+
+
+class SharedClientTest(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        clear_clients()
+
+    def tearDown(self):
+        clear_clients()
+        super().tearDown()
+
+    def test_client_is_shared_between_calculators(self):
+        client1 = CCHTaxCalculator().client
+        client2 = CCHTaxCalculator().client
+        self.assertIs(client1, client2)
+        self.assertIs(client1.transport.session, client2.transport.session)
+
+    def test_client_is_keyed_by_connection_settings(self):
+        client1 = CCHTaxCalculator().client
+
+        calc = CCHTaxCalculator()
+        calc.send_timeout = (1, 2)
+        client2 = calc.client
+        self.assertIsNot(client1, client2)
+        self.assertEqual(client2.transport.operation_timeout, (1, 2))
+
+        calc = CCHTaxCalculator()
+        calc.proxy_url = "http://proxy.example.com:3128"
+        client3 = calc.client
+        self.assertIsNot(client1, client3)
+        self.assertEqual(
+            client3.transport.session.proxies["https"],
+            "http://proxy.example.com:3128",
+        )
+
+    def test_connection_pool_is_shared_between_clients(self):
+        client1 = CCHTaxCalculator().client
+        calc = CCHTaxCalculator()
+        calc.send_timeout = (1, 2)
+        client2 = calc.client
+        self.assertIsNot(client1, client2)
+
+        adapter = client1.transport.session.get_adapter("https://testserver/")
+        self.assertIs(
+            client2.transport.session.get_adapter("https://testserver/"), adapter
+        )
+        self.assertIs(
+            client1.transport.session.get_adapter("http://testserver/"), adapter
+        )
+        self.assertEqual(adapter._pool_maxsize, 10)
+        self.assertIn(
+            (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+            adapter.poolmanager.connection_pool_kw["socket_options"],
+        )
+
+    def test_connection_pool_settings(self):
+        calc = CCHTaxCalculator()
+        calc.pool_maxsize = 50
+        calc.pool_block = True
+        calc.tcp_keepalive = False
+        adapter = calc.client.transport.session.get_adapter("https://testserver/")
+        self.assertEqual(adapter._pool_maxsize, 50)
+        self.assertTrue(adapter._pool_block)
+        self.assertNotIn("socket_options", adapter.poolmanager.connection_pool_kw)
+
+    def test_client_is_built_once_across_threads(self):
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            clients = list(executor.map(lambda _: CCHTaxCalculator().client, range(16)))
+        self.assertEqual(len({id(c) for c in clients}), 1)
+
+
+class FileSystemCacheTest(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.cache_dir = tempfile.mkdtemp()
+        clear_clients()
+
+    def tearDown(self):
+        clear_clients()
+        shutil.rmtree(self.cache_dir)
+        super().tearDown()
+
+    def test_add_and_get(self):
+        cache = FileSystemCache(self.cache_dir)
+        self.assertIsNone(cache.get("http://example.com/a.xsd"))
+        cache.add("http://example.com/a.xsd", b"<xs:schema/>")
+        self.assertEqual(cache.get("http://example.com/a.xsd"), b"<xs:schema/>")
+        self.assertIsNone(cache.get("http://example.com/b.xsd"))
+
+    def test_expired_entries_are_ignored(self):
+        cache = FileSystemCache(self.cache_dir, timeout=60)
+        with freeze_time("2026-01-01T00:00:00Z"):
+            cache.add("http://example.com/a.xsd", b"<xs:schema/>")
+        with freeze_time("2026-01-01T00:00:59Z"):
+            self.assertEqual(cache.get("http://example.com/a.xsd"), b"<xs:schema/>")
+        with freeze_time("2026-01-01T00:01:01Z"):
+            self.assertIsNone(cache.get("http://example.com/a.xsd"))
+
+    def test_corrupt_entries_are_ignored(self):
+        cache = FileSystemCache(self.cache_dir)
+        cache.add("http://example.com/a.xsd", b"<xs:schema/>")
+        (filename,) = os.listdir(self.cache_dir)
+        with open(os.path.join(self.cache_dir, filename), "ab") as fh:
+            fh.write(b"garbage")
+        self.assertIsNone(cache.get("http://example.com/a.xsd"))
+
+    def test_client_starts_from_cached_documents(self):
+        # Copy the WSDL somewhere we can delete it from
+        wsdl_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, wsdl_dir, True)
+        wsdl_path = os.path.join(wsdl_dir, "cch.xml")
+        shutil.copy(os.path.join(settings.BASE_DIR, "wsdl/cch.xml"), wsdl_path)
+
+        calc = CCHTaxCalculator()
+        calc.wsdl = f"file://{wsdl_path}"
+        calc.wsdl_cache_dir = self.cache_dir
+        self.assertIn("CalculateRequest", dir(calc.client.service))
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+        # Once cached, a new process can build its client without the original WSDL
+        os.unlink(wsdl_path)
+        clear_clients()
+        calc = CCHTaxCalculator()
+        calc.wsdl = f"file://{wsdl_path}"
+        calc.wsdl_cache_dir = self.cache_dir
+        self.assertIn("CalculateRequest", dir(calc.client.service))
+
+    def test_warm_wsdl_cache_command(self):
+        out = StringIO()
+        with mock.patch.object(CCHTaxCalculator, "wsdl_cache_dir", self.cache_dir):
+            call_command("cch_warm_wsdl_cache", "--force", stdout=out)
+        self.assertIn("Cached WSDL", out.getvalue())
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+    def test_warm_wsdl_cache_command_requires_cache_dir(self):
+        with self.assertRaises(CommandError):
+            call_command("cch_warm_wsdl_cache")
+
+    def test_expired_entries_are_used_when_fetching_fails(self):
+        wsdl_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, wsdl_dir, True)
+        wsdl_path = os.path.join(wsdl_dir, "cch.xml")
+        shutil.copy(os.path.join(settings.BASE_DIR, "wsdl/cch.xml"), wsdl_path)
+
+        calc = CCHTaxCalculator()
+        calc.wsdl = f"file://{wsdl_path}"
+        calc.wsdl_cache_dir = self.cache_dir
+        calc.wsdl_cache_timeout = 60
+        with freeze_time("2026-01-01T00:00:00Z"):
+            self.assertIsNotNone(calc.client)
+
+        # The document has expired, and can't be fetched again
+        os.unlink(wsdl_path)
+        clear_clients()
+        calc = CCHTaxCalculator()
+        calc.wsdl = f"file://{wsdl_path}"
+        calc.wsdl_cache_dir = self.cache_dir
+        calc.wsdl_cache_timeout = 60
+        with (
+            freeze_time("2026-01-02T00:00:00Z"),
+            mock.patch(
+                "zeep.transports.Transport._load_remote_data",
+                side_effect=requests.exceptions.ConnectionError,
+            ),
+            self.assertLogs("oscarcch.client", "WARNING"),
+        ):
+            self.assertIn("CalculateRequest", dir(calc.client.service))
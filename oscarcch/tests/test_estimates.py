@@ -0,0 +1,96 @@
+from decimal import Decimal as D
+from io import StringIO
+
+from django.core.management import call_command
+import requests_mock
+
+from ..calculator import CCHTaxCalculator, EstimatingTaxCalculator
+from ..models import JurisdictionTaxRate
+from .base import BaseTest, p
+
+
+class EstimatingTaxCalculatorTest(BaseTest):
+    def setUp(self):
+        super().setUp()
+        # Build the shared client up front, so that loading the WSDL doesn't count towards mocked requests
+        self.assertIsNotNone(CCHTaxCalculator().client)
+
+    @requests_mock.mock()
+    def test_sync_tax_rates(self, rmock):
+        def test_request(request):
+            self.assertNodeText(
+                request.body, p("Body/GetTaxRates/request/Address/PostalCode"), "11201"
+            )
+            self.assertNodeText(
+                request.body, p("Body/GetTaxRates/request/EntityId"), "TESTSANDBOX"
+            )
+            return True
+
+        self.mock_soap_response(
+            rmock=rmock,
+            text=self._get_cch_tax_rates_response(),
+            additional_matcher=test_request,
+        )
+
+        out = StringIO()
+        call_command("cch_sync_tax_rates", "11201", stdout=out)
+        self.assertIn("Saved 2 tax rates", out.getvalue())
+
+        # One for the default product SKU and one for shipping
+        self.assertEqual(rmock.call_count, 2)
+        rate = JurisdictionTaxRate.objects.get(postal_code="11201", sku="ABC123")
+        self.assertEqual(rate.country_code, "US")
+        self.assertEqual(rate.estimated_total_rate, D("0.08875"))
+        self.assertEqual(rate.items.count(), 3)
+        self.assertTrue(
+            JurisdictionTaxRate.objects.filter(
+                postal_code="11201", sku="PARCEL"
+            ).exists()
+        )
+
+        # Syncing again replaces the existing rates
+        call_command("cch_sync_tax_rates", "11201", "--sku=ABC123", stdout=out)
+        self.assertEqual(JurisdictionTaxRate.objects.count(), 2)
+        rate = JurisdictionTaxRate.objects.get(postal_code="11201", sku="ABC123")
+        self.assertEqual(rate.items.count(), 3)
+
+    @requests_mock.mock()
+    def test_estimate_taxes(self, rmock):
+        basket = self.prepare_basket()
+        to_address = self.get_to_address()
+        shipping_charge = self.get_shipping_charge()
+
+        self.mock_soap_response(rmock=rmock, text=self._get_cch_tax_rates_response())
+        call_command("cch_sync_tax_rates", "11201", stdout=StringIO())
+        rmock.reset_mock()
+
+        resp = EstimatingTaxCalculator().apply_taxes(
+            to_address, basket, shipping_charge
+        )
+        self.assertIsNone(resp)
+        self.assertEqual(rmock.call_count, 0)
+
+        self.assertTrue(basket.is_tax_known)
+        self.assertEqual(basket.total_excl_tax, D("10.00"))
+        self.assertEqual(basket.total_tax, D("0.89"))
+
+        details = basket.all_lines()[0].purchase_info.price.taxation_details
+        self.assertEqual(len(details), 3)
+        self.assertEqual(details[0].authority_name, "NEW YORK, STATE OF")
+        self.assertEqual(details[0].tax_name, "STATE SALES TAX-GENERAL MERCHANDISE")
+        self.assertEqual(details[0].tax_applied, D("0.40"))
+
+        self.assertTrue(shipping_charge.is_tax_known)
+        self.assertEqual(shipping_charge.incl_tax, D("16.3203625"))
+
+    def test_estimate_taxes_without_rates(self):
+        basket = self.prepare_basket()
+        to_address = self.get_to_address()
+        shipping_charge = self.get_shipping_charge()
+
+        EstimatingTaxCalculator().apply_taxes(to_address, basket, shipping_charge)
+
+        self.assertTrue(basket.is_tax_known)
+        self.assertEqual(basket.total_tax, D("0.00"))
+        self.assertTrue(shipping_charge.is_tax_known)
+        self.assertEqual(shipping_charge.tax, D("0.00"))
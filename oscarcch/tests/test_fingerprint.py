@@ -0,0 +1,78 @@
+from decimal import Decimal as D
+
+from django.test import SimpleTestCase
+from oscar.core.loading import get_class, get_model
+
+from ..calculator import CCHTaxCalculator
+from ..prices import ShippingCharge
+from .base import BaseTest
+
+Basket = get_model("basket", "Basket")
+USStrategy = get_class("partner.strategy", "US")
+
+
+class ShippingChargeFingerprintTest(SimpleTestCase):
+    def test_equal_charges_have_equal_fingerprints(self):
+        charge1 = ShippingCharge("USD", D("14.99"), cch_sku="PARCEL")
+        charge2 = ShippingCharge("USD", D("14.990"), cch_sku="PARCEL")
+        self.assertEqual(charge1.tax_fingerprint(), charge2.tax_fingerprint())
+        self.assertEqual(
+            charge1.components[0].tax_fingerprint(),
+            charge2.components[0].tax_fingerprint(),
+        )
+        self.assertEqual(len(charge1.tax_fingerprint()), 32)
+
+    def test_fingerprint_ignores_taxes(self):
+        charge = ShippingCharge("USD", D("14.99"))
+        fingerprint = charge.tax_fingerprint()
+        charge.components[0].add_tax("NEW YORK, STATE OF", "SALES TAX", D("0.60"))
+        self.assertEqual(charge.tax_fingerprint(), fingerprint)
+
+    def test_fingerprint_covers_every_sent_field(self):
+        charge = ShippingCharge("USD", D("14.99"), cch_sku="PARCEL")
+        fingerprints = {
+            charge.tax_fingerprint(),
+            ShippingCharge("USD", D("9.99"), cch_sku="PARCEL").tax_fingerprint(),
+            ShippingCharge("USD", D("14.99"), cch_sku="FREIGHT").tax_fingerprint(),
+        }
+        charge.add_component("PARCEL", D("5.00"))
+        fingerprints.add(charge.tax_fingerprint())
+        self.assertEqual(len(fingerprints), 4)
+
+
+class LineFingerprintTest(BaseTest):
+    def test_line_fingerprint(self):
+        basket = self.prepare_basket()
+        line = basket.all_lines()[0]
+        to_address = self.get_to_address()
+        calc = CCHTaxCalculator()
+
+        fingerprint = calc.get_line_tax_fingerprint(line, to_address)
+        self.assertEqual(calc.get_line_tax_fingerprint(line, to_address), fingerprint)
+        self.assertNotEqual(
+            calc.get_line_tax_fingerprint(line, self.get_to_address_ohio_short_zip()),
+            fingerprint,
+        )
+        self.assertNotEqual(calc.get_line_tax_fingerprint(line, None), fingerprint)
+        line.cch_quantity = 3
+        self.assertNotEqual(
+            calc.get_line_tax_fingerprint(line, to_address), fingerprint
+        )
+
+    def test_line_fingerprints_use_constant_queries(self):
+        basket = self.prepare_basket(lines=3)
+        to_address = self.get_to_address()
+        calc = CCHTaxCalculator()
+        lines = list(basket.all_lines())
+        expected = {
+            line.id: calc.get_line_tax_fingerprint(line, to_address) for line in lines
+        }
+
+        basket = Basket.objects.get(pk=basket.pk)
+        basket.strategy = USStrategy()
+        lines = list(basket.all_lines())
+        # Partners, their addresses and countries, stockrecords, product classes, and attributes
+        with self.assertNumQueries(6):
+            self.assertEqual(
+                calc.get_line_tax_fingerprints(lines, to_address), expected
+            )
@@ -0,0 +1,211 @@
+from decimal import Decimal as D
+from unittest import mock
+import threading
+import time
+
+from django.test import SimpleTestCase
+import pybreaker
+import requests
+import requests_mock
+
+from ..calculator import CCHTaxCalculator
+from ..hedging import HedgingPolicy
+from .base import BaseTest
+
+
+class HedgingPolicyTest(SimpleTestCase):
+    def test_fast_call_is_not_hedged(self):
+        calls = []
+        policy = HedgingPolicy(delay=1.0)
+        result = policy.call(lambda: calls.append(1) or "ok")
+        self.assertEqual(result, "ok")
+        self.assertEqual(len(calls), 1)
+
+    def test_slow_call_is_hedged(self):
+        release = threading.Event()
+        calls = []
+
+        def func():
+            calls.append(1)
+            if len(calls) == 1:
+                release.wait(5)
+                return "slow"
+            return "fast"
+
+        policy = HedgingPolicy(delay=0.01)
+        result = policy.call(func)
+        release.set()
+        self.assertEqual(result, "fast")
+        self.assertEqual(len(calls), 2)
+
+    def test_invalid_result_waits_for_valid_one(self):
+        calls = []
+
+        def func():
+            calls.append(1)
+            if len(calls) == 1:
+                time.sleep(0.05)
+                return "valid"
+            return "invalid"
+
+        policy = HedgingPolicy(delay=0.01)
+        result = policy.call(func, is_valid=lambda r: r == "valid")
+        self.assertEqual(result, "valid")
+        self.assertEqual(len(calls), 2)
+
+    def test_exception_falls_back_to_other_call(self):
+        calls = []
+
+        def func():
+            calls.append(1)
+            if len(calls) == 1:
+                time.sleep(0.05)
+                return "ok"
+            raise ValueError
+
+        policy = HedgingPolicy(delay=0.01)
+        self.assertEqual(policy.call(func), "ok")
+
+    def test_hedge_rate_is_capped(self):
+        calls = []
+
+        def func():
+            calls.append(1)
+            time.sleep(0.02)
+
+        policy = HedgingPolicy(delay=0.001, max_rate=0.25)
+        for _ in range(8):
+            policy.call(func)
+        # The first request uses the initial budget, and the next 4 requests earn one more hedge.
+        self.assertEqual(len(calls), 8 + 2)
+
+    def test_busy_pool_calls_in_caller_thread(self):
+        release = threading.Event()
+        threads = []
+
+        def func():
+            threads.append(threading.current_thread())
+            if len(threads) == 1:
+                release.wait(5)
+            return "ok"
+
+        policy = HedgingPolicy(delay=0.01, max_workers=1)
+        blocked = threading.Thread(target=policy.call, args=(func,))
+        blocked.start()
+        self.addCleanup(blocked.join)
+        self.addCleanup(release.set)
+        while not threads:
+            time.sleep(0.001)
+
+        # The only worker is busy, so the request is neither queued nor hedged
+        self.assertEqual(policy.call(func), "ok")
+        self.assertEqual(len(threads), 2)
+        self.assertIs(threads[1], threading.current_thread())
+
+    def test_delay_uses_percentile_of_latencies(self):
+        policy = HedgingPolicy(delay=5.0, percentile=0.95, min_samples=20)
+        for i in range(19):
+            policy.record_latency(i / 100)
+        self.assertEqual(policy.get_delay(), 5.0)
+        for i in range(19, 101):
+            policy.record_latency(i / 100)
+        self.assertEqual(policy.get_delay(), 0.95)
+
+
+class HedgedCalculatorTest(BaseTest):
+    def setUp(self):
+        super().setUp()
+        # Build the shared client up front, so that loading the WSDL doesn't count towards mocked requests
+        self.assertIsNotNone(CCHTaxCalculator().client)
+
+    def get_calculator(self):
+        calc = CCHTaxCalculator()
+        calc.hedge_requests = True
+        calc.hedging_policy = HedgingPolicy(delay=0.01)
+        return calc
+
+    @requests_mock.mock()
+    def test_slow_request_is_hedged(self, rmock):
+        basket = self.prepare_basket()
+        to_address = self.get_to_address()
+        calls = []
+
+        def respond(request, context):
+            calls.append(1)
+            if len(calls) == 1:
+                time.sleep(0.2)
+            return self._get_cch_response_normal(basket.all_lines()[0].id)
+
+        self.mock_soap_response(rmock=rmock, text=respond)
+        resp = self.get_calculator().apply_taxes(to_address, basket)
+
+        self.assertIsNotNone(resp)
+        self.assertEqual(rmock.call_count, 2)
+        self.assertEqual(basket.total_tax, D("0.89"))
+
+    @requests_mock.mock()
+    def test_finalized_request_is_not_hedged(self, rmock):
+        basket = self.prepare_basket()
+        to_address = self.get_to_address()
+
+        def respond(request, context):
+            time.sleep(0.05)
+            return self._get_cch_response_normal(basket.all_lines()[0].id)
+
+        self.mock_soap_response(rmock=rmock, text=respond)
+        calc = self.get_calculator()
+        with mock.patch("oscarcch.settings.CCH_FINALIZE_TRANSACTION", True):
+            self.assertIsNotNone(calc.apply_taxes(to_address, basket))
+
+        self.assertEqual(rmock.call_count, 1)
+
+    def test_hedge_is_not_blocked_by_breaker(self):
+        basket = self.prepare_basket()
+        to_address = self.get_to_address()
+        first_call_done = threading.Event()
+        calls = []
+
+        # requests_mock serializes concurrent requests, so respond without it
+        def post_order(order, serializer):
+            calls.append(1)
+            if len(calls) == 1:
+                first_call_done.wait(5)
+            response = requests.Response()
+            response.status_code = 200
+            response.headers["Content-Type"] = "text/xml"
+            response._content = self._get_cch_response_normal(
+                basket.all_lines()[0].id
+            ).encode()
+            return response
+
+        calc = self.get_calculator()
+        # A plain breaker holds its lock for the duration of each call
+        calc.breaker = pybreaker.CircuitBreaker()
+        # Send the requests through _post_order
+        calc.parse_raw_responses = True
+        start = time.monotonic()
+        with mock.patch.object(calc, "_post_order", side_effect=post_order):
+            resp = calc.apply_taxes(to_address, basket)
+        first_call_done.set()
+
+        self.assertIsNotNone(resp)
+        self.assertLess(time.monotonic() - start, 2)
+        self.assertEqual(len(calls), 2)
+
+    @requests_mock.mock()
+    def test_failed_hedge_counts_as_one_failure(self, rmock):
+        basket = self.prepare_basket()
+        to_address = self.get_to_address()
+
+        def respond(request, context):
+            time.sleep(0.05)
+            raise requests.exceptions.ConnectionError
+
+        self.mock_soap_response(rmock=rmock, text=respond)
+        calc = self.get_calculator()
+        calc.max_retries = 0
+        calc.breaker = pybreaker.CircuitBreaker(fail_max=5)
+
+        self.assertIsNone(calc.apply_taxes(to_address, basket))
+        self.assertEqual(rmock.call_count, 2)
+        self.assertEqual(calc.breaker.fail_counter, 1)
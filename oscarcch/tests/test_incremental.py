@@ -0,0 +1,208 @@
+from decimal import Decimal as D
+from unittest import mock
+
+from django.core.cache import caches
+from lxml import etree
+from oscar.core.loading import get_model
+from oscar.test import factories
+import requests_mock
+
+from ..calculator import CCHTaxCalculator
+from ..prices import ShippingCharge
+from .base import BaseTest, p
+
+Basket = get_model("basket", "Basket")
+
+
+@mock.patch.object(CCHTaxCalculator, "incremental_recalculation", True)
+class IncrementalRecalculationTest(BaseTest):
+    def setUp(self):
+        super().setUp()
+        caches["default"].clear()
+        # Build the shared client up front, so that loading the WSDL doesn't count towards mocked requests
+        self.assertIsNotNone(CCHTaxCalculator().client)
+        self.sent_line_ids = []
+
+    def respond(self, basket):
+        def _respond(request, context):
+            doc = etree.fromstring(request.body)
+            line_ids = [
+                node.text
+                for node in doc.xpath(
+                    p("Body/CalculateRequest/order/LineItems/LineItem/ID")
+                )
+            ]
+            self.sent_line_ids.append(line_ids)
+            if str(basket.all_lines()[0].id) in line_ids:
+                return self._get_cch_response_normal(basket.all_lines()[0].id)
+            return self._get_cch_response_shipping_only()
+
+        return _respond
+
+    def assert_basket_taxes(self, basket):
+        self.assertTrue(basket.is_tax_known)
+        self.assertEqual(basket.total_tax, D("0.89"))
+        details = basket.all_lines()[0].purchase_info.price.taxation_details
+        self.assertEqual(len(details), 3)
+        self.assertEqual(details[0].authority_name, "NEW YORK, STATE OF")
+
+    @requests_mock.mock()
+    def test_changed_shipping_charge_sends_lines_too(self, rmock):
+        basket = self.prepare_basket()
+        to_address = self.get_to_address()
+        line_id = str(basket.all_lines()[0].id)
+        self.mock_soap_response(rmock=rmock, text=self.respond(basket))
+
+        resp1 = CCHTaxCalculator().apply_taxes(
+            to_address, basket, self.get_shipping_charge()
+        )
+        self.assert_basket_taxes(basket)
+
+        # Switch to a different shipping method
+        shipping_charge = ShippingCharge("USD", D("9.99"), cch_sku="PARCEL")
+        resp2 = CCHTaxCalculator().apply_taxes(to_address, basket, shipping_charge)
+
+        # CCH decides whether shipping is taxable from the goods shipped
+        self.assertEqual(
+            self.sent_line_ids,
+            [[line_id, "shipping:PARCEL:0"], [line_id, "shipping:PARCEL:0"]],
+        )
+        self.assert_basket_taxes(basket)
+        self.assertTrue(shipping_charge.is_tax_known)
+        self.assertEqual(shipping_charge.tax, D("1.3303625"))
+        self.assertEqual(
+            [tax.ID for tax in resp2.LineItemTaxes.LineItemTax],
+            [line_id, "shipping:PARCEL:0"],
+        )
+        self.assertEqual(resp2.TotalTaxApplied, resp1.TotalTaxApplied)
+        self.assertEqual(resp2.TransactionID, 40043)
+
+    @requests_mock.mock()
+    def test_changed_line_only_sends_line(self, rmock):
+        basket = self.prepare_basket(lines=2)
+        to_address = self.get_to_address()
+        line1, line2 = (str(line.id) for line in basket.all_lines())
+
+        def respond(request, context):
+            doc = etree.fromstring(request.body)
+            line_ids = [
+                node.text
+                for node in doc.xpath(
+                    p("Body/CalculateRequest/order/LineItems/LineItem/ID")
+                )
+            ]
+            self.sent_line_ids.append(line_ids)
+            if line1 in line_ids:
+                return self._get_cch_response_basket_only(line1)
+            return self._get_cch_response_empty()
+
+        self.mock_soap_response(rmock=rmock, text=respond)
+
+        resp1 = CCHTaxCalculator().apply_taxes(to_address, basket)
+        basket.add(basket.all_lines()[1].product)
+        resp2 = CCHTaxCalculator().apply_taxes(to_address, basket)
+
+        self.assertEqual(self.sent_line_ids, [[line1, line2], [line2]])
+        self.assertEqual(
+            [tax.ID for tax in resp2.LineItemTaxes.LineItemTax],
+            [tax.ID for tax in resp1.LineItemTaxes.LineItemTax],
+        )
+        self.assertEqual(resp2.TotalTaxApplied, resp1.TotalTaxApplied)
+
+    @requests_mock.mock()
+    def test_transaction_isnt_shared_between_baskets(self, rmock):
+        basket1 = self.prepare_basket()
+        product = basket1.all_lines()[0].product
+        basket2 = Basket.objects.create()
+        basket2.strategy = basket1.strategy
+        basket2.add(product)
+        to_address = self.get_to_address()
+
+        def respond(request, context):
+            doc = etree.fromstring(request.body)
+            line_ids = [
+                node.text
+                for node in doc.xpath(
+                    p("Body/CalculateRequest/order/LineItems/LineItem/ID")
+                )
+            ]
+            self.sent_line_ids.append(line_ids)
+            return self._get_cch_response_normal(line_ids[0])
+
+        self.mock_soap_response(rmock=rmock, text=respond)
+
+        CCHTaxCalculator().apply_taxes(to_address, basket1, self.get_shipping_charge())
+        CCHTaxCalculator().apply_taxes(to_address, basket2, self.get_shipping_charge())
+
+        # Both lines are taxed identically, but each basket gets its own transaction
+        self.assertEqual(
+            self.sent_line_ids,
+            [
+                [str(basket1.all_lines()[0].id), "shipping:PARCEL:0"],
+                [str(basket2.all_lines()[0].id), "shipping:PARCEL:0"],
+            ],
+        )
+
+    @requests_mock.mock()
+    def test_place_order_sends_full_order(self, rmock):
+        basket = self.prepare_basket()
+        to_address = self.get_to_address()
+        self.mock_soap_response(rmock=rmock, text=self.respond(basket))
+
+        with mock.patch.object(
+            CCHTaxCalculator,
+            "_send_order_incremental",
+            wraps=CCHTaxCalculator()._send_order_incremental,
+        ) as send_order_incremental:
+            order = factories.create_order(basket=basket, shipping_address=to_address)
+
+        send_order_incremental.assert_not_called()
+        self.assertEqual(rmock.call_count, 1)
+        self.assertEqual(order.taxation.transaction_id, 40043)
+
+    @requests_mock.mock()
+    def test_unchanged_order_isnt_sent_again(self, rmock):
+        basket = self.prepare_basket()
+        to_address = self.get_to_address()
+        self.mock_soap_response(rmock=rmock, text=self.respond(basket))
+
+        resp1 = CCHTaxCalculator().apply_taxes(
+            to_address, basket, self.get_shipping_charge()
+        )
+        resp2 = CCHTaxCalculator().apply_taxes(
+            to_address, basket, self.get_shipping_charge()
+        )
+
+        self.assertEqual(rmock.call_count, 1)
+        self.assertEqual(resp2.TotalTaxApplied, resp1.TotalTaxApplied)
+        self.assert_basket_taxes(basket)
+
+    @requests_mock.mock()
+    def test_changed_address_sends_everything(self, rmock):
+        basket = self.prepare_basket()
+        self.mock_soap_response(rmock=rmock, text=self.respond(basket))
+
+        CCHTaxCalculator().apply_taxes(
+            self.get_to_address(), basket, self.get_shipping_charge()
+        )
+        CCHTaxCalculator().apply_taxes(
+            self.get_to_address_ohio_short_zip(), basket, self.get_shipping_charge()
+        )
+
+        self.assertEqual(rmock.call_count, 2)
+        self.assertEqual(len(self.sent_line_ids[1]), 2)
+
+    @requests_mock.mock()
+    def test_finalized_orders_are_sent_in_full(self, rmock):
+        basket = self.prepare_basket()
+        to_address = self.get_to_address()
+        self.mock_soap_response(rmock=rmock, text=self.respond(basket))
+
+        with mock.patch("oscarcch.settings.CCH_FINALIZE_TRANSACTION", True):
+            for _ in range(2):
+                CCHTaxCalculator().apply_taxes(
+                    to_address, basket, self.get_shipping_charge()
+                )
+
+        self.assertEqual(rmock.call_count, 2)
+        self.assertEqual([len(ids) for ids in self.sent_line_ids], [2, 2])
@@ -0,0 +1,69 @@
+from decimal import Decimal as D
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from ..interning import StringInterner, intern_name
+from ..models import _serialize_tax_detail
+from ..prices import TaxationDetails
+
+
+def make_name(*parts):
+    # Build a new string object each time, as parsing a response would
+    return " ".join(parts)
+
+
+class StringInternerTest(SimpleTestCase):
+    def test_returns_canonical_copy(self):
+        interner = StringInterner(10)
+        first = interner.intern(make_name("New York", "State"))
+        second = make_name("New York", "State")
+        self.assertIsNot(first, second)
+        self.assertIs(interner.intern(second), first)
+        self.assertEqual(len(interner), 1)
+
+    def test_passes_through_non_strings(self):
+        interner = StringInterner(10)
+        self.assertIsNone(interner.intern(None))
+        self.assertEqual(len(interner), 0)
+
+    def test_size_is_bounded(self):
+        interner = StringInterner(3)
+        oldest = interner.intern(make_name("Authority", "0"))
+        for i in range(1, 5):
+            interner.intern(make_name("Authority", str(i)))
+        self.assertEqual(len(interner), 3)
+        # The oldest names were evicted, so a new copy becomes canonical
+        self.assertIsNot(interner.intern(make_name("Authority", "0")), oldest)
+
+    def test_disabled(self):
+        interner = StringInterner(0)
+        name = make_name("New York", "State")
+        self.assertIs(interner.intern(name), name)
+        self.assertEqual(len(interner), 0)
+
+    def test_shared_by_prices_and_persistence(self):
+        details = TaxationDetails()
+        details.add(make_name("Shared", "Authority"), "Sales Tax", D("1.00"), D(0))
+        data = _serialize_tax_detail(
+            {"AuthorityName": make_name("Shared", "Authority")}
+        )
+        self.assertIs(data["AuthorityName"], details[0].authority_name)
+        self.assertIs(
+            intern_name(make_name("Shared", "Authority")), data["AuthorityName"]
+        )
+
+    def test_only_names_are_interned(self):
+        interner = StringInterner(10)
+        with mock.patch("oscarcch.models.intern_name", interner.intern):
+            data = _serialize_tax_detail(
+                {
+                    "AuthorityName": make_name("New York", "State"),
+                    "TaxApplied": D("0.40"),
+                    "TaxRate": make_name("0.04"),
+                }
+            )
+        self.assertEqual(data["TaxApplied"], "0.40")
+        self.assertEqual(data["TaxRate"], "0.04")
+        # The three keys and the authority's name
+        self.assertEqual(len(interner), 4)
@@ -0,0 +1,209 @@
+from unittest import mock
+import collections
+
+from django.core.cache import caches
+from django.test import SimpleTestCase
+import requests
+import requests_mock
+
+from .. import metrics
+from ..breaker import get_circuit_breaker
+from ..calculator import CCHTaxCalculator
+from ..exceptions import CCHError, CCHRequestError, CCHSystemError
+from ..metrics import MetricsRecorder, get_error_kind, get_metrics_recorder
+from .base import BaseTest
+
+
+class RecordingMetrics(MetricsRecorder):
+    def __init__(self):
+        self.phases = collections.Counter()
+        self.payload_sizes = []
+        self.line_counts = []
+        self.retries = []
+        self.errors = []
+        self.transitions = []
+
+    def observe_phase_duration(self, phase, seconds):
+        self.phases[phase] += 1
+
+    def observe_payload_size(self, direction, size):
+        self.payload_sizes.append((direction, size))
+
+    def observe_line_count(self, count):
+        self.line_counts.append(count)
+
+    def record_retry(self, exc):
+        self.retries.append(exc)
+
+    def record_response_error(self, error):
+        self.errors.append((get_error_kind(error), error.code))
+
+    def record_breaker_transition(self, name, old_state, new_state):
+        self.transitions.append((name, old_state, new_state))
+
+
+class CalculatorMetricsTest(BaseTest):
+    def setUp(self):
+        super().setUp()
+        caches["default"].clear()
+        # Build the shared client up front, so that loading the WSDL doesn't count towards mocked requests
+        self.assertIsNotNone(CCHTaxCalculator().client)
+        self.metrics = RecordingMetrics()
+        patcher = mock.patch.object(CCHTaxCalculator, "metrics", self.metrics)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        caches["default"].clear()
+        super().tearDown()
+
+    @requests_mock.mock()
+    def test_apply_taxes(self, rmock):
+        basket = self.prepare_basket()
+        text = self._get_cch_response_normal(basket.all_lines()[0].id)
+        self.mock_soap_response(rmock=rmock, text=text)
+
+        CCHTaxCalculator().apply_taxes(
+            self.get_to_address(), basket, self.get_shipping_charge()
+        )
+
+        # zeep serializes requests while sending them
+        self.assertEqual(self.metrics.phases, {"build": 1, "network": 1, "parse": 1})
+        self.assertEqual(self.metrics.line_counts, [2])
+        self.assertEqual(
+            self.metrics.payload_sizes,
+            [
+                ("request", len(rmock.last_request.body)),
+                ("response", len(text.encode())),
+            ],
+        )
+        self.assertEqual(self.metrics.errors, [])
+
+    @requests_mock.mock()
+    @mock.patch.object(CCHTaxCalculator, "precompile_requests", True)
+    def test_precompiled_requests(self, rmock):
+        basket = self.prepare_basket()
+        self.mock_soap_response(
+            rmock=rmock, text=self._get_cch_response_normal(basket.all_lines()[0].id)
+        )
+
+        CCHTaxCalculator().apply_taxes(self.get_to_address(), basket)
+
+        self.assertEqual(
+            self.metrics.phases,
+            {"build": 1, "serialize": 1, "network": 1, "parse": 1},
+        )
+        self.assertEqual(self.metrics.line_counts, [1])
+
+    @requests_mock.mock()
+    @mock.patch.object(CCHTaxCalculator, "stream_responses", True)
+    def test_streamed_responses(self, rmock):
+        basket = self.prepare_basket()
+        text = self._get_cch_response_normal(basket.all_lines()[0].id)
+        self.mock_soap_response(rmock=rmock, text=text)
+
+        CCHTaxCalculator().apply_taxes(self.get_to_address(), basket)
+
+        self.assertEqual(
+            self.metrics.phases,
+            {"build": 1, "serialize": 1, "network": 1, "parse": 1},
+        )
+        self.assertEqual(self.metrics.payload_sizes[1], ("response", len(text)))
+
+    @requests_mock.mock()
+    def test_retries(self, rmock):
+        basket = self.prepare_basket()
+        self.mock_soap_response(
+            rmock=rmock,
+            response_list=[
+                {"exc": requests.exceptions.ReadTimeout},
+                {"text": self._get_cch_response_normal(basket.all_lines()[0].id)},
+            ],
+        )
+        calc = CCHTaxCalculator()
+        calc.retry_backoff = 0
+
+        self.assertIsNotNone(calc.apply_taxes(self.get_to_address(), basket))
+
+        self.assertEqual(len(self.metrics.retries), 1)
+        self.assertIsInstance(self.metrics.retries[0], requests.exceptions.ReadTimeout)
+        self.assertEqual(self.metrics.phases["network"], 2)
+        self.assertEqual(self.metrics.phases["parse"], 1)
+
+    @requests_mock.mock()
+    def test_response_errors(self, rmock):
+        basket = self.prepare_basket()
+        self.mock_soap_response(
+            rmock=rmock, text=self._get_cch_response_db_connection_error()
+        )
+        calc = CCHTaxCalculator()
+        calc.max_retries = 0
+
+        self.assertIsNone(calc.apply_taxes(self.get_to_address(), basket))
+
+        self.assertEqual(self.metrics.errors, [("system", 9999)])
+
+    @requests_mock.mock()
+    def test_breaker_transitions(self, rmock):
+        self.mock_soap_response(rmock=rmock, exc=requests.exceptions.ConnectTimeout)
+        basket = self.prepare_basket()
+        calc = CCHTaxCalculator(breaker=get_circuit_breaker("metrics", fail_max=2))
+        calc.max_retries = 0
+
+        with mock.patch.object(metrics, "_recorder", self.metrics):
+            for _ in range(2):
+                calc.apply_taxes(self.get_to_address(), basket)
+
+        self.assertEqual(self.metrics.transitions, [("metrics", "closed", "open")])
+
+    @requests_mock.mock()
+    def test_measuring_doesnt_change_transport(self, rmock):
+        basket = self.prepare_basket()
+        self.mock_soap_response(
+            rmock=rmock, text=self._get_cch_response_normal(basket.all_lines()[0].id)
+        )
+        calc = CCHTaxCalculator()
+
+        with mock.patch.object(calc, "_post_order") as post_order:
+            self.assertIsNotNone(calc.apply_taxes(self.get_to_address(), basket))
+
+        # zeep sends the request and parses the response, just like when metrics are disabled
+        post_order.assert_not_called()
+        self.assertEqual(rmock.call_count, 1)
+        self.assertEqual(self.metrics.phases, {"build": 1, "network": 1, "parse": 1})
+
+    @requests_mock.mock()
+    def test_failed_request(self, rmock):
+        self.mock_soap_response(rmock=rmock, exc=requests.exceptions.ConnectTimeout)
+        calc = CCHTaxCalculator()
+        calc.max_retries = 0
+
+        self.assertIsNone(
+            calc.apply_taxes(self.get_to_address(), self.prepare_basket())
+        )
+
+        self.assertEqual(self.metrics.phases, {"build": 1, "network": 1})
+        self.assertEqual(self.metrics.payload_sizes, [])
+
+
+class GetMetricsRecorderTest(SimpleTestCase):
+    def test_disabled_by_default(self):
+        self.assertIs(type(get_metrics_recorder()), MetricsRecorder)
+        self.assertIs(CCHTaxCalculator().metrics, get_metrics_recorder())
+
+    @mock.patch.object(metrics, "_recorder", None)
+    @mock.patch(
+        "oscarcch.settings.CCH_METRICS_RECORDER",
+        "oscarcch.tests.test_metrics.RecordingMetrics",
+    )
+    def test_configured_recorder(self):
+        recorder = get_metrics_recorder()
+        self.assertIsInstance(recorder, RecordingMetrics)
+        self.assertIs(get_metrics_recorder(), recorder)
+        # Calculators look up the recorder when they first use it, rather than when they're imported
+        self.assertIs(CCHTaxCalculator().metrics, recorder)
+
+    def test_error_kinds(self):
+        self.assertEqual(get_error_kind(CCHSystemError(1, "")), "system")
+        self.assertEqual(get_error_kind(CCHRequestError(1, "")), "request")
+        self.assertEqual(get_error_kind(CCHError(1, "")), "unknown")
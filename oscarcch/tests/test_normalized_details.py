@@ -0,0 +1,140 @@
+from decimal import Decimal as D
+from importlib import import_module
+from io import StringIO
+from unittest import mock
+
+from django.apps import apps
+from django.core.management import call_command
+from oscar.test import factories
+import requests_mock
+
+from ..models import (
+    LineItemTaxationDetail,
+    ShippingTaxationDetail,
+    TaxAuthority,
+    TaxType,
+    _get_tax_categories,
+)
+from .base import BaseTest
+
+
+class NormalizedTaxationDetailsTest(BaseTest):
+    def place_order(self, rmock):
+        basket = self.prepare_basket()
+        self.mock_soap_response(
+            rmock=rmock,
+            text=self._get_cch_response_normal(basket.all_lines()[0].id),
+        )
+        return factories.create_order(
+            basket=basket, shipping_address=self.get_to_address()
+        )
+
+    @requests_mock.mock()
+    def test_save_normalized_details(self, rmock):
+        order = self.place_order(rmock)
+
+        line = order.lines.get()
+        detail = line.taxation.details.get(authority__name="NEW YORK, STATE OF")
+        self.assertEqual(detail.authority.authority_type, "1")
+        self.assertEqual(detail.tax_type.name, "STATE SALES TAX-GENERAL MERCHANDISE")
+        self.assertEqual(detail.tax_applied, D("0.40"))
+        self.assertEqual(detail.fee_applied, D(0))
+        self.assertEqual(detail.tax_rate, D("0.04"))
+        self.assertEqual(detail.taxable_amount, D(10))
+        self.assertEqual(
+            str(detail), "NEW YORK, STATE OF—STATE SALES TAX-GENERAL MERCHANDISE"
+        )
+        # The HStore data is still written during the dual-write window
+        self.assertEqual(detail.data["AuthorityName"], "NEW YORK, STATE OF")
+
+        # Lines and shipping share the same authorities and tax types
+        self.assertEqual(TaxAuthority.objects.count(), 3)
+        self.assertEqual(
+            ShippingTaxationDetail.objects.filter(
+                authority=detail.authority, tax_type=detail.tax_type
+            ).count(),
+            1,
+        )
+
+    @requests_mock.mock()
+    def test_stop_saving_data(self, rmock):
+        with mock.patch("oscarcch.settings.CCH_SAVE_TAXATION_DETAILS_DATA", False):
+            order = self.place_order(rmock)
+
+        for detail in order.lines.get().taxation.details.all():
+            self.assertIsNone(detail.data)
+            self.assertIsNotNone(detail.authority)
+            self.assertIsNotNone(detail.tax_applied)
+
+    def test_look_up_existing_categories(self):
+        details = [
+            {
+                "AuthorityName": "NEW YORK, STATE OF",
+                "AuthorityType": "1",
+                "TaxName": "A",
+            },
+            {
+                "AuthorityName": "NEW YORK, CITY OF",
+                "AuthorityType": "3",
+                "TaxName": "A",
+            },
+        ]
+        # Creating the missing authorities and tax types takes 3 queries per model
+        with self.assertNumQueries(6):
+            authorities, tax_types = _get_tax_categories(details)
+        # Once they exist, looking them up takes 1 query per model
+        with self.assertNumQueries(2):
+            self.assertEqual(_get_tax_categories(details), (authorities, tax_types))
+        self.assertEqual(len(authorities), 2)
+        self.assertEqual(list(tax_types), ["A"])
+
+    @requests_mock.mock()
+    def test_migrate_details(self, rmock):
+        order = self.place_order(rmock)
+        # Pretend the details were saved before the normalized columns existed
+        for model in (LineItemTaxationDetail, ShippingTaxationDetail):
+            model.objects.update(
+                authority=None,
+                tax_type=None,
+                tax_applied=None,
+                fee_applied=None,
+                tax_rate=None,
+                taxable_amount=None,
+            )
+        TaxAuthority.objects.all().delete()
+        TaxType.objects.all().delete()
+
+        out = StringIO()
+        call_command("cch_migrate_taxation_details", "--batch-size=2", stdout=out)
+        self.assertIn("Migrated 3 line item taxation details", out.getvalue())
+        self.assertIn("Migrated 3 shipping taxation details", out.getvalue())
+
+        detail = order.lines.get().taxation.details.get(
+            authority__name="NEW YORK, CITY OF"
+        )
+        self.assertEqual(detail.authority.authority_type, "3")
+        self.assertEqual(detail.tax_type.name, "COUNTY SALES TAX-GENERAL MERCHANDISE")
+        self.assertEqual(detail.tax_applied, D("0.45"))
+        self.assertEqual(detail.tax_rate, D("0.045"))
+        self.assertEqual(TaxAuthority.objects.count(), 3)
+
+        # Re-running has nothing left to migrate
+        out = StringIO()
+        call_command("cch_migrate_taxation_details", stdout=out)
+        self.assertIn("Migrated 0 line item taxation details", out.getvalue())
+
+    @requests_mock.mock()
+    def test_migration_only_migrates_one_batch(self, rmock):
+        self.place_order(rmock)
+        for model in (LineItemTaxationDetail, ShippingTaxationDetail):
+            model.objects.update(authority=None, tax_type=None, tax_applied=None)
+        migration = import_module("oscarcch.migrations.0006_migrate_taxation_details")
+
+        with mock.patch.object(migration, "BATCH_SIZE", 2):
+            migration.forwards(apps, None)
+
+        for model in (LineItemTaxationDetail, ShippingTaxationDetail):
+            self.assertEqual(model.objects.filter(authority__isnull=True).count(), 1)
+            detail = model.objects.filter(authority__isnull=False).first()
+            self.assertEqual(detail.tax_type.name, detail.data["TaxName"])
+            self.assertEqual(detail.tax_applied, D(detail.data["TaxApplied"]))
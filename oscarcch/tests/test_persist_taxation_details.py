@@ -1,9 +1,16 @@
 from decimal import Decimal as D
+from io import StringIO
+from unittest import mock
 
+from django.core.management import call_command
 from oscar.core.loading import get_class, get_model
 from oscar.test import factories
 import requests_mock
+import zeep.helpers
 
+from ..calculator import CCHTaxCalculator
+from ..models import LineItemTaxation, OrderTaxation, TaxationDetailsOutbox
+from ..order_creator import CCHOrderCreatorMixin
 from .base import BaseTest
 
 Basket = get_model("basket", "Basket")
@@ -101,3 +108,183 @@ class PersistCCHDetailsTest(BaseTest):
         # Make sure we have an line taxation objects
         for line in order.lines.all():
             self.assertFalse(hasattr(line, "taxation"))
+
+    @requests_mock.mock()
+    def test_place_order_with_nothing_to_tax(self, rmock):
+        """Place an order without calling CCH, since none of its lines are taxable"""
+        basket = self.prepare_basket()
+        to_address = self.get_to_address()
+        for line in basket.all_lines():
+            line.cch_quantity = 0
+
+        with mock.patch("oscarcch.settings.CCH_SHIPPING_TAXES_ENABLED", False):
+            order = factories.create_order(basket=basket, shipping_address=to_address)
+
+        self.assertEqual(rmock.call_count, 0)
+        self.assertTrue(order.is_tax_known)
+        self.assertEqual(order.total_incl_tax, order.total_excl_tax)
+        self.assertFalse(OrderTaxation.objects.filter(order=order).exists())
+
+    @requests_mock.mock()
+    def test_persist_taxation_details_query_count(self, rmock):
+        """Saving the details of a large order takes a constant number of queries"""
+        basket = self.prepare_basket(lines=10)
+        to_address = self.get_to_address()
+        line_ids = [line.id for line in basket.all_lines()]
+
+        # Place the order without saving its taxes
+        self.mock_soap_response(
+            rmock=rmock,
+            text=self._get_cch_response_db_connection_error(),
+        )
+        order = factories.create_order(basket=basket, shipping_address=to_address)
+        self.assertFalse(hasattr(order, "taxation"))
+
+        # Build a response taxing every line, based on the taxes of the first line
+        self.mock_soap_response(
+            rmock=rmock,
+            text=self._get_cch_response_normal(line_ids[0]),
+        )
+        calc = CCHTaxCalculator()
+        data = zeep.helpers.serialize_object(
+            calc.apply_taxes(to_address, basket, self.get_shipping_charge()), dict
+        )
+        line_tax, shipping_tax = data["LineItemTaxes"]["LineItemTax"]
+        data["LineItemTaxes"]["LineItemTax"] = [
+            line_tax | {"ID": str(line_id)} for line_id in line_ids
+        ] + [shipping_tax]
+        taxes = calc.client.get_type(calc.response_type_name)(**data)
+
+        # Same as for a single line order: 2 savepoint queries, 2 to save the order taxation, 1 to fetch the
+        # order lines, 3 each to look up and create the tax authorities and tax types, and then 2 bulk inserts each
+        # for line and shipping taxes.
+        with self.assertNumQueries(15):
+            OrderTaxation.save_details(order, taxes)
+
+        self.assertEqual(order.shipping_taxations.get().details.count(), 3)
+        for line in order.lines.all():
+            self.assertEqual(line.taxation.total_tax_applied, D("0.89"))
+            self.assertEqual(line.taxation.details.count(), 3)
+
+    @requests_mock.mock()
+    def test_defer_taxation_details(self, rmock):
+        """Place an order, saving the line and shipping taxation details out of band"""
+        basket = self.prepare_basket()
+        to_address = self.get_to_address()
+
+        self.mock_soap_response(
+            rmock=rmock,
+            text=self._get_cch_response_normal(basket.all_lines()[0].id),
+        )
+
+        with mock.patch.object(
+            CCHOrderCreatorMixin, "defer_cch_taxation_details", True
+        ):
+            order = factories.create_order(basket=basket, shipping_address=to_address)
+
+        # Only the order taxation is saved inline
+        self.assertEqual(order.taxation.total_tax_applied, D("2.22"))
+        self.assertEqual(order.shipping_taxations.count(), 0)
+        self.assertEqual(LineItemTaxation.objects.count(), 0)
+        entry = TaxationDetailsOutbox.objects.get()
+        self.assertEqual(entry.order, order)
+        self.assertIsNone(entry.date_processed)
+
+        # Queuing the same response again is a no-op
+        calc = CCHTaxCalculator()
+        TaxationDetailsOutbox.enqueue(order, calc.deserialize_response(entry.response))
+        self.assertEqual(TaxationDetailsOutbox.objects.count(), 1)
+
+        # Drain the outbox
+        out = StringIO()
+        call_command("cch_process_taxation_outbox", stdout=out)
+        self.assertIn("Saved taxation details for 1 orders", out.getvalue())
+        entry.refresh_from_db()
+        self.assertIsNotNone(entry.date_processed)
+
+        shipping_taxation = order.shipping_taxations.get()
+        self.assertEqual(shipping_taxation.total_tax_applied, D("1.33"))
+        self.assertEqual(shipping_taxation.details.count(), 3)
+        line = order.lines.get()
+        self.assertEqual(line.taxation.total_tax_applied, D("0.89"))
+        self.assertEqual(line.taxation.details.count(), 3)
+        detail = line.taxation.details.get(data__TaxName__contains="STATE")
+        self.assertEqual(detail.data["AuthorityName"], "NEW YORK, STATE OF")
+
+        # Replaying the drain doesn't save anything twice
+        out = StringIO()
+        call_command("cch_process_taxation_outbox", stdout=out)
+        self.assertIn("Saved taxation details for 0 orders", out.getvalue())
+        self.assertEqual(order.shipping_taxations.count(), 1)
+        self.assertEqual(LineItemTaxation.objects.count(), 1)
+
+    def _create_deferred_orders(self, rmock, count):
+        product = self.prepare_basket().all_lines()[0].product
+        orders = []
+        for _ in range(count):
+            basket = Basket.objects.create()
+            basket.strategy = USStrategy()
+            basket.add(product)
+            self.mock_soap_response(
+                rmock=rmock,
+                text=self._get_cch_response_normal(basket.all_lines()[0].id),
+            )
+            with mock.patch.object(
+                CCHOrderCreatorMixin, "defer_cch_taxation_details", True
+            ):
+                orders.append(
+                    factories.create_order(
+                        basket=basket, shipping_address=self.get_to_address()
+                    )
+                )
+        return orders
+
+    @requests_mock.mock()
+    def test_outbox_saves_batch_at_once(self, rmock):
+        orders = self._create_deferred_orders(rmock, 3)
+
+        with mock.patch.object(
+            OrderTaxation,
+            "save_line_details",
+            wraps=OrderTaxation.save_line_details,
+        ) as save_line_details:
+            self.assertEqual(TaxationDetailsOutbox.process_pending(), 3)
+
+        save_line_details.assert_called_once()
+        self.assertEqual(len(save_line_details.call_args.args[0]), 3)
+        self.assertEqual(LineItemTaxation.objects.count(), 3)
+        for order in orders:
+            self.assertEqual(order.shipping_taxations.count(), 1)
+
+    @requests_mock.mock()
+    def test_outbox_skips_failed_entries(self, rmock):
+        """An entry which can't be saved doesn't stop the rest of the outbox from draining"""
+        orders = self._create_deferred_orders(rmock, 3)
+        # The line of the second order has since been deleted
+        orders[1].lines.all().delete()
+
+        out = StringIO()
+        err = StringIO()
+        with self.assertLogs("oscarcch.models", "ERROR"):
+            call_command("cch_process_taxation_outbox", stdout=out, stderr=err)
+        self.assertIn("Saved taxation details for 2 orders", out.getvalue())
+        self.assertIn("Failed to save taxation details for 1 orders", err.getvalue())
+        self.assertEqual(LineItemTaxation.objects.count(), 2)
+        self.assertEqual(orders[0].shipping_taxations.count(), 1)
+        self.assertEqual(orders[2].shipping_taxations.count(), 1)
+        failed = TaxationDetailsOutbox.objects.get(order=orders[1])
+        self.assertIsNone(failed.date_processed)
+        self.assertEqual(failed.attempts, 1)
+        self.assertIn("DoesNotExist", failed.last_error)
+
+        # Failed entries are retried after a delay, until they've failed too often
+        self.assertEqual(TaxationDetailsOutbox.process_pending(), 0)
+        self.assertEqual(TaxationDetailsOutbox.process_pending(retry_delay=0), 1)
+        failed.refresh_from_db()
+        self.assertEqual(failed.attempts, 2)
+        with self.assertLogs("oscarcch.models", "ERROR"):
+            for _ in range(3):
+                TaxationDetailsOutbox.process_pending(retry_delay=0)
+        self.assertEqual(TaxationDetailsOutbox.process_pending(retry_delay=0), 0)
+        failed.refresh_from_db()
+        self.assertEqual(failed.attempts, 5)
@@ -0,0 +1,98 @@
+from decimal import Decimal as D
+from unittest import mock
+
+from django.core.cache import caches
+import requests_mock
+
+from ..calculator import CCHTaxCalculator
+from .base import BaseTest
+
+
+@mock.patch.object(CCHTaxCalculator, "response_cache_timeout", 60)
+class ResponseCacheTest(BaseTest):
+    def setUp(self):
+        super().setUp()
+        caches["default"].clear()
+        # Build the shared client up front, so that loading the WSDL doesn't count towards mocked requests
+        self.assertIsNotNone(CCHTaxCalculator().client)
+
+    def assert_taxes_are_correct(self, basket, shipping_charge):
+        self.assertTrue(basket.is_tax_known)
+        self.assertEqual(basket.total_incl_tax, D("10.89"))
+        self.assertEqual(basket.total_tax, D("0.89"))
+        details = basket.all_lines()[0].purchase_info.price.taxation_details
+        self.assertEqual(len(details), 3)
+        self.assertEqual(details[0].authority_name, "NEW YORK, STATE OF")
+        self.assertEqual(details[0].tax_applied, D("0.40"))
+        self.assertTrue(shipping_charge.is_tax_known)
+        self.assertEqual(shipping_charge.incl_tax, D("16.3203625"))
+
+    @requests_mock.mock()
+    def test_repeated_calculation_is_served_from_cache(self, rmock):
+        basket = self.prepare_basket()
+        to_address = self.get_to_address()
+        shipping_charge = self.get_shipping_charge()
+        self.mock_soap_response(
+            rmock=rmock,
+            text=self._get_cch_response_normal(basket.all_lines()[0].id),
+        )
+
+        resp1 = CCHTaxCalculator().apply_taxes(to_address, basket, shipping_charge)
+        self.assert_taxes_are_correct(basket, shipping_charge)
+        self.assertEqual(rmock.call_count, 1)
+
+        resp2 = CCHTaxCalculator().apply_taxes(to_address, basket, shipping_charge)
+        self.assert_taxes_are_correct(basket, shipping_charge)
+        self.assertEqual(rmock.call_count, 1)
+
+        self.assertEqual(resp1.TransactionID, resp2.TransactionID)
+        self.assertEqual(resp1.TotalTaxApplied, resp2.TotalTaxApplied)
+        self.assertEqual(
+            [item.ID for item in resp1.LineItemTaxes.LineItemTax],
+            [item.ID for item in resp2.LineItemTaxes.LineItemTax],
+        )
+
+    @requests_mock.mock()
+    def test_changed_order_is_not_served_from_cache(self, rmock):
+        basket = self.prepare_basket()
+        to_address = self.get_to_address()
+        self.mock_soap_response(
+            rmock=rmock,
+            text=self._get_cch_response_normal(basket.all_lines()[0].id),
+        )
+
+        CCHTaxCalculator().apply_taxes(to_address, basket, self.get_shipping_charge())
+        self.assertEqual(rmock.call_count, 1)
+
+        to_address.postcode = "11222"
+        CCHTaxCalculator().apply_taxes(to_address, basket, self.get_shipping_charge())
+        self.assertEqual(rmock.call_count, 2)
+
+    @requests_mock.mock()
+    def test_finalized_transactions_are_not_cached(self, rmock):
+        basket = self.prepare_basket()
+        to_address = self.get_to_address()
+        self.mock_soap_response(
+            rmock=rmock,
+            text=self._get_cch_response_normal(basket.all_lines()[0].id),
+        )
+
+        with mock.patch("oscarcch.settings.CCH_FINALIZE_TRANSACTION", True):
+            CCHTaxCalculator().apply_taxes(to_address, basket)
+            CCHTaxCalculator().apply_taxes(to_address, basket)
+        self.assertEqual(rmock.call_count, 2)
+
+    @requests_mock.mock()
+    def test_error_responses_are_not_cached(self, rmock):
+        basket = self.prepare_basket()
+        to_address = self.get_to_address()
+        self.mock_soap_response(
+            rmock=rmock,
+            text=self._get_cch_response_db_connection_error(),
+        )
+
+        calc = CCHTaxCalculator()
+        calc.max_retries = 0
+        self.assertIsNone(calc.apply_taxes(to_address, basket))
+        self.assertIsNone(calc.apply_taxes(to_address, basket))
+        self.assertEqual(rmock.call_count, 2)
@@ -0,0 +1,206 @@
+from decimal import Decimal as D
+from unittest import mock
+import threading
+
+from django.core.cache import caches
+from oscar.test import factories
+import requests_mock
+import zeep.exceptions
+
+from ..calculator import CCHTaxCalculator
+from ..models import LineItemTaxationDetail
+from ..responses import (
+    LineItemTax,
+    TaxResponse,
+    _get_parser,
+    get_line_item_taxes,
+    get_messages,
+    get_tax_details,
+    parse_calculate_response,
+)
+from .base import BaseTest
+
+FIXTURES = [
+    ("normal", True),
+    ("basket_only", True),
+    ("shipping_only", False),
+    ("shipping_only_multiple_skus", False),
+    ("ohio_request_short_zip", True),
+    ("ohio_request_full_zip", True),
+    ("empty", False),
+    ("db_connection_error", False),
+]
+
+SOAP_FAULT = """
+<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/">
+    <s:Body>
+        <s:Fault>
+            <faultcode>s:Client</faultcode>
+            <faultstring>Invalid request</faultstring>
+        </s:Fault>
+    </s:Body>
+</s:Envelope>"""
+
+
+class ParseCalculateResponseTest(BaseTest):
+    def setUp(self):
+        super().setUp()
+        caches["default"].clear()
+        # Build the shared client up front, so that loading the WSDL doesn't count towards mocked requests
+        self.assertIsNotNone(CCHTaxCalculator().client)
+
+    def get_fixture(self, name, takes_line_id):
+        method = getattr(self, f"_get_cch_response_{name}")
+        return method("123") if takes_line_id else method()
+
+    @requests_mock.mock()
+    def test_matches_zeep(self, rmock):
+        """The parsed response serializes to exactly the same data as the zeep response"""
+        calc = CCHTaxCalculator()
+        order = calc._build_order(self.get_to_address(), self.prepare_basket(), None)
+        for name, takes_line_id in FIXTURES:
+            with self.subTest(fixture=name):
+                content = self.get_fixture(name, takes_line_id)
+                self.mock_soap_response(rmock=rmock, text=content)
+                expected = calc.serialize_response(calc._send_order(order))
+                parsed = parse_calculate_response(content.encode())
+                self.assertEqual(calc.serialize_response(parsed), expected)
+                # Zeep's serialized responses can be rebuilt as parsed responses too
+                self.assertEqual(TaxResponse.from_dict(expected), parsed)
+
+    def test_soap_fault(self):
+        with self.assertRaises(zeep.exceptions.Fault) as cm:
+            parse_calculate_response(SOAP_FAULT.encode(), 500)
+        self.assertEqual(cm.exception.message, "Invalid request")
+        self.assertEqual(cm.exception.code, "s:Client")
+
+    def test_http_error(self):
+        with self.assertRaises(zeep.exceptions.TransportError) as cm:
+            parse_calculate_response(b"Service Unavailable", 503)
+        self.assertEqual(cm.exception.status_code, 503)
+
+    def test_invalid_xml(self):
+        with self.assertRaises(zeep.exceptions.XMLSyntaxError):
+            parse_calculate_response(b"<s:Envelope", 200)
+
+    def test_safety_limits(self):
+        content = b"<a>" * 300 + b"</a>" * 300
+        with self.assertRaises(zeep.exceptions.XMLSyntaxError):
+            parse_calculate_response(content, 200)
+
+    def test_parser_per_thread(self):
+        parsers = []
+        thread = threading.Thread(target=lambda: parsers.append(_get_parser()))
+        thread.start()
+        thread.join()
+        self.assertIs(_get_parser(), _get_parser())
+        self.assertIsNot(parsers[0], _get_parser())
+
+    def test_missing_arrays(self):
+        response = parse_calculate_response(
+            self._get_cch_response_empty().encode(), 200
+        )
+        self.assertEqual(get_line_item_taxes(response), [])
+        self.assertEqual(get_messages(TaxResponse()), [])
+        self.assertEqual(get_tax_details(LineItemTax(ID="1")), [])
+
+
+@mock.patch.object(CCHTaxCalculator, "parse_raw_responses", True)
+class RawResponseCalculatorTest(BaseTest):
+    def setUp(self):
+        super().setUp()
+        caches["default"].clear()
+        self.assertIsNotNone(CCHTaxCalculator().client)
+
+    @requests_mock.mock()
+    def test_apply_taxes(self, rmock):
+        basket = self.prepare_basket()
+        shipping_charge = self.get_shipping_charge()
+        self.mock_soap_response(
+            rmock=rmock,
+            text=self._get_cch_response_normal(basket.all_lines()[0].id),
+        )
+
+        resp = CCHTaxCalculator().apply_taxes(
+            self.get_to_address(), basket, shipping_charge
+        )
+
+        self.assertIsInstance(resp, TaxResponse)
+        self.assertEqual(resp.TransactionID, 40043)
+        self.assertTrue(basket.is_tax_known)
+        self.assertEqual(basket.total_incl_tax, D("10.89"))
+        details = basket.all_lines()[0].purchase_info.price.taxation_details
+        self.assertEqual(details[0].authority_name, "NEW YORK, STATE OF")
+        self.assertEqual(details[0].tax_applied, D("0.40"))
+        self.assertEqual(shipping_charge.incl_tax, D("16.3203625"))
+
+    @requests_mock.mock()
+    def test_response_errors(self, rmock):
+        basket = self.prepare_basket()
+        self.mock_soap_response(
+            rmock=rmock, text=self._get_cch_response_db_connection_error()
+        )
+        calc = CCHTaxCalculator()
+        calc.max_retries = 0
+
+        self.assertIsNone(calc.apply_taxes(self.get_to_address(), basket))
+        self.assertEqual(basket.total_tax, D("0.00"))
+
+    @requests_mock.mock()
+    def test_http_errors_are_retried(self, rmock):
+        basket = self.prepare_basket()
+        self.mock_soap_response(
+            rmock=rmock,
+            response_list=[
+                {"text": "Bad Gateway", "status_code": 502},
+                {"text": self._get_cch_response_normal(basket.all_lines()[0].id)},
+            ],
+        )
+        calc = CCHTaxCalculator()
+        calc.retry_backoff = 0
+
+        resp = calc.apply_taxes(self.get_to_address(), basket)
+
+        self.assertEqual(rmock.call_count, 2)
+        self.assertEqual(resp.TotalTaxApplied, D("2.2203625"))
+
+    @requests_mock.mock()
+    def test_place_order(self, rmock):
+        basket = self.prepare_basket()
+        self.mock_soap_response(
+            rmock=rmock,
+            text=self._get_cch_response_normal(basket.all_lines()[0].id),
+        )
+
+        order = factories.create_order(
+            basket=basket, shipping_address=self.get_to_address()
+        )
+
+        self.assertEqual(order.taxation.transaction_id, 40043)
+        self.assertEqual(order.taxation.total_tax_applied, D("2.22"))
+        self.assertEqual(order.shipping_taxations.get().details.count(), 3)
+        detail = LineItemTaxationDetail.objects.get(
+            taxation__line_item__order=order, authority__name="NEW YORK, STATE OF"
+        )
+        self.assertEqual(detail.tax_applied, D("0.40"))
+        # The HStore data is the same as it would be for a zeep response
+        self.assertEqual(detail.data["TaxApplied"], "0.40")
+        self.assertEqual(detail.data["TaxRate"], "0.040000000000")
+        self.assertEqual(detail.data["AuthorityType"], "1")
+
+    @requests_mock.mock()
+    @mock.patch.object(CCHTaxCalculator, "response_cache_timeout", 60)
+    def test_cached_response(self, rmock):
+        basket = self.prepare_basket()
+        self.mock_soap_response(
+            rmock=rmock,
+            text=self._get_cch_response_normal(basket.all_lines()[0].id),
+        )
+        to_address = self.get_to_address()
+
+        resp1 = CCHTaxCalculator().apply_taxes(to_address, basket)
+        resp2 = CCHTaxCalculator().apply_taxes(to_address, basket)
+
+        self.assertEqual(rmock.call_count, 1)
+        self.assertIsInstance(resp2, TaxResponse)
+        self.assertEqual(resp1, resp2)
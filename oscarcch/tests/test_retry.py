@@ -0,0 +1,186 @@
+from unittest import mock
+import time
+
+from django.test import SimpleTestCase
+import pybreaker
+import requests
+import requests_mock
+import zeep.exceptions
+
+from ..calculator import CCHTaxCalculator
+from ..exceptions import CCHRequestError, CCHSystemError
+from ..retry import DeadlineExceeded, RetryPolicy, get_remaining_time
+from .base import BaseTest
+
+
+class RetryPolicyTest(SimpleTestCase):
+    def failing(self, exc, calls):
+        def func():
+            calls.append(time.monotonic())
+            raise exc
+
+        return func
+
+    def test_retryable_failures_are_retried(self):
+        calls = []
+        policy = RetryPolicy(max_retries=3, backoff=0.001)
+        with self.assertRaises(requests.exceptions.ReadTimeout):
+            policy.call(self.failing(requests.exceptions.ReadTimeout(), calls))
+        self.assertEqual(len(calls), 4)
+
+    def test_fatal_failures_are_not_retried(self):
+        policy = RetryPolicy(max_retries=3, backoff=0.001)
+        for exc in (
+            CCHRequestError(1, "Invalid request"),
+            pybreaker.CircuitBreakerError(),
+            zeep.exceptions.TransportError(status_code=400),
+            ValueError(),
+        ):
+            calls = []
+            with self.assertRaises(type(exc)):
+                policy.call(self.failing(exc, calls))
+            self.assertEqual(len(calls), 1, exc)
+
+    def test_classification(self):
+        policy = RetryPolicy()
+        self.assertTrue(policy.is_retryable(requests.exceptions.ConnectTimeout()))
+        self.assertTrue(policy.is_retryable(requests.exceptions.ConnectionError()))
+        self.assertTrue(policy.is_retryable(CCHSystemError(9999, "DB error")))
+        self.assertTrue(
+            policy.is_retryable(zeep.exceptions.TransportError(status_code=503))
+        )
+        self.assertFalse(policy.is_retryable(CCHRequestError(1, "Invalid request")))
+        self.assertFalse(policy.is_retryable(DeadlineExceeded()))
+
+    def test_success_after_retry(self):
+        calls = []
+
+        def func():
+            calls.append(1)
+            if len(calls) < 3:
+                raise requests.exceptions.ConnectionError
+            return "ok"
+
+        policy = RetryPolicy(max_retries=2, backoff=0.001)
+        self.assertEqual(policy.call(func), "ok")
+        self.assertEqual(len(calls), 3)
+
+    def test_backoff_is_exponential_with_jitter(self):
+        policy = RetryPolicy(backoff=0.1, max_backoff=0.5)
+        with mock.patch("random.uniform", side_effect=lambda a, b: b):
+            self.assertEqual(
+                [policy.get_backoff(n) for n in range(5)],
+                [0.1, 0.2, 0.4, 0.5, 0.5],
+            )
+        for n in range(5):
+            self.assertLessEqual(policy.get_backoff(n), 0.5)
+
+    def test_deadline_bounds_the_whole_call(self):
+        calls = []
+
+        def func():
+            calls.append(1)
+            time.sleep(0.02)
+            raise requests.exceptions.ReadTimeout
+
+        policy = RetryPolicy(max_retries=1000, backoff=0.01, deadline=0.2)
+        start = time.monotonic()
+        with self.assertRaises(requests.exceptions.ReadTimeout):
+            policy.call(func)
+        # ``func`` ignores the deadline, so the last attempt may run up to its full 20ms over.
+        self.assertLess(time.monotonic() - start, 0.2 + 0.05)
+        self.assertLess(len(calls), 1000)
+
+    def test_remaining_time(self):
+        self.assertIsNone(get_remaining_time())
+        remaining = RetryPolicy(deadline=5).call(get_remaining_time)
+        self.assertGreater(remaining, 4)
+        self.assertLessEqual(remaining, 5)
+        # An outer deadline still applies to nested calls
+        nested = RetryPolicy(deadline=5).call(
+            lambda: RetryPolicy(deadline=60).call(get_remaining_time)
+        )
+        self.assertLessEqual(nested, 5)
+        self.assertIsNone(get_remaining_time())
+
+
+class CalculatorRetryTest(BaseTest):
+    def setUp(self):
+        super().setUp()
+        # Build the shared client up front, so that loading the WSDL doesn't count towards mocked requests
+        self.assertIsNotNone(CCHTaxCalculator().client)
+
+    def test_operation_timeout_is_capped_by_deadline(self):
+        transport = CCHTaxCalculator().client.transport
+        self.assertEqual(transport.operation_timeout, (3.05, 10))
+        connect, read = RetryPolicy(deadline=2).call(
+            lambda: transport.operation_timeout
+        )
+        self.assertLessEqual(connect, 2)
+        self.assertLessEqual(read, 2)
+        self.assertGreater(read, 1)
+
+    @requests_mock.mock()
+    def test_apply_taxes_never_exceeds_deadline(self, rmock):
+        basket = self.prepare_basket()
+        to_address = self.get_to_address()
+
+        def respond(request, context):
+            time.sleep(0.02)
+            raise requests.exceptions.ReadTimeout
+
+        self.mock_soap_response(rmock=rmock, text=respond)
+        calc = CCHTaxCalculator()
+        calc.max_retries = 1000
+        calc.retry_backoff = 0.01
+        calc.retry_deadline = 0.3
+
+        start = time.monotonic()
+        self.assertIsNone(calc.apply_taxes(to_address, basket))
+        # The mock ignores the shortened timeout, so allow the last attempt to run its full 20ms over.
+        self.assertLess(time.monotonic() - start, 0.3 + 0.05)
+        self.assertGreater(rmock.call_count, 1)
+        self.assertLess(rmock.call_count, 1000)
+        self.assertTrue(basket.is_tax_known)
+
+    @requests_mock.mock()
+    def test_system_error_response_is_retried(self, rmock):
+        basket = self.prepare_basket()
+        self.mock_soap_response(
+            rmock=rmock,
+            response_list=[
+                {"text": self._get_cch_response_db_connection_error()},
+                {"text": self._get_cch_response_normal(basket.all_lines()[0].id)},
+            ],
+        )
+        calc = CCHTaxCalculator()
+        calc.retry_backoff = 0
+
+        self.assertIsNotNone(calc.apply_taxes(self.get_to_address(), basket))
+        self.assertEqual(rmock.call_count, 2)
+
+    @requests_mock.mock()
+    def test_last_system_error_response_is_returned(self, rmock):
+        basket = self.prepare_basket()
+        self.mock_soap_response(
+            rmock=rmock, text=self._get_cch_response_db_connection_error()
+        )
+        calc = CCHTaxCalculator()
+        calc.retry_backoff = 0
+
+        self.assertIsNone(calc.apply_taxes(self.get_to_address(), basket))
+        self.assertEqual(rmock.call_count, 3)
+        self.assertTrue(basket.is_tax_known)
+
+    @requests_mock.mock()
+    def test_request_error_response_is_not_retried(self, rmock):
+        basket = self.prepare_basket()
+        text = self._get_cch_response_db_connection_error().replace(
+            "<b:Severity>1</b:Severity>", "<b:Severity>2</b:Severity>"
+        )
+        self.mock_soap_response(rmock=rmock, text=text)
+        calc = CCHTaxCalculator()
+        calc.retry_backoff = 0
+
+        self.assertIsNone(calc.apply_taxes(self.get_to_address(), basket))
+        self.assertEqual(rmock.call_count, 1)
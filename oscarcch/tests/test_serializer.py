@@ -0,0 +1,155 @@
+from unittest import mock
+import uuid
+
+from django.core.cache import caches
+from zeep.plugins import Plugin
+from zeep.wsdl.utils import etree_to_string
+import requests_mock
+import zeep
+import zeep.exceptions
+
+from ..calculator import CCHTaxCalculator
+from ..responses import TaxResponse
+from ..serializer import CalculateRequestSerializer, get_request_serializer
+from . import test_cch
+from .base import BaseTest
+
+MESSAGE_ID = uuid.UUID("6d9ef4a4-5c9c-4f1a-9f4c-9a1e0e9f5b3c")
+
+_serialize = CalculateRequestSerializer.serialize
+
+
+def serialize_with_zeep(client, *args):
+    return etree_to_string(
+        client.create_message(client.service, "CalculateRequest", *args)
+    )
+
+
+class SerializerTestMixin:
+    def setUp(self):
+        super().setUp()
+        caches["default"].clear()
+        self.serialized = 0
+        patcher = mock.patch.object(
+            CalculateRequestSerializer,
+            "serialize",
+            lambda serializer, *args: self.assertSerializesLikeZeep(serializer, *args),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def assertSerializesLikeZeep(self, serializer, *args):
+        with mock.patch("uuid.uuid4", return_value=MESSAGE_ID):
+            expected = serialize_with_zeep(serializer.client, *args)
+            actual = _serialize(serializer, *args)
+        self.assertEqual(actual.decode(), expected.decode())
+        self.serialized += 1
+        return actual
+
+
+@mock.patch.object(CCHTaxCalculator, "precompile_requests", True)
+class PrecompiledCCHTaxCalculatorTest(
+    SerializerTestMixin, test_cch.CCHTaxCalculatorTest
+):
+    """Every request sent by the calculator tests is identical to the one zeep would have sent"""
+
+    def setUp(self):
+        super().setUp()
+        # Otherwise the calculator would silently fall back to zeep, and nothing would be compared
+        self.assertIsNotNone(get_request_serializer(CCHTaxCalculator().client))
+
+    def tearDown(self):
+        # Every calculator test sends at least one request
+        self.assertGreater(self.serialized, 0)
+        super().tearDown()
+
+
+class CalculateRequestSerializerTest(SerializerTestMixin, BaseTest):
+    def setUp(self):
+        super().setUp()
+        self.calc = CCHTaxCalculator()
+        self.serializer = get_request_serializer(self.calc.client)
+        self.assertIsNotNone(self.serializer)
+
+    def build_order(self):
+        return self.calc._build_order(
+            self.get_to_address(),
+            self.prepare_basket(lines=2),
+            self.get_shipping_charge(),
+        )
+
+    def test_serializer_is_shared(self):
+        self.assertIs(get_request_serializer(self.calc.client), self.serializer)
+
+    def test_escaped_text(self):
+        order = self.build_order()
+        line = order["LineItems"]["LineItem"][0]
+        line["SKU"] = "A&B <C> \"D\" 'E'\r\n\tÉ"
+        line["NexusInfo"]["ShipToAddress"]["Line1"] = "1 Rue de l'Église & Co"
+        self.serializer.serialize("E", "D", order)
+        self.assertEqual(self.serialized, 1)
+
+    def test_missing_values(self):
+        order = self.build_order()
+        line = order["LineItems"]["LineItem"][0]
+        # Optional elements are omitted, and required nillable ones are nil, whether unset or None
+        line["ExemptionCode"] = "E"
+        del line["SKU"]
+        line["ProductInfo"] = {"ProductGroup": None}
+        line["NexusInfo"]["ShipFromAddress"] = {}
+        order["CustomerID"] = None
+        order["SitusInfo"] = {}
+        self.serializer.serialize("E", "D", order)
+        self.serializer.serialize(None, None, order)
+        self.serializer.serialize("E")
+        self.assertEqual(self.serialized, 3)
+
+    def test_missing_required_element(self):
+        order = self.build_order()
+        order["InvoiceDate"] = None
+        with self.assertRaises(zeep.exceptions.ValidationError):
+            serialize_with_zeep(self.calc.client, "E", "D", order)
+        with self.assertRaises(zeep.exceptions.ValidationError):
+            _serialize(self.serializer, "E", "D", order)
+
+    def test_invalid_characters(self):
+        order = self.build_order()
+        order["LineItems"]["LineItem"][0]["SKU"] = "ABC\x00"
+        with self.assertRaises(ValueError):
+            serialize_with_zeep(self.calc.client, "E", "D", order)
+        with self.assertRaises(ValueError):
+            _serialize(self.serializer, "E", "D", order)
+
+    def test_unsupported_client(self):
+        client = zeep.Client(
+            wsdl=self.calc.client.wsdl,
+            transport=self.calc.client.transport,
+            plugins=[Plugin()],
+        )
+        with self.assertLogs("oscarcch.serializer", "WARNING"):
+            self.assertIsNone(get_request_serializer(client))
+
+    @requests_mock.mock()
+    def test_raw_responses(self, rmock):
+        basket = self.prepare_basket()
+        self.mock_soap_response(
+            rmock=rmock,
+            text=self._get_cch_response_normal(basket.all_lines()[0].id),
+        )
+        with (
+            mock.patch.object(CCHTaxCalculator, "precompile_requests", True),
+            mock.patch.object(CCHTaxCalculator, "parse_raw_responses", True),
+        ):
+            resp = CCHTaxCalculator().apply_taxes(
+                self.get_to_address(), basket, self.get_shipping_charge()
+            )
+        self.assertIsInstance(resp, TaxResponse)
+        self.assertEqual(resp.TransactionID, 40043)
+        self.assertEqual(self.serialized, 1)
+        self.assertEqual(
+            rmock.last_request.headers["SOAPAction"],
+            '"http://schemas.cch.com/STOService/3.5/ISTOServiceContract/CalculateRequest"',
+        )
+        self.assertEqual(
+            rmock.last_request.headers["Content-Type"], "text/xml; charset=utf-8"
+        )
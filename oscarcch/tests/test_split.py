@@ -0,0 +1,174 @@
+from decimal import Decimal as D
+from unittest import mock
+import itertools
+import re
+import threading
+
+from lxml import etree
+from oscar.test import factories
+import pybreaker
+import requests_mock
+
+from ..calculator import CCHTaxCalculator
+from ..models import LineItemTaxation, OrderTaxation
+from .base import BaseTest, p
+
+
+@mock.patch.object(CCHTaxCalculator, "split_order_lines", 2)
+class SplitOrderTest(BaseTest):
+    def setUp(self):
+        super().setUp()
+        # Build the shared client up front, so that loading the WSDL doesn't count towards mocked requests
+        self.assertIsNotNone(CCHTaxCalculator().client)
+        self.transaction_ids = itertools.count(50001)
+        self.requests = []
+        self.lock = threading.Lock()
+        self.error_line_id = None
+
+    def respond_to_part(self, request, context):
+        """Answer each part of the order with taxes for exactly the lines it contains"""
+        doc = etree.fromstring(request.body)
+        line_ids = [
+            elem.text
+            for elem in doc.xpath(
+                p("Body/CalculateRequest/order/LineItems/LineItem/ID")
+            )
+        ]
+        template = self._get_cch_response_normal("LINE_ID")
+        line_template, shipping_template = re.findall(
+            r"<b:LineItemTax>.*?</b:LineItemTax>", template, re.DOTALL
+        )
+        line_taxes = []
+        total = D(0)
+        for line_id in line_ids:
+            if line_id.startswith("shipping:"):
+                line_taxes.append(shipping_template)
+                total += D("1.3303625")
+            else:
+                line_taxes.append(line_template.replace("LINE_ID", line_id))
+                total += D("0.89")
+        with self.lock:
+            transaction_id = next(self.transaction_ids)
+            self.requests.append((line_ids, transaction_id))
+        if self.error_line_id in line_ids:
+            return self._get_cch_response_db_connection_error()
+        content = re.sub(
+            r"<b:LineItemTax>.*</b:LineItemTax>",
+            lambda match: "".join(line_taxes),
+            template,
+            flags=re.DOTALL,
+        )
+        content = content.replace(
+            "<a:TotalTaxApplied>2.2203625<", f"<a:TotalTaxApplied>{total}<"
+        )
+        return content.replace(
+            "<a:TransactionID>40043<", f"<a:TransactionID>{transaction_id}<"
+        )
+
+    @requests_mock.mock()
+    def test_split_order(self, rmock):
+        self.mock_soap_response(rmock=rmock, text=self.respond_to_part)
+        basket = self.prepare_basket(lines=5)
+        shipping_charge = self.get_shipping_charge()
+
+        resp = CCHTaxCalculator().apply_taxes(
+            self.get_to_address(), basket, shipping_charge
+        )
+
+        # The shipping line takes the place of one basket line in the first part
+        self.assertEqual(rmock.call_count, 3)
+        self.assertEqual(
+            sorted(len(line_ids) for line_ids, _ in self.requests), [2, 2, 2]
+        )
+        (shipping_transaction_id,) = [
+            transaction_id
+            for line_ids, transaction_id in self.requests
+            if "shipping:PARCEL:0" in line_ids
+        ]
+        self.assertEqual(resp.TransactionID, shipping_transaction_id)
+        self.assertEqual(resp.TotalTaxApplied, D("5.7803625"))
+        # The merged response has the lines of every part, in order
+        self.assertEqual(
+            [tax.ID for tax in resp.LineItemTaxes.LineItemTax],
+            ["shipping:PARCEL:0", *(str(line.id) for line in basket.all_lines())],
+        )
+        self.assertEqual(basket.total_tax, D("4.45"))
+        self.assertEqual(shipping_charge.incl_tax, D("16.3203625"))
+
+    @requests_mock.mock()
+    def test_place_order(self, rmock):
+        self.mock_soap_response(rmock=rmock, text=self.respond_to_part)
+        basket = self.prepare_basket(lines=3)
+
+        order = factories.create_order(
+            basket=basket, shipping_address=self.get_to_address()
+        )
+
+        self.assertEqual(rmock.call_count, 2)
+        # The transaction ID of the first part is recorded
+        (first_transaction_id,) = [
+            transaction_id
+            for line_ids, transaction_id in self.requests
+            if str(basket.all_lines()[0].id) in line_ids
+        ]
+        taxation = OrderTaxation.objects.get(order=order)
+        self.assertEqual(taxation.transaction_id, first_transaction_id)
+        self.assertEqual(
+            LineItemTaxation.objects.filter(line_item__order=order).count(), 3
+        )
+
+    @requests_mock.mock()
+    def test_small_orders_are_not_split(self, rmock):
+        self.mock_soap_response(rmock=rmock, text=self.respond_to_part)
+        basket = self.prepare_basket(lines=2)
+
+        resp = CCHTaxCalculator().apply_taxes(self.get_to_address(), basket)
+
+        self.assertEqual(rmock.call_count, 1)
+        self.assertEqual(resp.TransactionID, 50001)
+        self.assertEqual(basket.total_tax, D("1.78"))
+
+    @requests_mock.mock()
+    @mock.patch("oscarcch.settings.CCH_FINALIZE_TRANSACTION", True)
+    def test_finalized_orders_are_not_split(self, rmock):
+        self.mock_soap_response(rmock=rmock, text=self.respond_to_part)
+        basket = self.prepare_basket(lines=5)
+
+        resp = CCHTaxCalculator().apply_taxes(self.get_to_address(), basket)
+
+        self.assertEqual(rmock.call_count, 1)
+        self.assertEqual(resp.TransactionID, 50001)
+        self.assertEqual(basket.total_tax, D("4.45"))
+
+    @requests_mock.mock()
+    def test_error_in_any_part_fails_the_order(self, rmock):
+        self.mock_soap_response(rmock=rmock, text=self.respond_to_part)
+        basket = self.prepare_basket(lines=5)
+        self.error_line_id = str(basket.all_lines()[4].id)
+        calc = CCHTaxCalculator()
+        calc.max_retries = 0
+
+        self.assertIsNone(calc.apply_taxes(self.get_to_address(), basket))
+        self.assertEqual(rmock.call_count, 3)
+        self.assertEqual(basket.total_tax, D("0.00"))
+
+    @requests_mock.mock()
+    def test_parts_are_sent_concurrently_through_plain_breaker(self, rmock):
+        self.mock_soap_response(rmock=rmock, text=self.respond_to_part)
+        basket = self.prepare_basket(lines=5)
+        # A plain breaker holds its lock for the duration of each call
+        calc = CCHTaxCalculator(breaker=pybreaker.CircuitBreaker())
+        # Every part must be in flight at once to get past the barrier
+        barrier = threading.Barrier(3, timeout=5)
+        send = calc._send_order_without_breaker
+
+        def send_part(order):
+            barrier.wait()
+            return send(order)
+
+        with mock.patch.object(calc, "_send_order_without_breaker", send_part):
+            resp = calc.apply_taxes(self.get_to_address(), basket)
+
+        self.assertIsNotNone(resp)
+        self.assertEqual(rmock.call_count, 3)
+        self.assertEqual(basket.total_tax, D("4.45"))
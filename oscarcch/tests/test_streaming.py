@@ -0,0 +1,224 @@
+from decimal import Decimal as D
+from unittest import mock
+import io
+import re
+
+from oscar.test import factories
+import pybreaker
+import requests
+import requests_mock
+import zeep.exceptions
+
+from ..calculator import CCHTaxCalculator
+from ..models import LineItemTaxation, ShippingTaxation
+from ..responses import parse_calculate_response, stream_calculate_response
+from .base import BaseTest
+from .test_responses import FIXTURES, SOAP_FAULT
+
+
+class CountingReader(io.BytesIO):
+    def __init__(self, content):
+        super().__init__(content)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        data = super().read(size)
+        self.bytes_read += len(data)
+        return data
+
+
+class StreamCalculateResponseTest(BaseTest):
+    def get_fixture(self, name, takes_line_id):
+        method = getattr(self, f"_get_cch_response_{name}")
+        return method("123") if takes_line_id else method()
+
+    def test_matches_parsed_response(self):
+        for name, takes_line_id in FIXTURES:
+            with self.subTest(fixture=name):
+                content = self.get_fixture(name, takes_line_id).encode()
+                expected = parse_calculate_response(content)
+                line_item_taxes = []
+                response = stream_calculate_response(
+                    io.BytesIO(content), line_item_taxes.append
+                )
+                self.assertEqual(
+                    line_item_taxes,
+                    expected.LineItemTaxes.LineItemTax
+                    if expected.LineItemTaxes
+                    else [],
+                )
+                self.assertEqual(response, expected._replace(LineItemTaxes=None))
+
+    def test_lines_are_handled_as_they_are_read(self):
+        # Build a response with thousands of lines out of the normal one
+        content = self._get_cch_response_normal("123")
+        line = re.search(r"<b:LineItemTax>.*?</b:LineItemTax>", content, re.DOTALL)[0]
+        lines = "".join(
+            line.replace("<b:ID>123</b:ID>", f"<b:ID>{i}</b:ID>") for i in range(5000)
+        )
+        content = content.replace(line, lines, 1).encode()
+        reader = CountingReader(content)
+        handled = []
+
+        stream_calculate_response(
+            reader, lambda taxes: handled.append((taxes.ID, reader.bytes_read))
+        )
+
+        # Plus the shipping line
+        self.assertEqual(len(handled), 5001)
+        self.assertEqual(handled[4999][0], "4999")
+        self.assertLess(handled[0][1], len(content) / 10)
+
+    def test_soap_fault(self):
+        with self.assertRaises(zeep.exceptions.Fault) as cm:
+            stream_calculate_response(io.BytesIO(SOAP_FAULT.encode()), mock.Mock())
+        self.assertEqual(cm.exception.message, "Invalid request")
+
+    def test_http_error(self):
+        with self.assertRaises(zeep.exceptions.TransportError) as cm:
+            stream_calculate_response(
+                io.BytesIO(b"Service Unavailable"), mock.Mock(), 503
+            )
+        self.assertEqual(cm.exception.status_code, 503)
+
+    def test_invalid_xml(self):
+        with self.assertRaises(zeep.exceptions.XMLSyntaxError):
+            stream_calculate_response(io.BytesIO(b"<s:Envelope"), mock.Mock())
+
+    def test_safety_limits(self):
+        content = b"<a>" * 300 + b"</a>" * 300
+        with self.assertRaises(zeep.exceptions.XMLSyntaxError):
+            stream_calculate_response(io.BytesIO(content), mock.Mock())
+
+    def test_missing_result(self):
+        with self.assertRaises(zeep.exceptions.XMLParseError):
+            stream_calculate_response(io.BytesIO(b"<Envelope/>"), mock.Mock())
+
+
+@mock.patch.object(CCHTaxCalculator, "stream_responses", True)
+class StreamingCalculatorTest(BaseTest):
+    def setUp(self):
+        super().setUp()
+        self.assertIsNotNone(CCHTaxCalculator().client)
+
+    @requests_mock.mock()
+    def test_apply_taxes(self, rmock):
+        basket = self.prepare_basket()
+        shipping_charge = self.get_shipping_charge()
+        self.mock_soap_response(
+            rmock=rmock,
+            text=self._get_cch_response_normal(basket.all_lines()[0].id),
+        )
+
+        resp = CCHTaxCalculator().apply_taxes(
+            self.get_to_address(), basket, shipping_charge
+        )
+
+        self.assertEqual(resp.TransactionID, 40043)
+        self.assertEqual(resp.TotalTaxApplied, D("2.2203625"))
+        self.assertIsNone(resp.LineItemTaxes)
+        self.assertTrue(basket.is_tax_known)
+        self.assertEqual(basket.total_incl_tax, D("10.89"))
+        details = basket.all_lines()[0].purchase_info.price.taxation_details
+        self.assertEqual(details[0].authority_name, "NEW YORK, STATE OF")
+        self.assertEqual(shipping_charge.incl_tax, D("16.3203625"))
+
+    @requests_mock.mock()
+    def test_lines_without_taxes_are_tax_free(self, rmock):
+        basket = self.prepare_basket()
+        shipping_charge = self.get_shipping_charge()
+        self.mock_soap_response(rmock=rmock, text=self._get_cch_response_empty())
+
+        resp = CCHTaxCalculator().apply_taxes(
+            self.get_to_address(), basket, shipping_charge
+        )
+
+        self.assertEqual(resp.TransactionID, 40043)
+        self.assertTrue(basket.is_tax_known)
+        self.assertEqual(basket.total_tax, D("0.00"))
+        self.assertEqual(shipping_charge.tax, D("0.00"))
+
+    @requests_mock.mock()
+    def test_error_after_lines_undoes_taxes(self, rmock):
+        basket = self.prepare_basket()
+        shipping_charge = self.get_shipping_charge()
+        content = self._get_cch_response_normal(basket.all_lines()[0].id)
+        # Report an error after the line items have been applied
+        content = re.sub(
+            r"<a:Messages .*?/>",
+            re.search(
+                r"<a:Messages .*?</a:Messages>",
+                self._get_cch_response_db_connection_error(),
+                re.DOTALL,
+            )[0],
+            content,
+        )
+        self.mock_soap_response(rmock=rmock, text=content)
+        calc = CCHTaxCalculator()
+        calc.max_retries = 0
+
+        self.assertIsNone(
+            calc.apply_taxes(self.get_to_address(), basket, shipping_charge)
+        )
+        self.assertEqual(basket.total_tax, D("0.00"))
+        self.assertEqual(shipping_charge.tax, D("0.00"))
+
+    @requests_mock.mock()
+    def test_miscalculation_is_raised(self, rmock):
+        basket = self.prepare_basket()
+        content = self._get_cch_response_normal(basket.all_lines()[0].id).replace(
+            "<b:TotalTaxApplied>0.89</b:TotalTaxApplied>",
+            "<b:TotalTaxApplied>0.99</b:TotalTaxApplied>",
+        )
+        self.mock_soap_response(rmock=rmock, text=content)
+        breaker = pybreaker.CircuitBreaker(fail_max=1)
+        calc = CCHTaxCalculator(breaker=breaker)
+
+        # Just like when the response isn't streamed
+        for stream_responses in (False, True):
+            with self.subTest(stream_responses=stream_responses):
+                calc.stream_responses = stream_responses
+                with self.assertRaisesRegex(RuntimeError, "miscalculation"):
+                    calc.apply_taxes(
+                        self.get_to_address(), basket, self.get_shipping_charge()
+                    )
+        # It isn't a failure of CCH, so it's neither retried nor counted by the breaker
+        self.assertEqual(rmock.call_count, 2)
+        self.assertEqual(breaker.current_state, pybreaker.STATE_CLOSED)
+
+    @requests_mock.mock()
+    def test_place_order_saves_line_details(self, rmock):
+        basket = self.prepare_basket()
+        self.mock_soap_response(
+            rmock=rmock,
+            text=self._get_cch_response_normal(basket.all_lines()[0].id),
+        )
+
+        order = factories.create_order(
+            basket=basket, shipping_address=self.get_to_address()
+        )
+
+        self.assertEqual(order.taxation.transaction_id, 40043)
+        line_taxation = LineItemTaxation.objects.get(line_item__order=order)
+        self.assertEqual(line_taxation.total_tax_applied, D("0.89"))
+        self.assertEqual(line_taxation.details.count(), 3)
+        self.assertEqual(ShippingTaxation.objects.filter(order=order).count(), 1)
+
+    @requests_mock.mock()
+    def test_timeouts_are_retried(self, rmock):
+        basket = self.prepare_basket()
+        self.mock_soap_response(
+            rmock=rmock,
+            response_list=[
+                {"exc": requests.exceptions.ReadTimeout},
+                {"text": self._get_cch_response_normal(basket.all_lines()[0].id)},
+            ],
+        )
+        calc = CCHTaxCalculator()
+        calc.retry_backoff = 0
+
+        resp = calc.apply_taxes(self.get_to_address(), basket)
+
+        self.assertEqual(rmock.call_count, 2)
+        self.assertEqual(resp.TransactionID, 40043)
+        self.assertEqual(basket.total_incl_tax, D("10.89"))
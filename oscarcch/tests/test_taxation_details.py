@@ -6,6 +6,8 @@ from oscar.core.loading import get_class, get_model
 from oscar.core.prices import Price as CorePrice
 from oscar.core.prices import TaxNotKnown
 
+from ..prices import TaxationDetail, TaxationDetails
+
 Basket = get_model("basket", "Basket")
 BasketLine = get_model("basket", "Line")
 ShippingAddress = get_model("order", "ShippingAddress")
@@ -94,3 +96,75 @@ class CorePriceTaxationDetailsTest(TestCase):
         self.assertEqual(p.excl_tax, D("10.00"))
         self.assertFalse(p.is_tax_known)
         self.assertIsNone(p.incl_tax)
+
+
+class TaxationDetailsTest(TestCase):
+    def test_add_taxes(self):
+        p = prices.FixedPrice("USD", D("10.00"))
+        p.add_taxes(
+            [
+                ("New York State", "Sales Tax", D("1.00"), D("0.00")),
+                ("IRS", "Some Fee", D("0.00"), D("0.15")),
+            ]
+        )
+        self.assertTrue(p.is_tax_known)
+        self.assertEqual(p.tax, D("1.15"))
+        self.assertEqual(p.incl_tax, D("11.15"))
+        self.assertEqual(
+            list(p.taxation_details),
+            [
+                TaxationDetail("New York State", "Sales Tax", D("1.00"), D("0.00")),
+                TaxationDetail("IRS", "Some Fee", D("0.00"), D("0.15")),
+            ],
+        )
+
+    def test_mixed_add_tax_and_add_taxes(self):
+        p = prices.FixedPrice("USD", D("10.00"))
+        p.add_tax("New York State", "Sales Tax", tax_applied="1.00")
+        p.add_taxes([("New York City", "Sales Tax", D("0.50"), D("0.00"))])
+        self.assertEqual(p.tax, D("1.50"))
+        p.add_taxes([("IRS", "Some Fee", D("0.00"), D("0.15"))])
+        p.add_tax("MTA", "Surcharge", tax_applied="0.05")
+        self.assertEqual(p.tax, D("1.70"))
+        self.assertEqual(p.tax, p.taxation_details.total)
+
+    def test_details_are_not_shared(self):
+        p1 = prices.FixedPrice("USD", D("10.00"))
+        p2 = CorePrice("USD", D("10.00"))
+        p1.add_tax("New York State", "Sales Tax", tax_applied="1.00")
+        self.assertEqual(len(p1.taxation_details), 1)
+        self.assertEqual(len(p2.taxation_details), 0)
+        self.assertEqual(len(prices.FixedPrice.taxation_details), 0)
+
+    def test_clear_reuses_container(self):
+        p = CorePrice("USD", D("10.00"))
+        p.add_tax("New York State", "Sales Tax", tax_applied="1.00")
+        details = p.taxation_details
+        p.clear_taxes()
+        self.assertIs(p.taxation_details, details)
+        self.assertEqual(len(details), 0)
+        p.add_tax("New York State", "Sales Tax", tax_applied="2.00")
+        self.assertIs(p.taxation_details, details)
+        self.assertEqual(p.tax, D("2.00"))
+
+    def test_names_are_interned(self):
+        details = TaxationDetails()
+        # Build equal, but distinct, strings, as parsing a response would
+        for state in ("State", "State"):
+            details.add(f"New York {state}", "Sales Tax", D(1), D(0))
+        self.assertIsNot(f"New York {state}", details[0].authority_name)
+        self.assertIs(details[0].authority_name, details[1].authority_name)
+
+    def test_total(self):
+        details = TaxationDetails()
+        self.assertEqual(details.total, D(0))
+        details.add("New York State", "Sales Tax", D("1.00"), D("0.00"))
+        details.add("IRS", "Some Fee", D("0.00"), D("0.15"))
+        self.assertEqual(details.total, D("1.15"))
+        details.add("IRS", "Other Fee", D("0.00"), D("0.10"))
+        self.assertEqual(details.total, D("1.25"))
+        self.assertEqual(details[-1].tax_name, "Other Fee")
+        self.assertEqual([d.tax_name for d in details[:2]], ["Sales Tax", "Some Fee"])
+        details.clear()
+        self.assertEqual(details.total, D(0))
+        self.assertEqual(len(details), 0)
@@ -136,6 +136,9 @@ CACHES = {
     }
 }
 
+# The sandbox runs in a single process, so its circuit breaker doesn't need a shared cache
+SILENCED_SYSTEM_CHECKS = ["oscarcch.W001"]
+
 CCH_WSDL = f"file://{os.path.join(BASE_DIR, 'wsdl/cch.xml')}"
 CCH_ENTITY = "TESTSANDBOX"
 CCH_DIVISION = "42"